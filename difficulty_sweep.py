@@ -0,0 +1,214 @@
+import os
+import re
+import json
+import time
+import random
+import itertools
+import multiprocessing as mp
+
+import numpy as np
+
+import forest_env
+
+# ==============================================================================
+# MONTE CARLO DIFFICULTY SWEEP
+# ==============================================================================
+# Plays many seeded headless games per level and parameter set with a heuristic player,
+# spread over a process pool, and reports win rate, time-to-loss and fire coverage over time.
+#
+#   python difficulty_sweep.py --levels 8,9 --games 2000 --profile parkinsons \
+#       --param FIRE_SPREAD_CHANCE=0.15,0.25 --param "FIRE_SPREAD_INTERVAL_MS[9]=2000,3000"
+#
+# Any module-level constant of game_withHardware.py can be swept (FIRE_SPREAD_CHANCE,
+# MAX_FIRE_PERCENTAGE, ZOMBIE_SPEED, PARKINSON_ZOMBIE_SPEED, ZOMBIE_COUNT_NORMAL, ...),
+# dict constants by key with NAME[key]=...
+
+STEPS_PER_SECOND = 60
+CURVE_SECONDS = 61 # Fire coverage sampled once per game second, 0..60
+
+# Player profiles: reaction delay (steps the previous action is held) and chance of a wrong action
+PLAYER_PROFILES = {
+    "normal": {"reaction_steps": 4, "error_rate": 0.02},
+    "parkinsons": {"reaction_steps": 12, "error_rate": 0.15},
+    "perfect": {"reaction_steps": 0, "error_rate": 0.0},
+}
+
+THREAT_RADIUS_TILES = 3.0
+SPRAY_RANGE_TILES = 8.0
+
+# --- Heuristic player ---
+
+def heuristic_action(obs):
+    entities = obs["entities"]
+    px, py = entities[0][1], entities[0][2]
+
+    # 1. Run from the closest zombie if it is too near
+    threats = entities[(entities[:, 0] == forest_env.ENTITY_ZOMBIE) | (entities[:, 0] == forest_env.ENTITY_FLAME_ZOMBIE)]
+    if len(threats):
+        d = np.hypot(threats[:, 1] - px, threats[:, 2] - py)
+        i = int(np.argmin(d))
+        if d[i] < THREAT_RADIUS_TILES:
+            dx, dy = px - threats[i, 1], py - threats[i, 2]
+            if abs(dx) > abs(dy): return 4 if dx > 0 else 3
+            return 2 if dy > 0 else 1
+
+    # 2. Line up with the nearest fire on one axis, then spray along the other
+    fy, fx = np.nonzero(obs["fire"])
+    if len(fx) == 0: return 0
+    cx, cy = fx + 0.5, fy + 0.5
+    d = np.abs(cx - px) + np.abs(cy - py)
+    i = int(np.argmin(d))
+    dx, dy = cx[i] - px, cy[i] - py
+
+    if abs(dy) <= 0.5 and abs(dx) <= SPRAY_RANGE_TILES:
+        return (4 if dx > 0 else 3) + 5
+    if abs(dx) <= 0.5 and abs(dy) <= SPRAY_RANGE_TILES:
+        return (2 if dy > 0 else 1) + 5
+    if abs(dy) < abs(dx):
+        return 2 if dy > 0 else 1
+    return 4 if dx > 0 else 3
+
+# --- Worker side ---
+
+game_defaults = {} # Original values of every constant a sweep has touched in this process
+
+def apply_params(game, params):
+    # Restore anything a previous task changed, then apply this task's values
+    for name, value in game_defaults.items():
+        setattr(game, name, value.copy() if isinstance(value, dict) else value)
+    for key, value in params.items():
+        name, item = parse_param_name(key)
+        if name not in game_defaults:
+            original = getattr(game, name)
+            game_defaults[name] = original.copy() if isinstance(original, dict) else original
+        if item is None:
+            setattr(game, name, value)
+        else:
+            getattr(game, name)[item] = value
+
+def play_game(env, seed, profile):
+    rng = random.Random(seed ^ 0x5EED)
+    obs, info = env.reset(seed=seed)
+    total_tiles = env.game.total_tiles
+    curve = [info["fires"] / total_tiles]
+    action = 0
+    step = 0
+    while True:
+        if step % (profile["reaction_steps"] + 1) == 0:
+            action = heuristic_action(obs)
+            if rng.random() < profile["error_rate"]:
+                action = rng.randrange(forest_env.ACTION_COUNT)
+        obs, _, terminated, truncated, info = env.step(action)
+        step += 1
+        if step % STEPS_PER_SECOND == 0:
+            curve.append(info["fires"] / total_tiles)
+        if terminated or truncated:
+            break
+
+    # A finished game keeps its final coverage for the rest of the curve
+    curve = (curve + [curve[-1]] * CURVE_SECONDS)[:CURVE_SECONDS]
+    return info["won"], info["game_time_ms"] / 1000.0, info["score"], curve
+
+def run_batch(task):
+    level_id, params, seeds, profile_name = task
+    env = forest_env.ForestFireEnv(level_id=level_id)
+    apply_params(env.game, params)
+    profile = PLAYER_PROFILES[profile_name]
+    return [play_game(env, seed, profile) for seed in seeds]
+
+# --- Driver side ---
+
+def parse_param_name(key):
+    match = re.fullmatch(r"(\w+)(?:\[(\w+)\])?", key)
+    if not match: raise ValueError(f"Bad parameter name: {key}")
+    name, item = match.group(1), match.group(2)
+    if item is not None and item.lstrip("-").isdigit(): item = int(item)
+    return name, item
+
+def parse_value(text):
+    try: return json.loads(text)
+    except ValueError: return text
+
+def parse_param_grid(param_args):
+    names, value_lists = [], []
+    for arg in param_args:
+        key, _, values = arg.partition("=")
+        parse_param_name(key)
+        names.append(key)
+        value_lists.append([parse_value(v) for v in values.split(",")])
+    return [dict(zip(names, combo)) for combo in itertools.product(*value_lists)]
+
+def summarize(level_id, params, results):
+    wins = [r for r in results if r[0]]
+    losses = [r for r in results if not r[0]]
+    loss_times = [r[1] for r in losses]
+    curves = np.array([r[3] for r in results])
+    return {
+        "level_id": level_id,
+        "params": params,
+        "games": len(results),
+        "win_rate": round(len(wins) / len(results), 4),
+        "mean_time_to_loss": round(float(np.mean(loss_times)), 2) if loss_times else None,
+        "median_time_to_loss": round(float(np.median(loss_times)), 2) if loss_times else None,
+        "mean_score": round(float(np.mean([r[2] for r in results])), 2),
+        "coverage_curve": [round(float(v), 4) for v in curves.mean(axis=0)],
+    }
+
+def run_sweep(levels, param_sets, games, profile, workers, seed=0, batch_size=25):
+    tasks, keys = [], []
+    for level_id in levels:
+        for set_index, params in enumerate(param_sets):
+            for start in range(0, games, batch_size):
+                seeds = [seed + n for n in range(start, min(games, start + batch_size))]
+                tasks.append((level_id, params, seeds, profile))
+                keys.append((level_id, set_index))
+
+    results = {}
+    ctx = mp.get_context("spawn")
+    pool = ctx.Pool(workers)
+    try:
+        for key, batch in zip(keys, pool.imap(run_batch, tasks)):
+            results.setdefault(key, []).extend(batch)
+        pool.close() # Let workers exit on their own, SDL turns SIGTERM into a quit event
+    except BaseException:
+        pool.terminate()
+        raise
+    finally:
+        pool.join()
+
+    return [summarize(level_id, param_sets[set_index], results[(level_id, set_index)]) for (level_id, set_index) in sorted(results)]
+
+def print_table(rows):
+    print(f"{'LEVEL':>5}  {'WIN %':>6}  {'LOSS T':>6}  {'SCORE':>6}  {'FIRE@10s':>8}  {'FIRE@30s':>8}  {'FIRE@60s':>8}  PARAMS")
+    for row in rows:
+        curve = row["coverage_curve"]
+        loss_t = f"{row['mean_time_to_loss']:.1f}" if row["mean_time_to_loss"] is not None else "-"
+        print(f"{row['level_id']:>5}  {row['win_rate'] * 100:>6.1f}  {loss_t:>6}  {row['mean_score']:>6.1f}  "
+              f"{curve[10] * 100:>7.1f}%  {curve[30] * 100:>7.1f}%  {curve[60] * 100:>7.1f}%  {row['params']}")
+
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description="Monte Carlo difficulty sweep for Forest Fire levels")
+    parser.add_argument("--levels", default="1,2,8,9,3,4,5,6,7", help="Comma separated level ids")
+    parser.add_argument("--games", type=int, default=1000, help="Games per level and parameter set")
+    parser.add_argument("--param", action="append", default=[], help="NAME=v1,v2,... (repeatable, swept as a grid)")
+    parser.add_argument("--profile", default="normal", choices=sorted(PLAYER_PROFILES))
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 4)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", default="sweep_results.json")
+    args = parser.parse_args()
+
+    levels = [int(v) for v in args.levels.split(",")]
+    param_sets = parse_param_grid(args.param)
+
+    start = time.perf_counter()
+    rows = run_sweep(levels, param_sets, args.games, args.profile, args.workers, args.seed)
+    elapsed = time.perf_counter() - start
+
+    print_table(rows)
+    total_games = args.games * len(levels) * len(param_sets)
+    print(f"{total_games} games in {elapsed:.1f}s ({args.profile} player, {args.workers} workers)")
+
+    with open(args.out, "w") as f:
+        json.dump({"profile": args.profile, "games": args.games, "seed": args.seed, "results": rows}, f, indent=2)
+    print(f"Results written to {args.out}")
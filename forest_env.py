@@ -0,0 +1,288 @@
+import os
+import sys
+import time
+import random
+import multiprocessing as mp
+
+import numpy as np
+
+# ==============================================================================
+# HEADLESS ENVIRONMENT
+# ==============================================================================
+# Gymnasium-style wrapper around the real level rules in game_withHardware.py, so automated
+# players and difficulty models can run without a window or human input.
+#
+#   env = ForestFireEnv(level_id=6)
+#   obs, info = env.reset(seed=1)
+#   obs, reward, terminated, truncated, info = env.step(action)
+#
+# VectorForestEnv steps many independent games in parallel worker processes. Benchmark:
+#   python forest_env.py --envs 8 --level 6 --steps 20000
+
+try:
+    import gymnasium as gym
+    from gymnasium import spaces
+except ImportError:
+    gym = None # Works without gymnasium, just no observation_space / action_space
+
+game = None # game_withHardware module, imported on first use (one game per process)
+
+def load_game():
+    global game
+    if game is None:
+        os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+        os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+        os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+        os.environ.setdefault("SDL_NO_SIGNAL_HANDLERS", "1") # Keep SIGINT/SIGTERM working in worker processes
+        sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+        import game_withHardware
+        game = game_withHardware
+    return game
+
+# Level Logic IDs -> (selected_mode_index, selected_level_index) as picked in the menus
+LEVEL_SELECTIONS = {
+    1: (0, 0), # Parkinson Lvl 1
+    2: (0, 1), # Parkinson Lvl 2
+    8: (0, 2), # Parkinson Lvl 3
+    9: (0, 3), # Parkinson Lvl 4 (Slow Zombie)
+    3: (1, 0), # Normal Lvl 1
+    4: (1, 1), # Normal Lvl 2
+    5: (1, 2), # Normal Lvl 3 (Obstacles)
+    6: (1, 3), # Normal Lvl 4 (Survival)
+    7: (1, 4), # Normal Lvl 5 (Flame Zombie)
+}
+
+# Actions: 0-4 = move (none, up, down, left, right), 5-9 = same move while spraying
+ACTION_COUNT = 10
+MOVES = [(0, 0), (0, -1), (0, 1), (-1, 0), (1, 0)]
+MOVE_DIRECTIONS = [None, 'up', 'down', 'left', 'right']
+
+FRAME_MS = 1000.0 / 60 # One step = one 60 FPS frame of game time
+
+# Entity rows: [kind, x, y] in tile units, padded with kind 0
+MAX_ENTITIES = 16
+ENTITY_NONE = 0
+ENTITY_PLAYER = 1
+ENTITY_ZOMBIE = 2
+ENTITY_FLAME_ZOMBIE = 3
+ENTITY_WATER_POWERUP = 4
+ENTITY_SPEED_POWERUP = 5
+ENTITY_HEART_POWERUP = 6
+
+# Reward shaping
+REWARD_PER_FIRE = 1.0
+REWARD_LIFE_LOST = -5.0
+REWARD_WIN = 10.0
+REWARD_LOSS = -10.0
+
+EnvBase = gym.Env if gym else object
+
+class ForestFireEnv(EnvBase):
+    metadata = {"render_modes": ["rgb_array"], "render_fps": 60}
+
+    def __init__(self, level_id=6, frame_skip=1, skip_countdown=True, max_episode_steps=None, render_mode=None):
+        if level_id not in LEVEL_SELECTIONS:
+            raise ValueError(f"Unknown level id {level_id}, expected one of {sorted(LEVEL_SELECTIONS)}")
+        self.game = load_game()
+        self.level_id = level_id
+        self.frame_skip = frame_skip
+        self.skip_countdown = skip_countdown
+        self.max_episode_steps = max_episode_steps
+        self.render_mode = render_mode
+        self.steps = 0
+
+        g = self.game
+        if gym:
+            self.action_space = spaces.Discrete(ACTION_COUNT)
+            self.observation_space = spaces.Dict({
+                "grid": spaces.Box(0, g.TILE_OBSTACLE, (g.GRID_HEIGHT, g.GRID_WIDTH), np.int8),
+                "fire": spaces.MultiBinary((g.GRID_HEIGHT, g.GRID_WIDTH)),
+                "entities": spaces.Box(-np.inf, np.inf, (MAX_ENTITIES, 3), np.float32),
+                "status": spaces.Box(-np.inf, np.inf, (5,), np.float32),
+            })
+
+    def reset(self, seed=None, options=None):
+        g = self.game
+        if seed is not None:
+            random.seed(seed) # The game draws everything from the global random module
+
+        g.selected_mode_index, g.selected_level_index = LEVEL_SELECTIONS[self.level_id]
+        g.init_game()
+        if self.skip_countdown:
+            while g.game_state == g.STATE_GAME_STARTING:
+                g.advance_game_time(FRAME_MS)
+
+        self.steps = 0
+        return self.observation(), self.info()
+
+    def step(self, action):
+        g = self.game
+        move = int(action) % 5
+        spraying = int(action) >= 5
+        dx, dy = MOVES[move]
+
+        score_before = g.score
+        lives_before = g.player_lives
+
+        for _ in range(self.frame_skip):
+            g.advance_game_time(FRAME_MS)
+            if g.game_state == g.STATE_GAME_RUNNING:
+                if MOVE_DIRECTIONS[move]: g.player_direction = MOVE_DIRECTIONS[move]
+                new_x = g.player_rect.x + dx * g.player_speed
+                new_y = g.player_rect.y + dy * g.player_speed
+                g.update_game(new_x, new_y, spraying)
+            if g.game_state in (g.STATE_GAME_WON, g.STATE_GAME_OVER):
+                break
+
+        self.steps += 1
+        terminated = g.game_state in (g.STATE_GAME_WON, g.STATE_GAME_OVER)
+        truncated = not terminated and self.max_episode_steps is not None and self.steps >= self.max_episode_steps
+
+        reward = (g.score - score_before) * REWARD_PER_FIRE
+        reward += max(0, lives_before - g.player_lives) * REWARD_LIFE_LOST
+        if g.game_state == g.STATE_GAME_WON: reward += REWARD_WIN
+        elif g.game_state == g.STATE_GAME_OVER: reward += REWARD_LOSS
+
+        return self.observation(), reward, terminated, truncated, self.info()
+
+    def observation(self):
+        g = self.game
+        grid = np.array(g.game_grid, dtype=np.int8)
+        fire = np.zeros(grid.shape, dtype=bool)
+        if g.fire_tiles:
+            xs, ys = zip(*g.fire_tiles)
+            fire[ys, xs] = True
+        if g.obstacle_tiles:
+            xs, ys = zip(*g.obstacle_tiles)
+            grid[ys, xs] = g.TILE_OBSTACLE
+
+        entities = np.zeros((MAX_ENTITIES, 3), dtype=np.float32)
+        rows = [(ENTITY_PLAYER, g.player_rect)]
+        for kind, registry in [(ENTITY_ZOMBIE, g.zombies), (ENTITY_FLAME_ZOMBIE, g.flame_zombies), (ENTITY_WATER_POWERUP, g.water_powerups),
+                               (ENTITY_SPEED_POWERUP, g.speed_powerups), (ENTITY_HEART_POWERUP, g.heart_powerups)]:
+            rows += [(kind, entity.rect) for entity in registry]
+        for i, (kind, rect) in enumerate(rows[:MAX_ENTITIES]):
+            entities[i] = (kind, rect.centerx / g.TILE_SIZE, (rect.centery - g.UI_HEIGHT) / g.TILE_SIZE)
+
+        status = np.array([g.player_lives, g.time_remaining, g.score, "water" in g.player_effects, "speed" in g.player_effects], dtype=np.float32)
+        return {"grid": grid, "fire": fire, "entities": entities, "status": status}
+
+    def info(self):
+        g = self.game
+        return {
+            "level_id": self.level_id,
+            "score": g.score,
+            "fires": len(g.fire_tiles),
+            "fire_clusters": g.fire_clusters.count(),
+            "burnt_out": g.burnt_out_count,
+            "lives": g.player_lives,
+            "time_remaining": g.time_remaining,
+            "won": g.game_state == g.STATE_GAME_WON,
+            "game_time_ms": g.game_clock.now_ms,
+        }
+
+    def render(self):
+        if self.render_mode != "rgb_array": return None
+        g = self.game
+        g.screen.fill(g.DARK_GREEN)
+        g.draw_gameplay()
+        return np.transpose(g.pygame.surfarray.array3d(g.screen), (1, 0, 2))
+
+    def close(self):
+        pass
+
+# ==============================================================================
+# VECTORIZED RUNNER
+# ==============================================================================
+# One game per worker process (the game keeps its state in module globals). Finished
+# episodes reset automatically; the last observation is returned in info["final_observation"].
+
+def env_worker(remote, parent_remote, env_kwargs):
+    parent_remote.close()
+    env = ForestFireEnv(**env_kwargs)
+    try:
+        while True:
+            cmd, data = remote.recv()
+            if cmd == "step":
+                obs, reward, terminated, truncated, info = env.step(data)
+                if terminated or truncated:
+                    info["final_observation"] = obs
+                    info["final_info"] = dict(info)
+                    obs, _ = env.reset()
+                remote.send((obs, reward, terminated, truncated, info))
+            elif cmd == "reset":
+                remote.send(env.reset(seed=data))
+            elif cmd == "close":
+                break
+    except (KeyboardInterrupt, EOFError):
+        pass
+    finally:
+        remote.close()
+
+def stack_observations(observations):
+    return {key: np.stack([obs[key] for obs in observations]) for key in observations[0]}
+
+class VectorForestEnv:
+    def __init__(self, num_envs, level_id=6, **env_kwargs):
+        self.num_envs = num_envs
+        env_kwargs["level_id"] = level_id
+        ctx = mp.get_context("spawn") # Fresh interpreter per worker, no SDL state copied by fork
+        self.remotes, self.processes = [], []
+        for _ in range(num_envs):
+            remote, worker_remote = ctx.Pipe()
+            proc = ctx.Process(target=env_worker, args=(worker_remote, remote, env_kwargs), daemon=True)
+            proc.start()
+            worker_remote.close()
+            self.remotes.append(remote)
+            self.processes.append(proc)
+        self.closed = False
+
+    def reset(self, seed=None):
+        for i, remote in enumerate(self.remotes):
+            remote.send(("reset", None if seed is None else seed + i))
+        results = [remote.recv() for remote in self.remotes]
+        return stack_observations([r[0] for r in results]), [r[1] for r in results]
+
+    def step(self, actions):
+        for remote, action in zip(self.remotes, actions):
+            remote.send(("step", int(action)))
+        results = [remote.recv() for remote in self.remotes]
+        obs, rewards, terminated, truncated, infos = zip(*results)
+        return (stack_observations(obs), np.array(rewards, dtype=np.float32),
+                np.array(terminated), np.array(truncated), list(infos))
+
+    def close(self):
+        if self.closed: return
+        for remote in self.remotes:
+            try: remote.send(("close", None))
+            except (BrokenPipeError, OSError): pass
+        for proc in self.processes:
+            proc.join(timeout=2)
+        self.closed = True
+
+def benchmark(num_envs, level_id, total_steps, seed=0):
+    vec = VectorForestEnv(num_envs, level_id)
+    try:
+        vec.reset(seed=seed)
+        rng = np.random.default_rng(seed)
+        episodes = 0
+        start = time.perf_counter()
+        for _ in range(total_steps // num_envs):
+            _, _, terminated, truncated, _ = vec.step(rng.integers(0, ACTION_COUNT, num_envs))
+            episodes += int(np.sum(terminated | truncated))
+        elapsed = time.perf_counter() - start
+    finally:
+        vec.close()
+
+    steps = (total_steps // num_envs) * num_envs
+    print(f"{num_envs} envs, level {level_id}: {steps} steps in {elapsed:.2f}s = {steps / elapsed:.0f} steps/sec ({episodes} episodes)")
+
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description="Headless Forest Fire environment benchmark")
+    parser.add_argument("--envs", type=int, default=os.cpu_count() or 4)
+    parser.add_argument("--level", type=int, default=6, choices=sorted(LEVEL_SELECTIONS))
+    parser.add_argument("--steps", type=int, default=20000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    benchmark(args.envs, args.level, args.steps, args.seed)
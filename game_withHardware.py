@@ -4,6 +4,13 @@ import sys
 import os
 import math
 import time
+import json
+import threading
+import heapq
+import gc
+import zlib
+from collections import deque
+import numpy as np
 
 # ==============================================================================
 # SECTION 1: HARDWARE DRIVER
@@ -12,12 +19,42 @@ HARDWARE_CONNECTED = False
 ads = None
 GPIO = None
 
+# ADC SAMPLING SETTINGS
+# 'batched'     = one round-robin sweep over all four channels per poll, single-shot conversions at ADC_DATA_RATE
+# 'single_shot' = original behaviour, each joystick does its own X/Y single-shot reads at the default rate
+ADC_SAMPLING_MODE = 'batched'
+ADC_DATA_RATE = 860          # Highest ADS1115 rate (SPS), ~1.2ms per conversion instead of ~7.8ms at 128
+# Single-shot, not continuous: in continuous mode the driver sleeps 2 conversions (~2.3ms) after every
+# channel switch, and a round-robin sweep switches channel on every read
+ADC_READS_PER_UPDATE = 4     # Channel reads per poll() call, 4 = every channel refreshed every frame
+ADC_REPORT_INTERVAL_SEC = 10 # How often the sampler prints its stats to the console (0 = never)
+
+# INPUT PIPELINE SETTINGS (Tremor filtering for Parkinson's mode)
+INPUT_PIPELINE_THREADED = True  # Sample + filter on a background thread instead of once per rendered frame
+INPUT_POLL_HZ = 250             # Upper bound for the background sampling loop
+TREMOR_FILTER_PARKINSONS_ONLY = True
+ONE_EURO_MIN_CUTOFF = 1.5       # Hz. Cutoff while the stick is steady (damps the 4-6 Hz tremor band)
+ONE_EURO_BETA = 1.0             # Cutoff increase per unit/s of stick speed (fast moves stay responsive)
+ONE_EURO_D_CUTOFF = 1.0         # Hz. Cutoff for the speed estimate
+FILTER_LAG_WINDOW_SAMPLES = 2048 # Raw/filtered samples kept to measure the filter lag (~8s at INPUT_POLL_HZ)
+FILTER_LAG_MAX_MS = 250         # Longest lag the measurement looks for
+FILTER_LAG_MIN_MOTION = 0.02    # Stick movement (std dev, normalized units) needed before the lag is measured
+FILTER_LAG_INTERVAL_SEC = 5     # How often the input thread measures the lag (one telemetry window)
+CALIBRATION_FILE = "joystick_calibration.json"
+CALIBRATION_DURATION_SEC = 2.0
+CALIBRATION_SETTLE_SEC = 0.5        # Button up and stick still this long before the resting capture starts
+CALIBRATION_SETTLE_SPREAD = 4000    # Largest move (raw units) from where the stick settled that still counts as still
+CALIBRATION_DEADZONE_MARGIN = 1.5   # Deadzone = largest resting deviation * margin
+CALIBRATION_DEADZONE_MIN = 800
+CALIBRATION_DEADZONE_MAX = 6000
+
 try:
     import board
     import busio
     import RPi.GPIO as GPIO
     from adafruit_ads1x15.analog_in import AnalogIn
     from adafruit_ads1x15.ads1115 import ADS1115
+    from adafruit_ads1x15.ads1x15 import Mode
 
     # Initialize I2C and ADS1115
     i2c = busio.I2C(board.SCL, board.SDA)
@@ -29,11 +66,171 @@ except Exception as e:
     print(f"[HW] Hardware warning: {e}")
     print("[HW] Running in KEYBOARD ONLY mode.")
 
+class ADS1115Sampler:
+    # Reads the ADC channels in a fixed round-robin order and caches the latest raw value per
+    # channel for the joysticks. Every read waits for its conversion (~1.2ms at 860 SPS), so a poll()
+    # of all four channels takes ~5ms: off the render frame only when the InputPipeline thread polls.
+    def __init__(self, channels, reads_per_update=ADC_READS_PER_UPDATE):
+        self.channels = list(channels)
+        self.reads_per_update = reads_per_update
+        self.next_index = 0
+
+        # Latest reading per channel
+        self.raw = {ch: 0 for ch in self.channels}
+        self.sample_time = {ch: 0.0 for ch in self.channels}
+
+        # Stats (reset every report window)
+        self.sample_count = {ch: 0 for ch in self.channels}
+        self.latency_total = {ch: 0.0 for ch in self.channels}
+        self.latency_max = {ch: 0.0 for ch in self.channels}
+        self.window_start = time.perf_counter()
+        self.last_report = {}
+
+        self.inputs = {}
+        if HARDWARE_CONNECTED:
+            try:
+                ads.mode = Mode.SINGLE
+                ads.data_rate = ADC_DATA_RATE
+                for ch in self.channels:
+                    self.inputs[ch] = AnalogIn(ads, ch)
+                print(f"[HW] ADC batched sampling: {len(self.channels)} channels @ {ADC_DATA_RATE} SPS (single-shot, "
+                      f"~{1000.0 / ADC_DATA_RATE:.1f}ms conversion per read)")
+            except Exception as e:
+                print(f"[HW] Error configuring ADC sampler: {e}")
+                self.inputs = {}
+
+    def poll(self):
+        if not self.inputs:
+            return
+
+        for _ in range(self.reads_per_update):
+            ch = self.channels[self.next_index]
+            self.next_index = (self.next_index + 1) % len(self.channels)
+            try:
+                t0 = time.perf_counter()
+                value = self.inputs[ch].value
+                t1 = time.perf_counter()
+            except: continue
+
+            self.raw[ch] = value
+            self.sample_time[ch] = t1
+            latency = t1 - t0
+            self.sample_count[ch] += 1
+            self.latency_total[ch] += latency
+            if latency > self.latency_max[ch]: self.latency_max[ch] = latency
+
+        if ADC_REPORT_INTERVAL_SEC > 0 and time.perf_counter() - self.window_start >= ADC_REPORT_INTERVAL_SEC:
+            self.report()
+
+    def stats(self):
+        # Returns {channel: (samples_per_sec, avg_latency_ms, max_latency_ms)} for the current window
+        elapsed = max(1e-6, time.perf_counter() - self.window_start)
+        result = {}
+        for ch in self.channels:
+            count = self.sample_count[ch]
+            avg_ms = (self.latency_total[ch] / count * 1000.0) if count else 0.0
+            result[ch] = (count / elapsed, avg_ms, self.latency_max[ch] * 1000.0)
+        return result
+
+    def report(self):
+        self.last_report = self.stats()
+        parts = [f"A{ch}: {sps:.0f}/s avg {avg:.2f}ms max {mx:.2f}ms" for ch, (sps, avg, mx) in self.last_report.items()]
+        print("[HW] ADC " + " | ".join(parts))
+
+        for ch in self.channels:
+            self.sample_count[ch] = 0
+            self.latency_total[ch] = 0.0
+            self.latency_max[ch] = 0.0
+        self.window_start = time.perf_counter()
+
+class OneEuroFilter:
+    # Adaptive low-pass: heavy smoothing when the signal is steady, almost none when it moves fast.
+    # Casiez et al., "1 Euro Filter", CHI 2012.
+    def __init__(self, min_cutoff=ONE_EURO_MIN_CUTOFF, beta=ONE_EURO_BETA, d_cutoff=ONE_EURO_D_CUTOFF):
+        self.min_cutoff = min_cutoff
+        self.beta = beta
+        self.d_cutoff = d_cutoff
+        self.reset()
+
+    def reset(self):
+        self.x_prev = None
+        self.dx_prev = 0.0
+        self.t_prev = 0.0
+        self.cutoff = self.min_cutoff
+
+    def alpha(self, cutoff, dt):
+        tau = 1.0 / (2 * math.pi * cutoff)
+        return 1.0 / (1.0 + tau / dt)
+
+    def filter(self, x, t):
+        if self.x_prev is None:
+            self.x_prev = x
+            self.t_prev = t
+            return x
+
+        dt = max(t - self.t_prev, 1e-4)
+        dx = (x - self.x_prev) / dt
+        a_d = self.alpha(self.d_cutoff, dt)
+        dx_hat = a_d * dx + (1 - a_d) * self.dx_prev
+
+        self.cutoff = self.min_cutoff + self.beta * abs(dx_hat)
+        a = self.alpha(self.cutoff, dt)
+        x_hat = a * x + (1 - a) * self.x_prev
+
+        self.x_prev = x_hat
+        self.dx_prev = dx_hat
+        self.t_prev = t
+        return x_hat
+
+def filter_delay_ms(window):
+    # How far the filtered stick trails the raw one, measured: the shift (1ms steps, up to
+    # FILTER_LAG_MAX_MS) at which the filtered signal lines up best with the raw one, x and y together.
+    # window holds (time, raw x, raw y, filtered x, filtered y), resampled to 1ms because the poll
+    # interval jitters; the correlation at every shift comes from one FFT. 0.0 when the stick moved
+    # too little to tell
+    if len(window) < 2: return 0.0
+    samples = np.array(window)
+    samples = samples[np.concatenate(([True], np.diff(samples[:, 0]) > 0))] # Repeated sample times (no new ADC read)
+    t = samples[:, 0]
+    if t[-1] - t[0] <= FILTER_LAG_MAX_MS / 1000.0: return 0.0
+    grid = np.arange(t[0], t[-1], 0.001)
+    n = len(grid)
+    size = 1 << (n + FILTER_LAG_MAX_MS).bit_length() # Padded so shifts 0..FILTER_LAG_MAX_MS don't wrap around
+    shifts = np.arange(FILTER_LAG_MAX_MS + 1)
+    scores = np.zeros(FILTER_LAG_MAX_MS + 1)
+    moving = False
+    for raw_col, filtered_col in ((1, 3), (2, 4)):
+        raw = np.interp(grid, t, samples[:, raw_col])
+        if raw.std() < FILTER_LAG_MIN_MOTION: continue
+        filtered = np.interp(grid, t, samples[:, filtered_col])
+        raw -= raw.mean()
+        filtered -= filtered.mean()
+        # scores[shift] = mean of filtered[i + shift] * raw[i] over the overlap
+        correlation = np.fft.irfft(np.fft.rfft(filtered, size) * np.conj(np.fft.rfft(raw, size)), size)
+        scores += correlation[:FILTER_LAG_MAX_MS + 1] / (n - shifts)
+        moving = True
+    return float(np.argmax(scores)) if moving else 0.0
+
+def load_calibrations():
+    try:
+        with open(CALIBRATION_FILE) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def save_calibrations(calibrations):
+    try:
+        with open(CALIBRATION_FILE, "w") as f:
+            json.dump(calibrations, f, indent=2)
+    except OSError as e:
+        print(f"[HW] Could not save calibration: {e}")
+
 class JoystickHandler:
-    def _init_(self, ch_x_num, ch_y_num, pin_sw):
+    def __init__(self, ch_x_num, ch_y_num, pin_sw, sampler=None):
         self.ch_x_num = ch_x_num
         self.ch_y_num = ch_y_num
         self.pin = pin_sw
+        self.sampler = sampler # Shared ADS1115Sampler (batched mode), None = own single-shot reads
         
         # State variables
         self.norm_x = 0.0
@@ -42,22 +239,160 @@ class JoystickHandler:
         self.just_pressed = False # For menu clicking (one-shot)
         self.prev_pressed = False
         
-        self.center = 15000
+        # Calibration (per player, see apply_calibration)
+        self.center_x = 15000
+        self.center_y = 15000
         self.deadzone = 2000
+        self.sample_time = 0.0 # perf_counter() of the ADC reads behind norm_x / norm_y
+
+        # Tremor filter
+        self.filter_enabled = False
+        self.filter_x = OneEuroFilter()
+        self.filter_y = OneEuroFilter()
+        self.lag_window = deque(maxlen=FILTER_LAG_WINDOW_SAMPLES) # (time, raw x, raw y, filtered x, filtered y)
+        self.filter_lag_ms = 0.0 # Last measure_filter_lag() result
+
+        # Calibration capture (raw samples collected while the stick rests)
+        self.calibration_samples = None
+        self.calibration_end = None # None while waiting for the stick to settle
+        self.calibration_settle = None # (time, raw x, raw y) the stick has been still since
+        self.calibration_result = None
+
+        # Calibration, filter and lag state are shared with the InputPipeline thread (process_analog)
+        # and changed by the main thread between rounds
+        self.lock = threading.Lock()
+
+        # Latest processed sample, published as one tuple so the render thread never sees a half update
+        self.published = (0.0, 0.0, 0.0)
+        self.threaded = False # Set when an InputPipeline feeds this joystick
 
         self.ax_obj = None
         self.ay_obj = None
         
         if HARDWARE_CONNECTED:
             try:
-                self.ax_obj = AnalogIn(ads, ch_x_num)
-                self.ay_obj = AnalogIn(ads, ch_y_num)
+                if self.sampler is None:
+                    self.ax_obj = AnalogIn(ads, ch_x_num)
+                    self.ay_obj = AnalogIn(ads, ch_y_num)
                 GPIO.setup(self.pin, GPIO.IN, pull_up_down=GPIO.PUD_UP)
             except Exception as e:
                 print(f"Error setting up joystick channels {ch_x_num}/{ch_y_num}: {e}")
 
+    def apply_calibration(self, cal):
+        with self.lock: self.use_calibration(cal)
+
+    def use_calibration(self, cal):
+        # Caller holds self.lock
+        self.center_x = cal.get("center_x", 15000)
+        self.center_y = cal.get("center_y", 15000)
+        self.deadzone = cal.get("deadzone", 2000)
+        self.reset_filter()
+
+    def reset_filter(self):
+        # Caller holds self.lock
+        self.filter_x.reset()
+        self.filter_y.reset()
+        self.lag_window.clear()
+
+    def set_filter(self, enabled):
+        with self.lock:
+            if enabled != self.filter_enabled:
+                self.filter_enabled = enabled
+                self.reset_filter()
+
+    def start_calibration(self):
+        # The resting capture waits for the stick to settle (capture_calibration), so the press that
+        # started it, on the stick being calibrated, doesn't end up in the samples
+        with self.lock:
+            self.calibration_result = None
+            self.calibration_end = None
+            self.calibration_settle = None
+            self.calibration_samples = []
+
+    def is_calibrating(self):
+        return self.calibration_samples is not None
+
+    def is_settling(self):
+        return self.calibration_samples is not None and self.calibration_end is None
+
+    def capture_calibration(self, raw_x, raw_y, sample_time):
+        # Caller holds self.lock
+        if self.calibration_end is None:
+            settle = self.calibration_settle
+            if self.is_pressed: settle = None
+            elif settle and max(abs(raw_x - settle[1]), abs(raw_y - settle[2])) > CALIBRATION_SETTLE_SPREAD: settle = None
+            if settle is None: settle = (sample_time, raw_x, raw_y)
+            self.calibration_settle = settle
+            if sample_time - settle[0] >= CALIBRATION_SETTLE_SEC: self.calibration_end = sample_time + CALIBRATION_DURATION_SEC
+            return
+        self.calibration_samples.append((raw_x, raw_y))
+        if sample_time >= self.calibration_end:
+            self.finish_calibration()
+
+    def finish_calibration(self):
+        # Caller holds self.lock
+        samples = self.calibration_samples
+        self.calibration_samples = None
+        if not samples: return
+
+        center_x = sum(s[0] for s in samples) / len(samples)
+        center_y = sum(s[1] for s in samples) / len(samples)
+        spread = max(max(abs(s[0] - center_x), abs(s[1] - center_y)) for s in samples)
+        deadzone = spread * CALIBRATION_DEADZONE_MARGIN
+        deadzone = max(CALIBRATION_DEADZONE_MIN, min(CALIBRATION_DEADZONE_MAX, deadzone))
+
+        self.calibration_result = {"center_x": int(center_x), "center_y": int(center_y), "deadzone": int(deadzone)}
+        self.use_calibration(self.calibration_result)
+
+    def process_analog(self, raw_x, raw_y, sample_time):
+        # Calibrate -> filter -> deadzone -> normalize. Runs on the input thread when threaded.
+        with self.lock:
+            if self.calibration_samples is not None:
+                self.capture_calibration(raw_x, raw_y, sample_time)
+
+            diff_x = (raw_x - self.center_x) / 15000.0
+            diff_y = (raw_y - self.center_y) / 15000.0
+
+            if self.filter_enabled:
+                filtered_x = self.filter_x.filter(diff_x, sample_time)
+                filtered_y = self.filter_y.filter(diff_y, sample_time)
+                self.lag_window.append((sample_time, diff_x, diff_y, filtered_x, filtered_y))
+                diff_x, diff_y = filtered_x, filtered_y
+
+            dz = self.deadzone / 15000.0
+            nx = 0.0 if abs(diff_x) < dz else max(-1.0, min(1.0, diff_x))
+            ny = 0.0 if abs(diff_y) < dz else max(-1.0, min(1.0, diff_y))
+
+            self.published = (nx, ny, sample_time)
+
+    def measure_filter_lag(self):
+        # Filter lag (ms) over the samples since the last measurement, see filter_delay_ms
+        with self.lock:
+            window = list(self.lag_window)
+            self.lag_window.clear()
+        self.filter_lag_ms = filter_delay_ms(window)
+
+    def take_filter_lag(self):
+        # The InputPipeline thread measures every FILTER_LAG_INTERVAL_SEC and this only reads the
+        # result; without the thread it's measured here, once per telemetry window
+        if not self.threaded: self.measure_filter_lag()
+        return self.filter_lag_ms
+
+    def read_analog(self):
+        if self.sampler:
+            # Latest values from the shared round-robin sweep (no bus access here)
+            sample_time = min(self.sampler.sample_time[self.ch_x_num], self.sampler.sample_time[self.ch_y_num])
+            if sample_time == 0.0: return # A channel not read yet, its raw 0 would pin the stick up-left
+            raw_x = self.sampler.raw[self.ch_x_num]
+            raw_y = self.sampler.raw[self.ch_y_num]
+        else:
+            raw_x = self.ax_obj.value
+            raw_y = self.ay_obj.value
+            sample_time = time.perf_counter()
+        self.process_analog(raw_x, raw_y, sample_time)
+
     def update(self):
-        if not HARDWARE_CONNECTED or not self.ax_obj:
+        if not HARDWARE_CONNECTED or (not self.ax_obj and not self.sampler):
             return
 
         # 1. READ BUTTON (Active Low)
@@ -74,31 +409,97 @@ class JoystickHandler:
             
         except: pass
 
-        # 2. READ ANALOG
+        # 2. READ ANALOG (already sampled and filtered by the input thread when threaded)
         try:
-            raw_x = self.ax_obj.value
-            raw_y = self.ay_obj.value
-
-            # X Calculation
-            diff_x = raw_x - self.center
-            if abs(diff_x) < self.deadzone: self.norm_x = 0.0
-            else: self.norm_x = diff_x / 15000.0
-
-            # Y Calculation
-            diff_y = raw_y - self.center
-            if abs(diff_y) < self.deadzone: self.norm_y = 0.0
-            else: self.norm_y = diff_y / 15000.0
-
-            # Clamp
-            self.norm_x = max(-1.0, min(1.0, self.norm_x))
-            self.norm_y = max(-1.0, min(1.0, self.norm_y))
+            if not self.threaded:
+                self.read_analog()
+            self.norm_x, self.norm_y, self.sample_time = self.published
         except: pass
 
+class InputPipeline:
+    # Background thread that owns the ADC: samples at up to INPUT_POLL_HZ and runs
+    # calibration + tremor filtering, independent of the render frame rate.
+    def __init__(self, sticks, sampler=None):
+        self.sticks = sticks
+        self.sampler = sampler
+        self.running = False
+        self.thread = None
+        self.loop_count = 0
+        self.window_start = time.perf_counter()
+
+    def start(self):
+        if not HARDWARE_CONNECTED: return
+        for stick in self.sticks: stick.threaded = True
+        self.running = True
+        self.thread = threading.Thread(target=self.run, name="InputPipeline", daemon=True)
+        self.thread.start()
+        print(f"[HW] Input pipeline running on background thread (max {INPUT_POLL_HZ} Hz)")
+
+    def stop(self):
+        self.running = False
+        if self.thread: self.thread.join(timeout=1.0)
+
+    def run(self):
+        period = 1.0 / INPUT_POLL_HZ
+        lag_measured = time.perf_counter()
+        while self.running:
+            start = time.perf_counter()
+            if self.sampler: self.sampler.poll()
+            for stick in self.sticks:
+                try: stick.read_analog()
+                except: pass
+            self.loop_count += 1
+
+            # Filter lag measured here rather than in the telemetry flip on the render thread
+            if start - lag_measured >= FILTER_LAG_INTERVAL_SEC:
+                for stick in self.sticks: stick.measure_filter_lag()
+                lag_measured = start
+
+            remaining = period - (time.perf_counter() - start)
+            if remaining > 0: time.sleep(remaining)
+
+    def take_poll_rate(self):
+        now = time.perf_counter()
+        rate = self.loop_count / max(1e-6, now - self.window_start)
+        self.loop_count = 0
+        self.window_start = now
+        return rate
+
 # ==============================================================================
 # SECTION 2: GAME CODE
 # ==============================================================================
 
 # --- Pygame Setup ---
+# Command line (only when run as a script): --autopilot for soak runs, --headless for no window at full speed
+cli_args = None
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description="Forest Fire")
+    parser.add_argument("--autopilot", action="store_true", help="Bot plays every level in a loop (soak test)")
+    parser.add_argument("--headless", action="store_true", help="No window, uncapped frame rate")
+    parser.add_argument("--level", type=int, action="append", help="Only soak these level ids (repeatable)")
+    parser.add_argument("--hours", type=float, default=0, help="Stop the soak after this long (0 = run until closed)")
+    def world_size(text):
+        try:
+            cols, rows = (int(v) for v in text.lower().split("x"))
+        except ValueError:
+            raise argparse.ArgumentTypeError(f"world size must be COLSxROWS, e.g. 120x66, got {text}")
+        if cols < 1 or rows < 1: raise argparse.ArgumentTypeError(f"world size must be at least 1x1, got {text}")
+        return cols, rows
+    parser.add_argument("--world", type=world_size, help="World size in tiles as COLSxROWS, e.g. 120x66 (default: one screen)")
+    parser.add_argument("--map-seed", type=int, help="Same map every round from this seed")
+    parser.add_argument("--dirty-rects", action="store_true", help="Present only the changed parts of the screen")
+    def display_scale(text):
+        value = float(text)
+        if not 1.0 <= value <= 8.0: raise argparse.ArgumentTypeError(f"scale must be between 1 and 8, got {text}")
+        return value
+    parser.add_argument("--scale", type=display_scale, help="Render at 1/SCALE of the screen resolution and scale up to the window: 2, 1.5, ...")
+    parser.add_argument("--fire-atlas", action="store_true", help="Start with the pre-baked flame atlas instead of fire particles")
+    cli_args = parser.parse_args()
+    if cli_args.headless:
+        os.environ["SDL_VIDEODRIVER"] = "dummy"
+        os.environ["SDL_AUDIODRIVER"] = "dummy"
+
 pygame.init()
 
 # --- Game Constants ---
@@ -108,8 +509,16 @@ UI_HEIGHT = 40
 
 # Grid system
 TILE_SIZE = 20
-GRID_WIDTH = SCREEN_WIDTH // TILE_SIZE
-GRID_HEIGHT = (SCREEN_HEIGHT - UI_HEIGHT) // TILE_SIZE 
+VIEW_WIDTH = SCREEN_WIDTH // TILE_SIZE # Tiles visible at once
+VIEW_HEIGHT = (SCREEN_HEIGHT - UI_HEIGHT) // TILE_SIZE
+WORLD_SIZE = None # (cols, rows) of the world, the camera scrolls when it's bigger than the view. None = one screen
+if cli_args and cli_args.world:
+    WORLD_SIZE = cli_args.world
+GRID_WIDTH = max(WORLD_SIZE[0], VIEW_WIDTH) if WORLD_SIZE else VIEW_WIDTH
+GRID_HEIGHT = max(WORLD_SIZE[1], VIEW_HEIGHT) if WORLD_SIZE else VIEW_HEIGHT
+CHUNK_SIZE = 8 # Tiles per side of a map chunk (unit of terrain caching and activity tracking)
+CHUNK_CACHE_LIMIT = 64 # Cached chunk terrain surfaces kept before the ones furthest from view are dropped
+CHUNK_PREFETCH_PER_FRAME = 2 # Chunks just outside the view drawn ahead of scrolling, per frame
 
 PLAYER_SIZE = 25
 GAME_DURATION_SEC = 60
@@ -119,7 +528,36 @@ LEVEL_1_FIRE_COUNT = 6
 FIRE_SPREAD_CHANCE = 0.25
 MAX_FIRE_PERCENTAGE = 0.5
 OBSTACLE_SPAWN_RATE_MS = 5000 
+FIRE_CLUSTER_SPAWN_MARGIN = 2 # Tiles between a newly spawned fire and the bounding box of existing fronts (when there is room)
+FIRE_INDEX_CELL = 4 # Side of one spatial index bucket in tiles (nearest fire / fires in radius queries)
+BROADPHASE_CELL = 64 # px. Cell size of the entity collision grid, at least the largest hitbox
+# Map generation (create_grid): share of the map per tile type, then firebreak paths on top
+MAP_SEED = None # None = new map every round
+if cli_args and cli_args.map_seed is not None: MAP_SEED = cli_args.map_seed
+MAP_TREE_FRACTION = 0.12
+MAP_DIRT_FRACTION = 0.06
+MAP_BUSH_FRACTION = 0.05
+MAP_FLOWER_FRACTION = 0.03
+MAP_FOREST_SCALE = 10 # Tiles. Feature size of the noise that forms forest stands and clearings
+MAP_FIREBREAK_SPACING = 30 # Tiles between firebreak paths (at least one across and one down)
+# Fire spread: a tile's chance to catch from one burning neighbour per spread tick is
+# FIRE_SPREAD_CHANCE x its fuel (TILE_FUEL), scaled by (1 + wind . direction of travel)
+FIRE_WIND = {} # Level id -> (x, y) wind in tiles, e.g. {7: (0.5, 0)} spreads 1.5x as fast east, 0.5x west. Missing = calm
+# Burn down: a burning tile smoulders for the last FIRE_SMOULDER_FRACTION of its burn time (no spread,
+# dimmer flames, can still be put out) and then burns out to BURNT_GROUND on its own
+# The levels where fire spreads; in the others it burns until put out. Levels 4 and 5 are only won by
+# putting the last fire out (extinguish_fire), a round that burns out on its own starts a new front
+FIRE_BURN_OUT_LEVELS = {4, 5, 6, 7, 8, 9}
+FIRE_BURN_TICK_MS = 250
+FIRE_SMOULDER_FRACTION = 0.3
+# Fire spread interval per level id (0 = fire does not spread)
+FIRE_SPREAD_INTERVAL_MS = {1: 0, 2: 0, 8: 3000, 9: 2000, 3: 0, 4: 2000, 5: 2000, 6: 2000, 7: 1500}
 PENALTY_DURATION_MS = 3000
+COUNTDOWN_DURATION_MS = 3000
+DAMAGE_COOLDOWN_MS = 2000
+WATER_POWERUP_DURATION_MS = 0   # 0 = lasts for the rest of the round
+SPEED_POWERUP_DURATION_MS = 0
+MAX_FRAME_DT_MS = 250           # Longer stalls are clamped so game time never jumps ahead in one step
 
 # ZOMBIE SETTINGS
 ZOMBIE_COUNT_NORMAL = 3 # Updated to 3
@@ -127,6 +565,13 @@ ZOMBIE_COUNT_PARKINSONS = 2 # Updated for Parkinsons Level 4
 ZOMBIE_SPEED = 1.5         
 PARKINSON_ZOMBIE_SPEED = 0.7 # Slower speed for Parkinson's mode
 FLAME_ZOMBIE_SPEED = 1.7   
+FLAME_ZOMBIE_COUNT = 2
+
+# AIM ASSIST SETTINGS (Spray steering for Parkinson's mode)
+AIM_ASSIST_ENABLED = True
+AIM_ASSIST_PARKINSONS_ONLY = True
+AIM_ASSIST_RANGE = 10       # Tiles. Fires further away are not steered to (the stream reaches ~12)
+AIM_ASSIST_MAX_ANGLE = 45   # Degrees off the facing direction the stream may be bent
 
 # --- Tile Types ---
 TILE_GRASS = 0
@@ -137,6 +582,11 @@ TILE_BUSH = 4
 TILE_FLOWERS = 5
 TILE_OBSTACLE = 6
 
+# Fuel per tile type (spread chance multiplier, 0 = does not catch)
+TILE_FUEL = {TILE_GRASS: 1.0, TILE_TREE: 1.6, BURNT_GROUND: 0.0, TILE_DIRT: 0.0, TILE_BUSH: 1.3, TILE_FLOWERS: 0.8}
+# Burn time per tile type in ms (flame zombies can set anything alight)
+TILE_BURN_MS = {TILE_GRASS: 10000, TILE_TREE: 25000, BURNT_GROUND: 2000, TILE_DIRT: 4000, TILE_BUSH: 15000, TILE_FLOWERS: 8000}
+
 # --- Colors ---
 BLACK = (0, 0, 0)
 WHITE = (255, 255, 255)
@@ -162,6 +612,7 @@ TREE_LEAVES_LIGHT = (124, 252, 0)
 TREE_LEAVES_MEDIUM = (34, 139, 34)
 TREE_LEAVES_DARK = (0, 100, 0)
 COLOR_BURNT_GROUND = (50, 50, 50)
+SMOULDER_COLORS = [(140, 40, 0), (110, 60, 20), (90, 90, 90)]
 WATER_BLUE = (173, 216, 230)
 DIRT_COLOR = (139, 69, 19)
 BUSH_COLOR_LIGHT = (0, 155, 0)
@@ -191,48 +642,242 @@ STATE_GAME_WON = 8
 STATE_PAUSED_MENU = 9
 STATE_GAME_PENALTY = 10 
 
-# --- Custom Pygame Events ---
-FIRE_SPREAD_EVENT = pygame.USEREVENT + 1
-OBSTACLE_SPAWN_EVENT = pygame.USEREVENT + 2
+# --- DEBUG / TELEMETRY SETTINGS ---
+DEBUG_OVERLAY_KEY = pygame.K_F3   # Toggles the debug overlay in game
+TELEMETRY_ENABLED = True
+TELEMETRY_LOG_FILE = "telemetry.jsonl"
+TELEMETRY_INTERVAL_SEC = 5        # Length of one latency window (histogram reset + log line)
+LATENCY_BUCKET_MS = 4             # Histogram bucket width
+LATENCY_BUCKET_COUNT = 16         # Last bucket collects everything above (BUCKET_COUNT-1) * BUCKET_MS
+
+# --- AUTOPILOT / SOAK SETTINGS ---
+AUTOPILOT_KEY = pygame.K_F9       # Toggles the autopilot in game
+AUTOPILOT_FLEE_DISTANCE = 90      # px. Closer zombies make the bot run instead of fighting fires
+AUTOPILOT_POWERUP_DISTANCE = 250  # px. Powerups within this range are picked up before the next fire
+AUTOPILOT_SPRAY_RANGE = 200       # px. Water stream reach the bot relies on (particles travel ~250px)
+AUTOPILOT_RESULT_SCREEN_MS = 1500 # How long win/lose screens stay up between soak rounds (0 when headless)
+SOAK_REPORT_INTERVAL_SEC = 60     # Frame time + memory line written to telemetry every window
+
+# --- MINIMAP SETTINGS ---
+MINIMAP_KEY = pygame.K_m          # Toggles the minimap in game (shown by default when the world is bigger than the screen)
+MINIMAP_MAX_SIZE = (200, 120)     # px. The world is scaled by the largest whole factor that fits
+MINIMAP_REFRESH_MS = 250          # Terrain and fire image rebuilt at most this often, markers move every frame
+
+# --- FIRE RENDERING SETTINGS ---
+FIRE_ATLAS_KEY = pygame.K_f       # Switches fire between particles and the pre-baked flame atlas in game
+FIRE_ATLAS_FRAMES = 8             # Animation frames per variant (ground / tree), the loop lasts FRAMES * FRAME_MS
+FIRE_ATLAS_FRAME_MS = 80
+FIRE_ATLAS_SPARK_CHANCE = 0.05    # Atlas mode: chance per burning tile and frame of one particle as an accent
+
+# --- DISPLAY SETTINGS ---
+DIRTY_RECTS = bool(cli_args and cli_args.dirty_rects) # display.update(changed rects) instead of display.flip() during play
+DIRTY_FULL_FLIP_FRACTION = 0.4    # Flip the whole screen once the dirty area passes this share of it
+DIRTY_CELL = 40                   # px. Particles mark the screen dirty in cells of this size
+DIRTY_MARGIN = 2                  # px added around every dirty rect (outlines, antialiasing)
+# The game draws into a render target 1 / DISPLAY_SCALE the size of SCREEN_WIDTH x SCREEN_HEIGHT, which
+# SDL scales up to the full size window (pygame.SCALED): fewer pixels to fill per frame, same game
+# coordinates (drawing goes through scaled() / scaled_rect()). 1 = render at the screen resolution
+DISPLAY_SCALE = cli_args.scale if cli_args and cli_args.scale else 1.0
+RENDER_SCALE = 1.0 / DISPLAY_SCALE
+RENDER_WIDTH = round(SCREEN_WIDTH * RENDER_SCALE)
+RENDER_HEIGHT = round(SCREEN_HEIGHT * RENDER_SCALE)
+
+# --- ASSET SETTINGS ---
+ASSET_CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "asset_cache") # Preprocessed assets (see AssetCache)
+ASSET_CACHE_VERSION = 2           # Bump when the way any asset is preprocessed changes
+BACKGROUND_FILENAME = "jungle_background.png"
+
+# Level Logic IDs -> (selected_mode_index, selected_level_index) as picked in the menus, in menu order
+LEVEL_MENU_INDEX = {1: (0, 0), 2: (0, 1), 8: (0, 2), 9: (0, 3), 3: (1, 0), 4: (1, 1), 5: (1, 2), 6: (1, 3), 7: (1, 4)}
 
 # --- Setup the Screen ---
-screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
+def open_display():
+    if DISPLAY_SCALE == 1:
+        return pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
+    # Whole multiples stay sharp with nearest sampling, fractional ones are filtered
+    os.environ.setdefault("SDL_RENDER_SCALE_QUALITY", "nearest" if DISPLAY_SCALE.is_integer() else "linear")
+    surface = pygame.display.set_mode((RENDER_WIDTH, RENDER_HEIGHT), pygame.SCALED)
+    try:
+        from pygame._sdl2.video import Window
+        Window.from_display_module().size = (SCREEN_WIDTH, SCREEN_HEIGHT)
+    except ImportError:
+        print("[DISPLAY] Window resizing not available, using the automatic SCALED size")
+    return surface
+
+def scaled(length):
+    # Game pixels -> render target pixels
+    return round(length * RENDER_SCALE)
+
+def scaled_line(width):
+    # Outline widths never drop below one pixel
+    return max(1, scaled(width))
+
+def scaled_point(point):
+    if RENDER_SCALE == 1: return point
+    return (round(point[0] * RENDER_SCALE), round(point[1] * RENDER_SCALE))
+
+def scaled_rect(rect):
+    # Rounds the edges rather than the size, so rects that touch still touch once scaled
+    rect = pygame.Rect(rect)
+    if RENDER_SCALE == 1: return rect
+    left, top = scaled(rect.left), scaled(rect.top)
+    return pygame.Rect(left, top, scaled(rect.right) - left, scaled(rect.bottom) - top)
+
+screen = open_display()
 pygame.display.set_caption("Forest Fire")
 clock = pygame.time.Clock()
 
+# --- Asset Cache ---
+class AssetCache:
+    # Preprocessed assets (images scaled for this screen, baked animations) stored as raw RGBA pixels
+    # under ASSET_CACHE_DIR. An entry is named after the asset, the render resolution,
+    # ASSET_CACHE_VERSION and a stamp of its source files, so any change makes a new entry and the old
+    # one for that resolution is deleted (entries for another --scale are kept). A warm load is a file
+    # read and a convert(): no PNG decoding or scaling. preload() reads entries in a background thread
+    # ahead of their first load().
+    def __init__(self, directory, version):
+        self.directory = directory
+        self.version = version
+        self.pending = {} # path -> thread reading the entry
+        self.data = {}    # path -> bytes read by a preload thread
+        self.hits = 0
+        self.misses = 0
+        self.load_ms = 0.0
+
+    def path(self, name, sources=()):
+        stamp = []
+        for source in sources:
+            try:
+                st = os.stat(source)
+                stamp.append((source, st.st_mtime_ns, st.st_size))
+            except OSError:
+                stamp.append((source, None))
+        key = zlib.crc32(repr(stamp).encode())
+        return os.path.join(self.directory, f"{name}-{RENDER_WIDTH}x{RENDER_HEIGHT}-v{self.version}-{key:08x}")
+
+    def preload(self, name, sources=()):
+        path = self.path(name, sources)
+        if path in self.pending: return
+
+        def read():
+            try:
+                with open(path + ".rgba", "rb") as f: self.data[path] = f.read()
+            except OSError:
+                pass # Not cached yet, load() builds it
+
+        thread = threading.Thread(target=read, daemon=True)
+        self.pending[path] = thread
+        thread.start()
+
+    def load(self, name, build, sources=()):
+        # build() -> (surface, meta) makes the asset when there is no entry. Returns (surface, meta)
+        start = time.perf_counter()
+        path = self.path(name, sources)
+        thread = self.pending.pop(path, None)
+        if thread: thread.join()
+        try:
+            data = self.data.pop(path, None)
+            if data is None:
+                with open(path + ".rgba", "rb") as f: data = f.read()
+            with open(path + ".json") as f: entry = json.load(f)
+            surface = pygame.image.frombuffer(data, tuple(entry["size"]), "RGBA")
+            surface = surface.convert_alpha() if entry["alpha"] else surface.convert()
+            self.hits += 1
+            meta = entry["meta"]
+        except (OSError, ValueError, KeyError, pygame.error):
+            surface, meta = build()
+            self.misses += 1
+            self.save(name, path, surface, meta)
+        self.load_ms += (time.perf_counter() - start) * 1000.0
+        return surface, meta
+
+    def save(self, name, path, surface, meta):
+        # Best effort, on a read-only install every start just builds the assets again
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            current = os.path.basename(path)
+            prefix = f"{name}-{RENDER_WIDTH}x{RENDER_HEIGHT}-"
+            for old in os.listdir(self.directory):
+                if old.startswith(prefix) and not old.startswith(current): os.remove(os.path.join(self.directory, old))
+            # Written under a per process name and renamed into place, so a reader (or another game
+            # process building the same entry) never sees half a file
+            tmp = f"{path}.{os.getpid()}.tmp"
+            with open(tmp, "w") as f:
+                json.dump({"size": surface.get_size(), "alpha": bool(surface.get_flags() & pygame.SRCALPHA), "meta": meta}, f)
+            os.replace(tmp, path + ".json")
+            with open(tmp, "wb") as f:
+                f.write(pygame.image.tostring(surface, "RGBA"))
+            os.replace(tmp, path + ".rgba")
+        except OSError as e:
+            print(f"[ASSETS] Cache not written: {e}")
+
+assets = AssetCache(ASSET_CACHE_DIR, ASSET_CACHE_VERSION)
+assets.preload("menu-background", (BACKGROUND_FILENAME,))
+
 # --- Font Loading ---
 FONT_FILENAME = "PressStart2P-Regular.ttf"
+FONT_TEXT_CACHE_LIMIT = 256 # Rendered strings kept per font before the cache starts over
 
 def load_font(custom_font_path, size):
+    # size is in screen pixels, the font is opened at the render target size so scaled text stays sharp
     try:
-        return pygame.font.Font(custom_font_path, size)
+        return pygame.font.Font(custom_font_path, scaled_line(size))
     except (pygame.error, FileNotFoundError):
         if size >= 40: default_size = 74
         elif size >= 25: default_size = 50
         elif size >= 15: default_size = 36
         else: default_size = 24
-        return pygame.font.Font(None, default_size)
+        return pygame.font.Font(None, scaled_line(default_size))
+
+class CachedFont:
+    # One font size with its rendered strings kept per (text, colour), so a HUD line that doesn't
+    # change is rendered once and then only blitted
+    def __init__(self, filename, size):
+        self.size = size
+        self.font = load_font(filename, size)
+        self.texts = {} # (text, color) -> rendered surface
+
+    def render(self, text, color):
+        key = (text, color)
+        text_obj = self.texts.get(key)
+        if text_obj is None:
+            if len(self.texts) >= FONT_TEXT_CACHE_LIMIT: self.texts.clear()
+            text_obj = self.texts[key] = self.font.render(text, True, color)
+        return text_obj
+
+    def draw(self, text, color, surface, x, y, center=False):
+        text_obj = self.render(text, color)
+        x, y = scaled_point((x, y))
+        text_rect = text_obj.get_rect(center=(x, y)) if center else text_obj.get_rect(topleft=(x, y))
+        surface.blit(text_obj, text_rect)
 
 # Fonts
-font_large = load_font(FONT_FILENAME, 40)
-font_huge = load_font(FONT_FILENAME, 75)
-font_medium = load_font(FONT_FILENAME, 28)
-font_small = load_font(FONT_FILENAME, 18) 
-font_menu_title = load_font(FONT_FILENAME, 24)
-font_menu_item = load_font(FONT_FILENAME, 18)
-font_menu_tiny = load_font(FONT_FILENAME, 12)
+font_large = CachedFont(FONT_FILENAME, 40)
+font_huge = CachedFont(FONT_FILENAME, 75)
+font_medium = CachedFont(FONT_FILENAME, 28)
+font_small = CachedFont(FONT_FILENAME, 18) 
+font_menu_title = CachedFont(FONT_FILENAME, 24)
+font_menu_item = CachedFont(FONT_FILENAME, 18)
+font_menu_tiny = CachedFont(FONT_FILENAME, 12)
 
 # Fire Particle Surface
-fire_particle_surface = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT), pygame.SRCALPHA)
+fire_particle_surface = pygame.Surface((RENDER_WIDTH, RENDER_HEIGHT), pygame.SRCALPHA)
+fire_layer_rects = [] # Screen rects of the particle layer blended last frame, cleared before the next one
+
+# Camera: world pixel offset of the view. World pixels keep the screen layout (the map starts at
+# y = UI_HEIGHT), so a one screen world has the camera fixed at (0, 0).
+camera_x = 0
+camera_y = 0
+VIEW_PIXEL_WIDTH = VIEW_WIDTH * TILE_SIZE
+VIEW_PIXEL_HEIGHT = VIEW_HEIGHT * TILE_SIZE
+WORLD_PIXEL_WIDTH = GRID_WIDTH * TILE_SIZE
+WORLD_PIXEL_HEIGHT = GRID_HEIGHT * TILE_SIZE
 
 # --- Game Variables ---
 game_state = STATE_START_MENU
 score = 0
 high_score = 0
-game_start_time = 0
-pause_start_time = 0
-penalty_start_time = 0 
-total_paused_time = 0
+countdown_start_time = 0 # level_clock time the current 3-2-1 / STUCK! countdown began
 time_remaining = GAME_DURATION_SEC
 current_level_id = 1 
 
@@ -247,83 +892,807 @@ player_skin_color = PLAYER_SKIN_WHITE
 player_helmet_color = PLAYER_HELMET_BLUE
 player_direction = 'down'
 player_lives = 3
-last_damage_time = 0 
+invulnerable = False # True for DAMAGE_COOLDOWN_MS after a zombie hit
 
-has_water_powerup = False 
-has_speed_powerup = False
 
-game_grid = []
-fire_tiles = set()
+game_grid = np.zeros((GRID_HEIGHT, GRID_WIDTH), dtype=np.int8) # Tile type per [y, x]
+map_seed = None
 obstacle_tiles = set() 
 total_tiles = GRID_WIDTH * GRID_HEIGHT
 
-water_particles = []
 fire_particles = []
-zombies = [] 
-flame_zombies = [] # Changed to list for multiple flame zombies
-
-water_powerup_rect = None 
-speed_powerup_rect = None # New Speed Powerup
-heart_powerup_rect = None # New Heart Powerup
 
 # Menu Navigation Timers (for Joystick Debounce)
 last_menu_move_time = 0
 MENU_MOVE_DELAY = 200 # milliseconds
+JOYSTICK_DIRECTION_HYSTERESIS = 1.25 # Other axis must be this much stronger before the facing direction switches axis
+calibration_player_index = None # Player whose movement stick is being calibrated
 
-try:
-    jungle_background_image = pygame.image.load(os.path.join('jungle_background.png')).convert()
-    jungle_background_image = pygame.transform.scale(jungle_background_image, (SCREEN_WIDTH, SCREEN_HEIGHT - UI_HEIGHT))
-except (pygame.error, FileNotFoundError):
-    jungle_background_image = None
+show_debug_overlay = False
+autopilot_enabled = False
+show_minimap = GRID_WIDTH > VIEW_WIDTH or GRID_HEIGHT > VIEW_HEIGHT
+fire_atlas_enabled = bool(cli_args and cli_args.fire_atlas) # Flames from the pre-baked atlas instead of particles (FIRE_ATLAS_KEY)
+aim_assist_active = False # Set per round from AIM_ASSIST_ENABLED / AIM_ASSIST_PARKINSONS_ONLY
+
+# --- Telemetry & Input Latency ---
+
+class TelemetryLog:
+    # Append-only JSON lines file, opened on first write
+    def __init__(self, path):
+        self.path = path
+        self.file = None
+
+    def write(self, event, **fields):
+        if not TELEMETRY_ENABLED: return
+        try:
+            if self.file is None:
+                self.file = open(self.path, "a")
+            record = {"time": round(time.time(), 3), "event": event}
+            record.update(fields)
+            self.file.write(json.dumps(record) + "\n")
+            self.file.flush()
+        except OSError as e:
+            print(f"[TELEMETRY] Disabled, cannot write {self.path}: {e}")
+            self.file = None
+
+class LatencyHistogram:
+    def __init__(self):
+        self.counts = [0] * LATENCY_BUCKET_COUNT
+        self.samples = []
+
+    def add(self, ms):
+        index = min(int(ms // LATENCY_BUCKET_MS), LATENCY_BUCKET_COUNT - 1)
+        self.counts[index] += 1
+        self.samples.append(ms)
+
+    def percentile(self, p):
+        if not self.samples: return 0.0
+        ordered = sorted(self.samples)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * p / 100.0))]
+
+    def summary(self):
+        if not self.samples:
+            return {"n": 0, "mean": 0.0, "p50": 0.0, "p95": 0.0, "max": 0.0, "hist": self.counts[:]}
+        return {
+            "n": len(self.samples),
+            "mean": round(sum(self.samples) / len(self.samples), 2),
+            "p50": round(self.percentile(50), 2),
+            "p95": round(self.percentile(95), 2),
+            "max": round(max(self.samples), 2),
+            "hist": self.counts[:],
+        }
+
+class InputLatencyTracker:
+    # Three timestamps per frame: input sampled -> input consumed by movement -> display.flip()
+    STAGES = ["sample_to_consume", "consume_to_flip", "sample_to_flip"]
+
+    def __init__(self, telemetry):
+        self.telemetry = telemetry
+        self.histograms = {name: LatencyHistogram() for name in self.STAGES}
+        self.pending = None
+        self.frame_count = 0
+        self.window_start = time.perf_counter()
+        self.last_summary = {}
+        self.last_fps = 0.0
+        self.extra_stats = None # Optional callable adding fields to each window (input pipeline stats)
+        self.last_extra = {}
+
+    def consume(self, sample_time):
+        if sample_time > 0:
+            self.pending = (sample_time, time.perf_counter())
+
+    def flip(self):
+        now = time.perf_counter()
+        self.frame_count += 1
+
+        if self.pending:
+            sample_time, consume_time = self.pending
+            self.histograms["sample_to_consume"].add((consume_time - sample_time) * 1000.0)
+            self.histograms["consume_to_flip"].add((now - consume_time) * 1000.0)
+            self.histograms["sample_to_flip"].add((now - sample_time) * 1000.0)
+            self.pending = None
+
+        elapsed = now - self.window_start
+        if elapsed >= TELEMETRY_INTERVAL_SEC:
+            self.last_fps = self.frame_count / elapsed
+            self.last_summary = {name: h.summary() for name, h in self.histograms.items()}
+            self.last_extra = self.extra_stats() if self.extra_stats else {}
+            self.telemetry.write("input_latency", fps=round(self.last_fps, 1), bucket_ms=LATENCY_BUCKET_MS, **self.last_summary, **self.last_extra)
+
+            self.histograms = {name: LatencyHistogram() for name in self.STAGES}
+            self.frame_count = 0
+            self.window_start = now
+
+# --- Game Time & Scheduler ---
+
+class GameClock:
+    # Simulation time in ms. Only moves when advance() is called and the clock isn't paused,
+    # so it follows frames (or headless steps), not the wall clock.
+    def __init__(self):
+        self.now_ms = 0.0
+        self.paused = False
+
+    def reset(self):
+        self.now_ms = 0.0
+        self.paused = False
+
+    def advance(self, dt_ms):
+        if not self.paused:
+            self.now_ms += dt_ms
+
+    def pause(self):
+        self.paused = True
+
+    def resume(self):
+        self.paused = False
+
+class Scheduler:
+    # Priority queue of callbacks due at clock times. Repeating tasks are re-queued
+    # from their due time (not from "now") so a slow frame runs every missed tick.
+    def __init__(self, clock):
+        self.clock = clock
+        self.queue = []
+        self.counter = 0 # Tie-breaker, keeps same-time callbacks in scheduling order
+
+    def schedule(self, delay_ms, callback, interval_ms=0):
+        task = [callback, interval_ms, True] # [callback, repeat interval, active]
+        self.counter += 1
+        heapq.heappush(self.queue, (self.clock.now_ms + delay_ms, self.counter, task))
+        return task
+
+    def cancel(self, task):
+        if task: task[2] = False
+
+    def clear(self):
+        self.queue = []
+
+    def update(self):
+        while self.queue and self.queue[0][0] <= self.clock.now_ms:
+            due, _, task = heapq.heappop(self.queue)
+            if not task[2]: continue
+            if task[1] > 0:
+                self.counter += 1
+                heapq.heappush(self.queue, (due + task[1], self.counter, task))
+            task[0]()
+
+# level_clock runs for the whole round (countdowns, blinking), game_clock stops during countdowns
+level_clock = GameClock()
+game_clock = GameClock()
+level_scheduler = Scheduler(level_clock)
+game_scheduler = Scheduler(game_clock)
+
+# --- Fire Clusters ---
+
+class FireClusters:
+    # Connected burning areas ("fronts", 4-neighbour like the spread) tracked with union-find.
+    # Igniting unions the tile with its burning neighbours. Extinguishing checks the 8 tiles around
+    # it: if its burning neighbours still touch each other the cluster just shrinks, otherwise only
+    # that cluster is flood-filled again since it may have split.
+    # Owns the burning tile set: fire_tiles is this same set and is only changed through here.
+    NEIGHBOURS = [(-1, 0), (1, 0), (0, -1), (0, 1)]
+    RING = [(1, 0), (1, 1), (0, 1), (-1, 1), (-1, 0), (-1, -1), (0, -1), (1, -1)] # Around a tile, orthogonal at even indexes
+
+    def __init__(self):
+        self.tiles = set()
+        self.node = {}     # burning tile -> union-find node id
+        self.parent = {}   # node id -> parent node id (nodes of extinguished tiles stay as inner nodes until compacted)
+        self.size = {}     # root -> burning tile count
+        self.bounds = {}   # root -> [min_x, min_y, max_x, max_y]
+        self.anchor = {}   # root -> one burning tile of the cluster
+        self.stale = set() # Roots whose bounds may be too large since an edge tile went out
+        self.next_id = 0
+
+    def clear(self):
+        self.tiles.clear()
+        self.node.clear()
+        self.parent.clear()
+        self.size.clear()
+        self.bounds.clear()
+        self.anchor.clear()
+        self.stale.clear()
+        self.next_id = 0
+
+    def find(self, n):
+        root = n
+        while self.parent[root] != root:
+            root = self.parent[root]
+        while self.parent[n] != root: # Path compression
+            self.parent[n], n = root, self.parent[n]
+        return root
+
+    def union(self, root_a, root_b):
+        if root_a == root_b: return root_a
+        if self.size[root_a] < self.size[root_b]:
+            root_a, root_b = root_b, root_a
+        self.parent[root_b] = root_a
+        self.size[root_a] += self.size.pop(root_b)
+        box_a, box_b = self.bounds[root_a], self.bounds.pop(root_b)
+        self.bounds[root_a] = [min(box_a[0], box_b[0]), min(box_a[1], box_b[1]), max(box_a[2], box_b[2]), max(box_a[3], box_b[3])]
+        del self.anchor[root_b]
+        if root_b in self.stale:
+            self.stale.discard(root_b)
+            self.stale.add(root_a)
+        return root_a
+
+    def drop(self, root):
+        del self.size[root]
+        del self.bounds[root]
+        del self.anchor[root]
+        self.stale.discard(root)
+
+    def add(self, tile):
+        if tile in self.tiles: return
+        x, y = tile
+        n = self.next_id
+        self.next_id += 1
+        self.tiles.add(tile)
+        self.node[tile] = n
+        self.parent[n] = n
+        self.size[n] = 1
+        self.bounds[n] = [x, y, x, y]
+        self.anchor[n] = tile
+        root = n
+        for dx, dy in self.NEIGHBOURS:
+            other = self.node.get((x + dx, y + dy))
+            if other is not None:
+                root = self.union(root, self.find(other))
+
+    def local_pieces(self, x, y):
+        # Burning orthogonal neighbours that are not connected to each other through the ring of 8 tiles
+        ring = [(x + dx, y + dy) in self.tiles for dx, dy in self.RING]
+        burning = 0
+        pieces = 0
+        for i in range(0, 8, 2):
+            if ring[i]:
+                burning += 1
+                if not (ring[i - 1] and ring[i - 2]): pieces += 1
+        if burning and not pieces: pieces = 1 # All four joined all the way round
+        return pieces
+
+    def remove(self, tile):
+        if tile not in self.tiles: return
+        self.tiles.remove(tile)
+        root = self.find(self.node.pop(tile))
+        x, y = tile
+
+        if self.local_pieces(x, y) <= 1:
+            # Can't have split: shrink the cluster, the tile's node stays behind as an inner node
+            self.size[root] -= 1
+            if self.size[root] == 0:
+                self.drop(root)
+            else:
+                if self.anchor[root] == tile:
+                    self.anchor[root] = next((x + dx, y + dy) for dx, dy in self.NEIGHBOURS if (x + dx, y + dy) in self.tiles)
+                box = self.bounds[root]
+                if x == box[0] or x == box[2] or y == box[1] or y == box[3]:
+                    self.stale.add(root)
+        else:
+            # Flood fill from each burning neighbour: one new cluster per piece the old one split into
+            self.drop(root)
+            seen = set()
+            for dx, dy in self.NEIGHBOURS:
+                start = (x + dx, y + dy)
+                if start in self.tiles and start not in seen:
+                    self.relabel(start, seen)
+
+        if len(self.parent) > 2 * len(self.tiles) + 256:
+            self.compact()
+
+    def relabel(self, start, seen):
+        root = self.node[start]
+        seen.add(start)
+        stack = [start]
+        count = 0
+        box = [start[0], start[1], start[0], start[1]]
+        while stack:
+            tile = stack.pop()
+            self.parent[self.node[tile]] = root
+            count += 1
+            x, y = tile
+            if x < box[0]: box[0] = x
+            elif x > box[2]: box[2] = x
+            if y < box[1]: box[1] = y
+            elif y > box[3]: box[3] = y
+            for dx, dy in self.NEIGHBOURS:
+                n = (x + dx, y + dy)
+                if n in self.tiles and n not in seen:
+                    seen.add(n)
+                    stack.append(n)
+        self.size[root] = count
+        self.bounds[root] = box
+        self.anchor[root] = start
+
+    def compact(self):
+        # Forget the inner nodes of extinguished tiles by labelling every cluster from scratch
+        self.parent = {n: n for n in self.node.values()}
+        self.size.clear()
+        self.bounds.clear()
+        self.anchor.clear()
+        self.stale.clear()
+        seen = set()
+        for tile in self.tiles:
+            if tile not in seen:
+                self.relabel(tile, seen)
+
+    def refresh_bounds(self):
+        for root in list(self.stale):
+            start = self.anchor[root]
+            self.drop(root)
+            self.relabel(start, set())
+
+    def count(self):
+        return len(self.size)
+
+    def largest(self):
+        return max(self.size.values()) if self.size else 0
+
+    def clusters(self):
+        # [(size, (min_x, min_y, max_x, max_y)), ...], largest first
+        self.refresh_bounds()
+        return sorted(((self.size[root], tuple(self.bounds[root])) for root in self.size), reverse=True)
+
+    def is_clear(self, x, y, margin=FIRE_CLUSTER_SPAWN_MARGIN):
+        # True when (x, y) is more than margin tiles outside every cluster's bounding box
+        self.refresh_bounds()
+        for box in self.bounds.values():
+            if box[0] - margin <= x <= box[2] + margin and box[1] - margin <= y <= box[3] + margin:
+                return False
+        return True
+
+class FireIndex:
+    # Burning tiles bucketed into FIRE_INDEX_CELL x FIRE_INDEX_CELL blocks, for nearest fire and
+    # fires-in-radius queries without scanning every burning tile. Positions are in tile units.
+    def __init__(self):
+        self.cells = {}
+
+    def clear(self):
+        self.cells.clear()
+
+    def add(self, tile):
+        key = (tile[0] // FIRE_INDEX_CELL, tile[1] // FIRE_INDEX_CELL)
+        cell = self.cells.get(key)
+        if cell is None:
+            self.cells[key] = cell = set()
+        cell.add(tile)
+
+    def remove(self, tile):
+        key = (tile[0] // FIRE_INDEX_CELL, tile[1] // FIRE_INDEX_CELL)
+        cell = self.cells.get(key)
+        if cell is not None:
+            cell.discard(tile)
+            if not cell: del self.cells[key]
+
+    def within(self, x, y, radius):
+        # Tiles whose centre is at most radius tiles from (x, y)
+        found = []
+        r2 = radius * radius
+        for cy in range(int((y - radius) // FIRE_INDEX_CELL), int((y + radius) // FIRE_INDEX_CELL) + 1):
+            for cx in range(int((x - radius) // FIRE_INDEX_CELL), int((x + radius) // FIRE_INDEX_CELL) + 1):
+                for tile in self.cells.get((cx, cy), ()):
+                    if (tile[0] + 0.5 - x) ** 2 + (tile[1] + 0.5 - y) ** 2 <= r2:
+                        found.append(tile)
+        return found
+
+    def in_rect(self, x0, y0, x1, y1):
+        # Tiles with x0 <= x < x1 and y0 <= y < y1
+        found = []
+        for cy in range(y0 // FIRE_INDEX_CELL, (y1 - 1) // FIRE_INDEX_CELL + 1):
+            for cx in range(x0 // FIRE_INDEX_CELL, (x1 - 1) // FIRE_INDEX_CELL + 1):
+                for tile in self.cells.get((cx, cy), ()):
+                    if x0 <= tile[0] < x1 and y0 <= tile[1] < y1:
+                        found.append(tile)
+        return found
+
+    def nearest(self, x, y, max_radius=None):
+        # Searches square rings of buckets outwards, stopping once a ring can't hold anything closer
+        if not self.cells: return None
+        home_x, home_y = int(x // FIRE_INDEX_CELL), int(y // FIRE_INDEX_CELL)
+        best, best_d2 = None, float("inf")
+        limit = float("inf") if max_radius is None else max_radius * max_radius
+        if len(self.cells) <= 8: # A few scattered fires: checking them all beats walking empty rings
+            for cell in self.cells.values():
+                for tile in cell:
+                    d2 = (tile[0] + 0.5 - x) ** 2 + (tile[1] + 0.5 - y) ** 2
+                    if d2 < best_d2 and d2 <= limit:
+                        best, best_d2 = tile, d2
+            return best
+        for ring in range(max(GRID_WIDTH, GRID_HEIGHT) // FIRE_INDEX_CELL + 2):
+            closest = max(0, ring - 1) * FIRE_INDEX_CELL # Nearest a tile in this ring can be
+            if closest * closest > min(best_d2, limit): break
+            for cy in range(home_y - ring, home_y + ring + 1):
+                step = 1 if cy in (home_y - ring, home_y + ring) else 2 * ring # Only the ring's border
+                for cx in range(home_x - ring, home_x + ring + 1, max(step, 1)):
+                    for tile in self.cells.get((cx, cy), ()):
+                        d2 = (tile[0] + 0.5 - x) ** 2 + (tile[1] + 0.5 - y) ** 2
+                        if d2 < best_d2 and d2 <= limit:
+                            best, best_d2 = tile, d2
+        return best
+
+class ChunkGrid:
+    # The map split into CHUNK_SIZE x CHUNK_SIZE tile blocks. Every chunk caches its terrain as a
+    # surface that is only redrawn after one of its tiles changed, and tracks whether fire particles
+    # can be in it (effects). Only those chunks of the fire particle layer are cleared and blended.
+    # Spread, burning and emission already only visit burning tiles, so they need no chunk gate.
+    EMBER_FRAMES = 40 # Fire particles live at most this many frames after the last fire in a chunk
+
+    def __init__(self, width, height):
+        self.cols = (width + CHUNK_SIZE - 1) // CHUNK_SIZE
+        self.rows = (height + CHUNK_SIZE - 1) // CHUNK_SIZE
+        self.fire_count = np.zeros((self.rows, self.cols), dtype=np.int32)
+        self.embers = np.zeros((self.rows, self.cols), dtype=np.int32) # Frames of particle activity left
+        self.effects = np.zeros((self.rows, self.cols), dtype=bool)    # Chunks the particle layer may cover
+        self.dirty = np.ones((self.rows, self.cols), dtype=bool)       # Terrain cache needs a redraw
+        self.surfaces = {}
+        self.redraws = 0 # Terrain chunk redraws since the last take_redraws()
+
+    def add_fire(self, x, y):
+        self.fire_count[y // CHUNK_SIZE, x // CHUNK_SIZE] += 1
+
+    def remove_fire(self, x, y):
+        self.fire_count[y // CHUNK_SIZE, x // CHUNK_SIZE] -= 1
+
+    def clear_fire(self):
+        self.fire_count[:] = 0
+
+    def mark_dirty(self, x, y):
+        self.dirty[y // CHUNK_SIZE, x // CHUNK_SIZE] = True
+
+    def mark_all_dirty(self):
+        self.dirty[:] = True
+
+    def pixel_rect(self, cx, cy, width=1):
+        # World rect of width chunks starting at (cx, cy), cut to the map edge
+        x = cx * CHUNK_SIZE * TILE_SIZE
+        y = cy * CHUNK_SIZE * TILE_SIZE
+        w = min((cx + width) * CHUNK_SIZE, GRID_WIDTH) * TILE_SIZE - x
+        h = min((cy + 1) * CHUNK_SIZE, GRID_HEIGHT) * TILE_SIZE - y
+        return pygame.Rect(x, y + UI_HEIGHT, w, h)
+
+    def chunk_range(self, rect):
+        # (cx0, cy0, cx1, cy1) of the chunks overlapping a world pixel rect
+        size = CHUNK_SIZE * TILE_SIZE
+        cx0 = max(0, rect.left // size)
+        cy0 = max(0, (rect.top - UI_HEIGHT) // size)
+        cx1 = min(self.cols, (rect.right - 1) // size + 1)
+        cy1 = min(self.rows, (rect.bottom - UI_HEIGHT - 1) // size + 1)
+        return cx0, cy0, cx1, cy1
+
+    def rects(self, mask, area):
+        # World rects covering the set chunks inside area (a chunk_range), joined into runs along each row
+        cx0, cy0, cx1, cy1 = area
+        rects = []
+        for cy in range(cy0, cy1):
+            row = mask[cy]
+            cx = cx0
+            while cx < cx1:
+                if row[cx]:
+                    start = cx
+                    while cx < cx1 and row[cx]: cx += 1
+                    rects.append(self.pixel_rect(start, cy, cx - start))
+                else:
+                    cx += 1
+        return rects
+
+    def update(self):
+        # Once per frame
+        np.subtract(self.embers, 1, out=self.embers)
+        np.maximum(self.embers, 0, out=self.embers)
+        self.embers[self.fire_count > 0] = self.EMBER_FRAMES
+        # Particles drift up to 60px and spread sideways from their tile, so one chunk around
+        # every chunk that had fire recently covers them
+        hot = self.embers > 0
+        effects = hot.copy()
+        effects[1:, :] |= hot[:-1, :]
+        effects[:-1, :] |= hot[1:, :]
+        effects[:, 1:] |= effects[:, :-1].copy()
+        effects[:, :-1] |= effects[:, 1:].copy()
+        self.effects = effects
+
+    def take_redraws(self):
+        count = self.redraws
+        self.redraws = 0
+        return count
+
+fire_clusters = FireClusters()
+fire_index = FireIndex()
+chunks = ChunkGrid(GRID_WIDTH, GRID_HEIGHT)
+fire_tiles = fire_clusters.tiles # Read-only view for the rest of the game, changed through the functions below
+# Same tiles as a [y, x] array for batched lookups. It is the inside of a mask with a one tile
+# border that never burns, so off-map positions can be clipped onto the border instead of filtered.
+fire_mask_padded = np.zeros((GRID_HEIGHT + 2, GRID_WIDTH + 2), dtype=bool)
+fire_mask = fire_mask_padded[1:-1, 1:-1]
+# Burn lifecycle per [y, x], only meaningful where fire_mask is set
+burn_left_ms = np.zeros((GRID_HEIGHT, GRID_WIDTH), dtype=np.float32)
+smoulder_below_ms = np.zeros((GRID_HEIGHT, GRID_WIDTH), dtype=np.float32) # Smoulders once burn_left_ms drops to this
+smoulder_mask = np.zeros((GRID_HEIGHT, GRID_WIDTH), dtype=bool)
+burnt_out_count = 0 # Tiles lost to fire that burned down on its own this round
+
+# Spread probabilities: spread_probability[d] is the chance a tile catches in one spread tick from a
+# burning neighbour behind it, i.e. fire travelling in SPREAD_DIRECTIONS[d]. Padded the same way as fire_mask_padded.
+# Rebuilt when the map or wind changes, patched per tile on set_tile / obstacle changes.
+SPREAD_DIRECTIONS = [(-1, 0), (1, 0), (0, -1), (0, 1)]
+SPREAD_DX = np.array([dx for dx, dy in SPREAD_DIRECTIONS])
+SPREAD_DY = np.array([dy for dx, dy in SPREAD_DIRECTIONS])
+SPREAD_INDEX = np.arange(len(SPREAD_DIRECTIONS))
+spread_probability = np.zeros((len(SPREAD_DIRECTIONS), GRID_HEIGHT + 2, GRID_WIDTH + 2))
+wind_factors = np.ones(len(SPREAD_DIRECTIONS))
+fire_wind = (0, 0)
+fire_rng = np.random.default_rng() # Reseeded from random in create_grid
+particle_rng = random.Random() # Fire particles are only drawn, so they never take numbers from the game's random
+
+def tile_spread_chance(tile_type):
+    return FIRE_SPREAD_CHANCE * TILE_FUEL.get(int(tile_type), 0.0)
+
+def update_spread_probabilities():
+    chance = np.array([tile_spread_chance(t) for t in range(TILE_OBSTACLE + 1)])[game_grid]
+    if obstacle_tiles:
+        xs, ys = zip(*obstacle_tiles)
+        chance[ys, xs] = 0.0
+    for d, factor in enumerate(wind_factors):
+        np.clip(chance * factor, 0.0, 1.0, out=spread_probability[d, 1:-1, 1:-1])
+
+def update_spread_probability(x, y):
+    chance = 0.0 if (x, y) in obstacle_tiles else tile_spread_chance(game_grid[y, x])
+    spread_probability[:, y + 1, x + 1] = np.clip(chance * wind_factors, 0.0, 1.0)
+
+def set_wind(wind):
+    global fire_wind
+    fire_wind = wind
+    wind_factors[:] = [max(0.0, 1.0 + dx * wind[0] + dy * wind[1]) for dx, dy in SPREAD_DIRECTIONS]
+    update_spread_probabilities()
+
+def ignite_tile(tile):
+    if tile in fire_tiles: return
+    fire_clusters.add(tile)
+    fire_index.add(tile)
+    fire_mask[tile[1], tile[0]] = True
+    chunks.add_fire(tile[0], tile[1])
+    burn_ms = TILE_BURN_MS.get(int(game_grid[tile[1], tile[0]]), 0)
+    burn_left_ms[tile[1], tile[0]] = burn_ms
+    smoulder_below_ms[tile[1], tile[0]] = burn_ms * FIRE_SMOULDER_FRACTION
+
+def remove_fire_tile(tile):
+    if tile not in fire_tiles: return
+    fire_clusters.remove(tile)
+    fire_index.remove(tile)
+    fire_mask[tile[1], tile[0]] = False
+    smoulder_mask[tile[1], tile[0]] = False
+    chunks.remove_fire(tile[0], tile[1])
+
+def clear_fire_tiles():
+    fire_clusters.clear()
+    fire_index.clear()
+    fire_mask[:] = False
+    smoulder_mask[:] = False
+    chunks.clear_fire()
+
+def burn_tick():
+    # Counts down every burning tile's fuel at once; tiles past their smoulder point stop spreading,
+    # tiles out of fuel burn out
+    global burnt_out_count
+    if not fire_tiles: return
+    np.subtract(burn_left_ms, FIRE_BURN_TICK_MS, out=burn_left_ms, where=fire_mask)
+    np.less_equal(burn_left_ms, smoulder_below_ms, out=smoulder_mask)
+    np.logical_and(smoulder_mask, fire_mask, out=smoulder_mask)
+    ys, xs = np.nonzero(fire_mask & (burn_left_ms <= 0))
+    for x, y in zip(xs.tolist(), ys.tolist()):
+        remove_fire_tile((x, y))
+        set_tile(x, y, BURNT_GROUND)
+    burnt_out_count += len(xs)
+
+def set_tile(x, y, tile_type):
+    game_grid[y, x] = tile_type
+    chunks.mark_dirty(x, y)
+    update_spread_probability(x, y)
+
+def add_obstacle(tile):
+    obstacle_tiles.add(tile)
+    chunks.mark_dirty(tile[0], tile[1])
+    update_spread_probability(tile[0], tile[1])
+
+def remove_obstacle(tile):
+    obstacle_tiles.discard(tile)
+    chunks.mark_dirty(tile[0], tile[1])
+    update_spread_probability(tile[0], tile[1])
+
+# --- Water Particles ---
+
+class WaterParticles:
+    # Every live water particle as parallel arrays (position, velocity, frames left), so a frame's
+    # movement and hit test run as a handful of numpy operations instead of a loop per particle
+    def __init__(self, capacity=256):
+        self.pos = np.zeros((capacity, 2))
+        self.vel = np.zeros((capacity, 2))
+        self.life = np.zeros(capacity, dtype=np.int32)
+        self.count = 0
+
+    def __len__(self):
+        return self.count
+
+    def clear(self):
+        self.count = 0
+
+    def add(self, x, y, dx, dy, lifetime):
+        if self.count == len(self.life):
+            self.pos = np.concatenate([self.pos, np.zeros_like(self.pos)])
+            self.vel = np.concatenate([self.vel, np.zeros_like(self.vel)])
+            self.life = np.concatenate([self.life, np.zeros_like(self.life)])
+        i = self.count
+        self.pos[i] = (x, y)
+        self.vel[i] = (dx, dy)
+        self.life[i] = lifetime
+        self.count += 1
+
+    def step(self):
+        # Moves everything one frame. Returns (start, end) pixel positions of the moved particles.
+        n = self.count
+        start = self.pos[:n].copy()
+        self.pos[:n] += self.vel[:n]
+        self.life[:n] -= 1
+        return start, self.pos[:n]
+
+    def remove_expired(self):
+        n = self.count
+        if self.life[:n].min() > 0: return
+        alive = np.flatnonzero(self.life[:n] > 0)
+        self.count = len(alive)
+        self.pos[:self.count] = self.pos[alive]
+        self.vel[:self.count] = self.vel[alive]
+        self.life[:self.count] = self.life[alive]
+
+water_particles = WaterParticles()
+
+def swept_fire_hits(start, end):
+    # Burning tiles crossed by each particle's segment this frame (start/end in pixels). The tile a
+    # particle ends in is a plain lookup; segments that cross more than one tile border (diagonal
+    # corners, fast particles) are walked tile by tile with a DDA (Amanatides & Woo), all at once.
+    # Returns unique (xs, ys) tile arrays.
+    offset = (0, UI_HEIGHT)
+    p0 = (start - offset) / TILE_SIZE
+    p1 = (end - offset) / TILE_SIZE
+    i0 = np.floor(p0).astype(np.int64)
+    i1 = np.floor(p1).astype(np.int64)
+    xs, ys = [i1[:, 0]], [i1[:, 1]]
+
+    walk = np.flatnonzero(np.abs(i1 - i0).sum(axis=1) > 1)
+    if len(walk):
+        start_p, d = p0[walk], p1[walk] - p0[walk]
+        tile, end_tile = i0[walk], i1[walk]
+        step = np.sign(d).astype(np.int64)
+        # Segment fraction until the next tile border on each axis, and between borders
+        # (inf / nan on an axis that doesn't move, which is never picked below)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            t_max = (tile + (step > 0) - start_p) / d
+            t_delta = np.abs(1.0 / d)
+        remaining = np.abs(end_tile - tile).sum(axis=1)
+        for k in range(int(remaining.max()) - 1): # The last step lands on the end tile, already listed
+            active = remaining > k + 1
+            need = tile != end_tile
+            # Cross whichever border comes first (floor() of the end point decides when an axis is done)
+            go_x = active & need[:, 0] & (~need[:, 1] | (t_max[:, 0] < t_max[:, 1]))
+            go_y = active & ~go_x
+            tile[go_x, 0] += step[go_x, 0]
+            t_max[go_x, 0] += t_delta[go_x, 0]
+            tile[go_y, 1] += step[go_y, 1]
+            t_max[go_y, 1] += t_delta[go_y, 1]
+            xs.append(tile[active, 0])
+            ys.append(tile[active, 1])
+
+    xs = np.concatenate(xs) if len(xs) > 1 else xs[0]
+    ys = np.concatenate(ys) if len(ys) > 1 else ys[0]
+    burning = fire_mask_padded[np.clip(ys + 1, 0, GRID_HEIGHT + 1), np.clip(xs + 1, 0, GRID_WIDTH + 1)]
+    xs, ys = xs[burning], ys[burning]
+    if len(xs) > 1:
+        keys = np.unique(ys * GRID_WIDTH + xs)
+        xs, ys = keys % GRID_WIDTH, keys // GRID_WIDTH
+    return xs, ys
+
+telemetry = TelemetryLog(TELEMETRY_LOG_FILE)
+latency_tracker = InputLatencyTracker(telemetry)
+keyboard_sample_time = 0.0
+
+jungle_background_image = False # Loaded on the first menu frame (already read from the cache in the background), None = no image
+
+def build_menu_background():
+    image = pygame.image.load(BACKGROUND_FILENAME).convert()
+    return pygame.transform.scale(image, scaled_rect((0, UI_HEIGHT, SCREEN_WIDTH, SCREEN_HEIGHT - UI_HEIGHT)).size), {}
 
 # --- Helper Functions ---
 
 def draw_text(text, font, color, surface, x, y, center=False):
-    text_obj = font.render(text, True, color)
-    text_rect = text_obj.get_rect()
-    if center:
-        text_rect.center = (x, y)
-    else:
-        text_rect.topleft = (x, y)
-    surface.blit(text_obj, text_rect)
-
-def create_grid():
-    global game_grid, fire_tiles, obstacle_tiles
-    game_grid = []
-    fire_tiles = set()
-    obstacle_tiles = set()
-    
-    for y in range(GRID_HEIGHT):
-        row = [TILE_GRASS] * GRID_WIDTH
-        game_grid.append(row)
-
-    # Add Dirt
-    for _ in range(int(total_tiles * 0.1)):
-        x, y = random.randint(0, GRID_WIDTH-1), random.randint(0, GRID_HEIGHT-1)
-        if game_grid[y][x] == TILE_GRASS: game_grid[y][x] = TILE_DIRT
-    
-    # Add Bushes
-    for _ in range(int(total_tiles * 0.05)):
-        x, y = random.randint(0, GRID_WIDTH-1), random.randint(0, GRID_HEIGHT-1)
-        if game_grid[y][x] == TILE_GRASS: game_grid[y][x] = TILE_BUSH
-
-    # Add Flowers
-    for _ in range(int(total_tiles * 0.03)):
-        x, y = random.randint(0, GRID_WIDTH-1), random.randint(0, GRID_HEIGHT-1)
-        if game_grid[y][x] == TILE_GRASS: game_grid[y][x] = TILE_FLOWERS
-
-    # Add Trees
-    for _ in range(int(total_tiles * 0.1)):
-        x, y = random.randint(0, GRID_WIDTH-1), random.randint(0, GRID_HEIGHT-1)
-        game_grid[y][x] = TILE_TREE
-
-def find_spawnable_spot():
+    font.draw(text, color, surface, x, y, center)
+
+# --- Map Generation ---
+def value_noise(rng, width, height, scale):
+    # Random lattice with a point every scale tiles, smoothly interpolated. Values in [0, 1)
+    lattice = rng.random((int(height / scale) + 2, int(width / scale) + 2))
+    ys, xs = np.arange(height) / scale, np.arange(width) / scale
+    y0, x0 = ys.astype(int), xs.astype(int)
+    ty, tx = ys - y0, xs - x0
+    ty, tx = (ty * ty * (3 - 2 * ty))[:, None], tx * tx * (3 - 2 * tx)
+    top, bottom = lattice[y0], lattice[y0 + 1]
+    top = top[:, x0] * (1 - tx) + top[:, x0 + 1] * tx
+    bottom = bottom[:, x0] * (1 - tx) + bottom[:, x0 + 1] * tx
+    return top * (1 - ty) + bottom * ty
+
+def fractal_noise(rng, width, height, scale, octaves=3):
+    # Octaves of value noise, each half the feature size and weight of the previous one
+    total = np.zeros((height, width))
+    weight = 0.0
+    for octave in range(octaves):
+        amplitude = 0.5 ** octave
+        total += value_noise(rng, width, height, max(1.0, scale / 2 ** octave)) * amplitude
+        weight += amplitude
+    return total / weight
+
+def top_fraction(score, fraction, allowed):
+    # Mask of the highest scoring allowed tiles, fraction of the whole map (or all allowed ones)
+    candidates = np.flatnonzero(allowed)
+    count = min(int(score.size * fraction), len(candidates))
+    mask = np.zeros(score.size, dtype=bool)
+    if count > 0:
+        mask[candidates[np.argpartition(score.ravel()[candidates], -count)[-count:]]] = True
+    return mask.reshape(score.shape)
+
+def carve_firebreak(rng, grid, position):
+    # Winding dirt path along the rows of grid (pass grid.T for one running down), kept 4-connected
+    # so fire can't slip through diagonally
+    height, width = grid.shape
+    wander = (value_noise(rng, width, 1, MAP_FOREST_SCALE)[0] - 0.5) * MAP_FOREST_SCALE
+    ys = np.clip(np.rint(position + wander), 0, height - 1).astype(int)
+    xs = np.arange(width)
+    grid[ys, xs] = TILE_DIRT
+    low, high = np.minimum(ys[:-1], ys[1:]), np.maximum(ys[:-1], ys[1:])
+    for step in range(1, int((high - low).max(initial=0)) + 1):
+        gap = low + step < high
+        grid[(low + step)[gap], xs[:-1][gap]] = TILE_DIRT
+
+def generate_terrain(seed, grid):
+    # Fills grid (a [y, x] tile array) in place
+    height, width = grid.shape
+    rng = np.random.default_rng(seed)
+    grid.fill(TILE_GRASS)
+    forest = fractal_noise(rng, width, height, MAP_FOREST_SCALE)
+
+    # Trees: stands where the forest noise is high, ragged edges from per tile jitter
+    trees = top_fraction(forest + rng.random(forest.shape) * 0.25, MAP_TREE_FRACTION, np.ones(forest.shape, dtype=bool))
+    grid[trees] = TILE_TREE
+
+    # Clearings: bare dirt patches out in the open
+    open_ground = fractal_noise(rng, width, height, MAP_FOREST_SCALE / 2, 2) - forest
+    grid[top_fraction(open_ground, MAP_DIRT_FRACTION, grid == TILE_GRASS)] = TILE_DIRT
+
+    # Undergrowth: bushes toward the forests, flowers in the clearings
+    grid[top_fraction(rng.random(forest.shape) * forest, MAP_BUSH_FRACTION, grid == TILE_GRASS)] = TILE_BUSH
+    grid[top_fraction(rng.random(forest.shape) * (1 - forest), MAP_FLOWER_FRACTION, grid == TILE_GRASS)] = TILE_FLOWERS
+
+    # Firebreaks: evenly spaced winding paths across and down the map
+    for lines, count in [(grid, max(1, height // MAP_FIREBREAK_SPACING)), (grid.T, max(1, width // MAP_FIREBREAK_SPACING))]:
+        span = lines.shape[0] / count
+        for i in range(count):
+            carve_firebreak(rng, lines, (i + rng.uniform(0.3, 0.7)) * span)
+
+def create_grid(seed=None):
+    # Seeded from the global random module unless given, so seeding random reproduces the whole round
+    global map_seed, fire_rng, burnt_out_count
+    if seed is None: seed = MAP_SEED if MAP_SEED is not None else random.getrandbits(32)
+    map_seed = seed
+    fire_rng = np.random.default_rng(random.getrandbits(32))
+    generate_terrain(seed, game_grid)
+    clear_fire_tiles()
+    burnt_out_count = 0
+    obstacle_tiles.clear()
+    chunks.mark_all_dirty()
+    update_spread_probabilities()
+
+def find_spawnable_spot(accept=None):
     for _ in range(100):
         x = random.randint(0, GRID_WIDTH - 1)
         y = random.randint(0, GRID_HEIGHT - 1)
-        if (game_grid[y][x] not in [TILE_TREE, BURNT_GROUND] and 
+        if (game_grid[y, x] not in [TILE_TREE, BURNT_GROUND] and 
             (x,y) not in fire_tiles and 
-            (x,y) not in obstacle_tiles):
+            (x,y) not in obstacle_tiles and
+            (accept is None or accept(x, y))):
             
             screen_x = x * TILE_SIZE
             screen_y = y * TILE_SIZE + UI_HEIGHT
@@ -334,115 +1703,599 @@ def find_spawnable_spot():
                 return (x, y)
     return None
 
+def flammable(x, y):
+    # Fires are only started on tiles with fuel, one on dirt would die out by itself
+    return TILE_FUEL.get(int(game_grid[y, x]), 0.0) > 0
+
 def spawn_initial_fire(count=1):
-    global fire_tiles
-    fire_tiles = set() 
+    clear_fire_tiles()
     for _ in range(count):
-        spot = find_spawnable_spot()
-        if spot: fire_tiles.add(spot)
+        spot = find_spawnable_spot(flammable)
+        if spot: ignite_tile(spot)
             
 def spawn_new_fire_cluster(count=1):
+    # A new front starts clear of the existing ones if there is room, instead of merging into them
     for _ in range(count):
-        spot = find_spawnable_spot()
-        if spot: fire_tiles.add(spot)
+        spot = find_spawnable_spot(lambda x, y: flammable(x, y) and fire_clusters.is_clear(x, y)) or find_spawnable_spot(flammable)
+        if spot: ignite_tile(spot)
+
+# --- Sprites ---
+# Anything drawn every frame (or on every chunk redraw) is painted once into a cached surface and
+# after that only blitted. Each draw layer collects its blits in a SpriteBatch and submits them in
+# one Surface.blits() call.
+sprite_cache = {}
+
+def cached_sprite(key, size, paint, alpha=True, scale=True):
+    # paint(surface) draws the sprite at the surface origin in game pixels, only the first time a key
+    # is asked for. The cached sprite is at the render scale unless scale=False
+    surface = sprite_cache.get(key)
+    if surface is None:
+        if alpha:
+            surface = pygame.Surface(size, pygame.SRCALPHA).convert_alpha()
+            surface.fill((0, 0, 0, 0))
+        else:
+            surface = pygame.Surface(size).convert()
+        paint(surface)
+        if scale and RENDER_SCALE != 1:
+            surface = pygame.transform.smoothscale(surface, (scaled_line(size[0]), scaled_line(size[1])))
+        sprite_cache[key] = surface
+    return surface
+
+class SpriteBatch:
+    # One draw layer: blits are collected during the frame and drawn in a single call, ordered by
+    # their sort key (the screen bottom edge for actors, so lower ones overlap higher ones)
+    def __init__(self):
+        self.items = []
+
+    def add(self, surface, dest, order=0):
+        # dest in game pixels
+        self.items.append((order, surface, scaled_point(dest)))
+
+    def draw(self, target):
+        self.items.sort(key=lambda item: item[0])
+        target.blits([(surface, dest) for _, surface, dest in self.items], False)
+        self.items.clear()
+
+actor_layer = SpriteBatch() # Player, zombies and powerups
+hud_layer = SpriteBatch()
+
+# --- Entities ---
+class Entity:
+    # Anything that moves around the map or can be picked up. x, y are the exact (float) world
+    # position, rect the integer hitbox. __slots__ keeps an instance to its fixed fields, no dict.
+    __slots__ = ("x", "y", "rect")
+    SPRITE_MARGIN = 0 # px the drawing sticks out of the hitbox on every side
+
+    def __init__(self, x, y, width, height):
+        self.x = float(x)
+        self.y = float(y)
+        try: self.rect.update(x, y, width, height) # Recycled from its registry's pool
+        except AttributeError: self.rect = pygame.Rect(x, y, width, height)
+
+    def move_toward(self, tx, ty, speed):
+        dx, dy = tx - self.x, ty - self.y
+        dist = math.hypot(dx, dy)
+        if dist != 0:
+            self.x += (dx / dist) * speed
+            self.y += (dy / dist) * speed
+            self.rect.x = int(self.x)
+            self.rect.y = int(self.y)
+
+    def update(self):
+        # Once per running frame. Return False to be removed from the registry
+        pass
+
+    def touch_player(self):
+        # The player's hitbox overlaps this one (after everything moved). Return False to be removed
+        pass
+
+    def paint(self, surface, r):
+        # Draws the sprite once into the cache, r: the hitbox inside surface. Same for every entity of a type
+        pass
+
+    def sprite(self):
+        m = self.SPRITE_MARGIN
+        w, h = self.rect.size
+        return cached_sprite((type(self), w, h), (w + m * 2, h + m * 2), lambda surface: self.paint(surface, pygame.Rect(m, m, w, h)))
+
+class Registry:
+    # The live entities of one type. update() runs that type's hooks over all of them, draw() queues their sprites.
+    # Removed entities go to a free list and are initialised again by the next spawn(), so rounds
+    # after the first don't allocate entities at all.
+    def __init__(self, kind):
+        self.kind = kind
+        self.items = []
+        self.free = []
+
+    def spawn(self, *args):
+        if self.free:
+            entity = self.free.pop()
+            entity.__init__(*args)
+        else:
+            entity = self.kind(*args)
+        self.items.append(entity)
+        return entity
+
+    def clear(self):
+        self.free.extend(self.items)
+        self.items.clear()
+
+    def remove(self, entity):
+        self.items.remove(entity)
+        self.free.append(entity)
+
+    def __iter__(self):
+        return iter(self.items)
+
+    def __len__(self):
+        return len(self.items)
+
+    def update(self):
+        i = 0
+        while i < len(self.items):
+            if self.items[i].update() is False: self.free.append(self.items.pop(i))
+            else: i += 1
+
+    def draw(self, batch):
+        m = self.kind.SPRITE_MARGIN
+        view = view_rect().inflate(m * 2, m * 2)
+        for entity in self.items:
+            if view.colliderect(entity.rect):
+                r = to_screen(entity.rect)
+                batch.add(entity.sprite(), (r.x - m, r.y - m), r.bottom)
+                display_updates.add(r.inflate(m * 2, m * 2))
+
+class SpatialHash:
+    # Broadphase: every entity is filed under each BROADPHASE_CELL square its hitbox touches, so a
+    # query only tests the entities in the cells around the rect instead of all of them.
+    # Rebuilt once per tick after everything has moved.
+    def __init__(self, cell_size):
+        self.cell_size = cell_size
+        self.cells = {}
+        self.count = 0
+
+    def cell_range(self, rect):
+        size = self.cell_size
+        return range(rect.left // size, (rect.right - 1) // size + 1), range(rect.top // size, (rect.bottom - 1) // size + 1)
+
+    def rebuild(self, registries):
+        self.cells.clear()
+        self.count = 0
+        for registry in registries:
+            for entity in registry:
+                entry = (self.count, entity, registry) # Insertion order keeps query results in update order
+                self.count += 1
+                xs, ys = self.cell_range(entity.rect)
+                for cy in ys:
+                    for cx in xs:
+                        cell = self.cells.get((cx, cy))
+                        if cell is None:
+                            self.cells[(cx, cy)] = cell = []
+                        cell.append(entry)
+
+    def query(self, rect):
+        # [(entity, registry), ...] whose hitbox overlaps rect, in registry update order
+        found = {}
+        xs, ys = self.cell_range(rect)
+        for cy in ys:
+            for cx in xs:
+                for entry in self.cells.get((cx, cy), ()):
+                    if entry[0] not in found and entry[1].rect.colliderect(rect):
+                        found[entry[0]] = entry
+        return [(entity, registry) for _, entity, registry in sorted(found.values(), key=lambda entry: entry[0])]
+
+broadphase = SpatialHash(BROADPHASE_CELL)
+
+def tiles_under(rect):
+    # Map tiles a world pixel rect overlaps, row by row
+    x0, x1 = max(0, rect.left // TILE_SIZE), min(GRID_WIDTH - 1, (rect.right - 1) // TILE_SIZE)
+    y0, y1 = max(0, (rect.top - UI_HEIGHT) // TILE_SIZE), min(GRID_HEIGHT - 1, (rect.bottom - 1 - UI_HEIGHT) // TILE_SIZE)
+    for y in range(y0, y1 + 1):
+        for x in range(x0, x1 + 1):
+            yield (x, y)
+
+def obstacle_under(rect):
+    for tile in tiles_under(rect):
+        if tile in obstacle_tiles: return tile
+    return None
+
+def hurt_player():
+    global player_lives, invulnerable, game_state, high_score
+    if invulnerable: return
+    player_lives -= 1
+    invulnerable = True
+    game_scheduler.schedule(DAMAGE_COOLDOWN_MS, end_invulnerability)
+    if player_lives <= 0:
+        game_state = STATE_GAME_OVER
+        if score > high_score: high_score = score
+
+class Zombie(Entity):
+    __slots__ = ("speed",)
+    SPRITE_MARGIN = 5 # Arms
+
+    def __init__(self, x, y, speed):
+        super().__init__(x, y, PLAYER_SIZE, PLAYER_SIZE)
+        self.speed = speed
+
+    def update(self):
+        self.move_toward(player_rect.x, player_rect.y, self.speed)
+
+    def touch_player(self):
+        hurt_player()
+
+    def paint(self, surface, r):
+        pygame.draw.rect(surface, ZOMBIE_GREEN, r)
+        pygame.draw.rect(surface, RED, (r.x + 5, r.y + 5, 5, 5))
+        pygame.draw.rect(surface, RED, (r.x + 15, r.y + 5, 5, 5))
+        pygame.draw.rect(surface, ZOMBIE_GREEN, (r.x - 5, r.y + 10, 5, 8))
+        pygame.draw.rect(surface, ZOMBIE_GREEN, (r.x + PLAYER_SIZE, r.y + 10, 5, 8))
+
+class FlameZombie(Entity):
+    # Sets every tile it walks over alight, touching the player ends the round
+    __slots__ = ()
+    SPRITE_MARGIN = 8 # Flame on top
+
+    def __init__(self, x, y):
+        super().__init__(x, y, PLAYER_SIZE, PLAYER_SIZE)
+
+    def update(self):
+        self.move_toward(player_rect.x, player_rect.y, FLAME_ZOMBIE_SPEED)
+        grid_x = int(self.rect.centerx // TILE_SIZE)
+        grid_y = int((self.rect.centery - UI_HEIGHT) // TILE_SIZE)
+        if 0 <= grid_x < GRID_WIDTH and 0 <= grid_y < GRID_HEIGHT:
+            ignite_tile((grid_x, grid_y))
+
+    def touch_player(self):
+        global game_state, high_score
+        game_state = STATE_GAME_OVER
+        if score > high_score: high_score = score
+
+    def paint(self, surface, r):
+        pygame.draw.rect(surface, FLAME_ZOMBIE_COLOR, r)
+        pygame.draw.rect(surface, YELLOW, (r.x + 5, r.y + 5, 5, 5))
+        pygame.draw.rect(surface, YELLOW, (r.x + 15, r.y + 5, 5, 5))
+        pygame.draw.polygon(surface, YELLOW, [(r.x + 5, r.y), (r.x + 10, r.y - 8), (r.x + 15, r.y)])
+
+# Active powerup effects on the player: effect name -> the Powerup class that granted it
+player_effects = {}
+
+class Powerup(Entity):
+    # Sits on a tile until the player walks over it. Powerups with an EFFECT can't be picked up
+    # while that effect is active and may run out after duration_ms()
+    __slots__ = ()
+    SIZE = 16
+    EFFECT = None
+    LABEL = None # HUD status text while the effect is active
+    LABEL_COLOR = WHITE
+
+    def __init__(self, tile):
+        offset = (TILE_SIZE - self.SIZE) // 2
+        super().__init__(tile[0] * TILE_SIZE + offset, tile[1] * TILE_SIZE + UI_HEIGHT + offset, self.SIZE, self.SIZE)
+
+    def available(self):
+        return self.EFFECT is None or self.EFFECT not in player_effects
+
+    def touch_player(self):
+        if self.available():
+            self.collect()
+            return False
+
+    def collect(self):
+        player_effects[self.EFFECT] = type(self)
+        if self.duration_ms() > 0:
+            game_scheduler.schedule(self.duration_ms(), type(self).expire)
+
+    def duration_ms(self):
+        return 0 # 0 = lasts for the rest of the round
+
+    @classmethod
+    def expire(cls):
+        player_effects.pop(cls.EFFECT, None)
+
+class WaterPowerup(Powerup):
+    __slots__ = ()
+    SIZE = 10
+    SPRITE_MARGIN = 1 # The diamond is a pixel wider than the hitbox
+    EFFECT = "water"
+    LABEL = "2x WATER!"
+    LABEL_COLOR = CYAN
+
+    def duration_ms(self):
+        return WATER_POWERUP_DURATION_MS
+
+    def paint(self, surface, r):
+        # Diamond
+        size = 6
+        points = [(r.centerx, r.centery - size), (r.centerx + size, r.centery), (r.centerx, r.centery + size), (r.centerx - size, r.centery)]
+        pygame.draw.polygon(surface, CYAN, points)
+        pygame.draw.polygon(surface, WHITE, points, 1)
+
+class SpeedPowerup(Powerup):
+    __slots__ = ()
+    EFFECT = "speed"
+    LABEL = "SPEED!"
+    LABEL_COLOR = GOLD_SPEED
+
+    def duration_ms(self):
+        return SPEED_POWERUP_DURATION_MS
+
+    def collect(self):
+        global player_speed
+        super().collect()
+        player_speed = player_base_speed * 1.75
+
+    @classmethod
+    def expire(cls):
+        global player_speed
+        super().expire()
+        player_speed = player_base_speed
+
+    def paint(self, surface, r):
+        # Gold square with a lightning bolt
+        pygame.draw.rect(surface, GOLD_SPEED, r)
+        pygame.draw.rect(surface, WHITE, r, 1)
+        points = [(r.x + 10, r.y + 2), (r.x + 6, r.y + 8), (r.x + 12, r.y + 8), (r.x + 4, r.y + 14)]
+        pygame.draw.polygon(surface, RED, points)
+
+class HeartPowerup(Powerup):
+    # Extra life
+    __slots__ = ()
+
+    def collect(self):
+        global player_lives
+        player_lives += 1
+
+    def paint(self, surface, r):
+        # Two circles and a triangle for a heart
+        pygame.draw.circle(surface, HEART_RED, (r.x + 4, r.y + 4), 4)
+        pygame.draw.circle(surface, HEART_RED, (r.x + 12, r.y + 4), 4)
+        pygame.draw.polygon(surface, HEART_RED, [(r.x, r.y + 6), (r.x + 16, r.y + 6), (r.x + 8, r.y + 15)])
+        pygame.draw.rect(surface, WHITE, r, 1) # Hitbox outline
+
+zombies = Registry(Zombie)
+flame_zombies = Registry(FlameZombie)
+water_powerups = Registry(WaterPowerup)
+speed_powerups = Registry(SpeedPowerup)
+heart_powerups = Registry(HeartPowerup)
+# Update and draw order: enemies first, then pickups
+ENTITY_REGISTRIES = [zombies, flame_zombies, water_powerups, speed_powerups, heart_powerups]
+POWERUP_REGISTRIES = [water_powerups, speed_powerups, heart_powerups]
+
+def update_entities():
+    # Move everything, then hand whatever ended up touching the player to its touch hook
+    for registry in ENTITY_REGISTRIES:
+        registry.update()
+    broadphase.rebuild(ENTITY_REGISTRIES)
+    for entity, registry in broadphase.query(player_rect):
+        if entity.touch_player() is False:
+            registry.remove(entity)
 
 def spawn_obstacle():
     spot = find_spawnable_spot()
     if spot:
-        obstacle_tiles.add(spot)
+        add_obstacle(spot)
 
 def spawn_zombie():
     spot = find_spawnable_spot()
     if spot:
-        z_x = spot[0] * TILE_SIZE
-        z_y = spot[1] * TILE_SIZE + UI_HEIGHT
-        zombies.append([float(z_x), float(z_y), pygame.Rect(z_x, z_y, PLAYER_SIZE, PLAYER_SIZE)])
+        speed = PARKINSON_ZOMBIE_SPEED if current_level_id == 9 else ZOMBIE_SPEED
+        zombies.spawn(spot[0] * TILE_SIZE, spot[1] * TILE_SIZE + UI_HEIGHT, speed)
 
 def spawn_flame_zombie():
     spot = find_spawnable_spot()
     if spot:
-        z_x = spot[0] * TILE_SIZE
-        z_y = spot[1] * TILE_SIZE + UI_HEIGHT
-        flame_zombies.append([float(z_x), float(z_y), pygame.Rect(z_x, z_y, PLAYER_SIZE, PLAYER_SIZE)])
-
-def spawn_water_powerup():
-    global water_powerup_rect
-    spot = find_spawnable_spot()
-    if spot:
-        water_powerup_rect = pygame.Rect(spot[0] * TILE_SIZE + 5, spot[1] * TILE_SIZE + UI_HEIGHT + 5, 10, 10)
-
-def spawn_speed_powerup():
-    global speed_powerup_rect
-    spot = find_spawnable_spot()
-    if spot:
-        speed_powerup_rect = pygame.Rect(spot[0] * TILE_SIZE + 2, spot[1] * TILE_SIZE + UI_HEIGHT + 2, 16, 16)
+        flame_zombies.spawn(spot[0] * TILE_SIZE, spot[1] * TILE_SIZE + UI_HEIGHT)
 
-def spawn_heart_powerup():
-    global heart_powerup_rect
+def spawn_powerup(registry):
     spot = find_spawnable_spot()
     if spot:
-        heart_powerup_rect = pygame.Rect(spot[0] * TILE_SIZE + 2, spot[1] * TILE_SIZE + UI_HEIGHT + 2, 16, 16)
+        registry.spawn(spot)
 
 def spread_fire():
-    global game_grid, fire_tiles
     if current_level_id < 4 and current_level_id != 8: return
-        
-    new_fires = set() 
-    for (x, y) in list(fire_tiles):
-        for dx, dy in [(-1, 0), (1, 0), (0, -1), (0, 1)]:
-            nx, ny = x + dx, y + dy
-            if 0 <= nx < GRID_WIDTH and 0 <= ny < GRID_HEIGHT:
-                if (game_grid[ny][nx] != BURNT_GROUND and 
-                    (nx, ny) not in fire_tiles and
-                    (nx, ny) not in obstacle_tiles):
-                    if random.random() < FIRE_SPREAD_CHANCE:
-                        new_fires.add((nx, ny))
-    fire_tiles.update(new_fires)
+    if not fire_tiles: return
+
+    # Every flaming tile's four neighbours as arrays: one roll each against the precomputed chance.
+    # The padded border and burnt / obstacle tiles have chance 0.
+    fires = np.array(list(fire_tiles))
+    fires = fires[~smoulder_mask[fires[:, 1], fires[:, 0]]] + 1 # Smouldering tiles don't spread. Padded coordinates
+    xs = fires[:, 0] + SPREAD_DX[:, None]
+    ys = fires[:, 1] + SPREAD_DY[:, None]
+    chance = spread_probability[SPREAD_INDEX[:, None], ys, xs]
+    caught = (fire_rng.random(chance.shape) < chance) & ~fire_mask_padded[ys, xs]
+    for x, y in set(zip((xs[caught] - 1).tolist(), (ys[caught] - 1).tolist())):
+        ignite_tile((x, y))
+
+def update_camera():
+    # Keep the player centred, stopping at the world edges
+    global camera_x, camera_y
+    camera_x = min(max(player_rect.centerx - VIEW_PIXEL_WIDTH // 2, 0), WORLD_PIXEL_WIDTH - VIEW_PIXEL_WIDTH)
+    camera_y = min(max(player_rect.centery - UI_HEIGHT - VIEW_PIXEL_HEIGHT // 2, 0), WORLD_PIXEL_HEIGHT - VIEW_PIXEL_HEIGHT)
+
+def view_rect():
+    # The visible part of the world, in world pixels
+    return pygame.Rect(camera_x, camera_y + UI_HEIGHT, VIEW_PIXEL_WIDTH, VIEW_PIXEL_HEIGHT)
+
+def to_screen(rect):
+    return rect.move(-camera_x, -camera_y)
+
+def draw_tile(surface, tile_type, tile_rect):
+    if tile_type == TILE_GRASS:
+        pygame.draw.rect(surface, DARK_GREEN, tile_rect)
+    elif tile_type == TILE_DIRT:
+        pygame.draw.rect(surface, DIRT_COLOR, tile_rect)
+    elif tile_type == TILE_BUSH:
+        pygame.draw.rect(surface, DARK_GREEN, tile_rect)
+        pygame.draw.circle(surface, BUSH_COLOR_DARK, (tile_rect.centerx + 3, tile_rect.centery + 3), 6)
+        pygame.draw.circle(surface, BUSH_COLOR_LIGHT, (tile_rect.centerx, tile_rect.centery), 5)
+    elif tile_type == TILE_FLOWERS:
+        pygame.draw.rect(surface, DARK_GREEN, tile_rect)
+        pygame.draw.rect(surface, FLOWER_COLOR_1, (tile_rect.x + 5, tile_rect.y + 5, 3, 3))
+        pygame.draw.rect(surface, FLOWER_COLOR_2, (tile_rect.x + 12, tile_rect.y + 10, 3, 3))
+        pygame.draw.rect(surface, FLOWER_COLOR_3, (tile_rect.x + 8, tile_rect.y + 15, 3, 3))
+    elif tile_type == TILE_TREE:
+        pygame.draw.rect(surface, TREE_TRUNK_DARK, (tile_rect.x + 4, tile_rect.y + 17, 12, 3))
+        pygame.draw.rect(surface, TREE_TRUNK_LIGHT, (tile_rect.x + 5, tile_rect.y + 17, 10, 3))
+        pygame.draw.rect(surface, TREE_TRUNK_DARK, (tile_rect.x + 6, tile_rect.y + 10, 8, 7))
+        pygame.draw.rect(surface, TREE_TRUNK_LIGHT, (tile_rect.x + 7, tile_rect.y + 10, 6, 7))
+        pygame.draw.rect(surface, TREE_TRUNK_DARK, (tile_rect.x + 9, tile_rect.y + 13, 2, 2))
+        pygame.draw.rect(surface, TREE_LEAVES_DARK, (tile_rect.x + 2, tile_rect.y + 10, 16, 4))
+        pygame.draw.rect(surface, TREE_LEAVES_MEDIUM, (tile_rect.x + 3, tile_rect.y + 10, 14, 3))
+        pygame.draw.rect(surface, TREE_LEAVES_DARK, (tile_rect.x + 0, tile_rect.y + 6, 20, 4))
+        pygame.draw.rect(surface, TREE_LEAVES_MEDIUM, (tile_rect.x + 1, tile_rect.y + 6, 18, 3))
+        pygame.draw.rect(surface, TREE_LEAVES_LIGHT, (tile_rect.x + 4, tile_rect.y + 7, 12, 2))
+        pygame.draw.rect(surface, TREE_LEAVES_DARK, (tile_rect.x + 4, tile_rect.y + 2, 12, 4))
+        pygame.draw.rect(surface, TREE_LEAVES_MEDIUM, (tile_rect.x + 5, tile_rect.y + 2, 10, 3))
+        pygame.draw.rect(surface, TREE_LEAVES_LIGHT, (tile_rect.x + 7, tile_rect.y + 3, 6, 1))
+    elif tile_type == BURNT_GROUND:
+        pygame.draw.rect(surface, COLOR_BURNT_GROUND, tile_rect)
+
+def draw_obstacle(surface, r):
+    pygame.draw.ellipse(surface, OBSTACLE_COLOR, r)
+    pygame.draw.ellipse(surface, (169, 169, 169), (r.x + 4, r.y + 4, 8, 8))
+
+def tile_sprite(tile_type):
+    def paint(surface):
+        surface.fill(DARK_GREEN) # Trees only draw trunk and leaves, grass shows around them
+        draw_tile(surface, tile_type, surface.get_rect())
+    return cached_sprite(("tile", tile_type), (TILE_SIZE, TILE_SIZE), paint, alpha=False, scale=False)
+
+def obstacle_sprite():
+    return cached_sprite("obstacle", (TILE_SIZE, TILE_SIZE), lambda surface: draw_obstacle(surface, surface.get_rect()), scale=False)
+
+# Chunks are drawn here at full size and scaled into their surface when the render target is smaller
+chunk_canvas = pygame.Surface((CHUNK_SIZE * TILE_SIZE, CHUNK_SIZE * TILE_SIZE)).convert() if RENDER_SCALE != 1 else None
+
+def to_render(rect):
+    # World pixel rect -> render target rect. Scaled before the camera offset, so neighbouring chunks
+    # line up whatever the camera position
+    return scaled_rect(rect).move(-scaled(camera_x), -scaled(camera_y))
+
+def render_chunk_terrain(cx, cy):
+    rect = chunks.pixel_rect(cx, cy)
+    surface = chunks.surfaces.get((cx, cy))
+    if surface is None:
+        surface = chunks.surfaces[(cx, cy)] = pygame.Surface(scaled_rect(rect).size).convert()
+    canvas = surface if chunk_canvas is None else chunk_canvas.subsurface((0, 0) + rect.size)
+    x0, y0 = cx * CHUNK_SIZE, cy * CHUNK_SIZE
+    canvas.fill(DARK_GREEN) # Plain grass, every other tile is a sprite on top
+    blits = []
+    for y, row in enumerate(game_grid[y0:y0 + CHUNK_SIZE, x0:x0 + CHUNK_SIZE].tolist()):
+        for x, tile_type in enumerate(row):
+            if tile_type != TILE_GRASS:
+                blits.append((tile_sprite(tile_type), (x * TILE_SIZE, y * TILE_SIZE)))
+    for (ox, oy) in obstacle_tiles:
+        if x0 <= ox < x0 + CHUNK_SIZE and y0 <= oy < y0 + CHUNK_SIZE:
+            blits.append((obstacle_sprite(), ((ox - x0) * TILE_SIZE, (oy - y0) * TILE_SIZE)))
+    canvas.blits(blits, False)
+    if canvas is not surface:
+        pygame.transform.smoothscale(canvas, surface.get_size(), surface)
+    chunks.dirty[cy, cx] = False
+    chunks.redraws += 1
+
+def stream_chunk_terrain(area):
+    # Draw a few changed chunks in the ring around the view ahead of scrolling, then drop the cached
+    # surfaces furthest from the view once there are more than CHUNK_CACHE_LIMIT
+    cx0, cy0, cx1, cy1 = area
+    budget = CHUNK_PREFETCH_PER_FRAME
+    for cy in range(max(0, cy0 - 1), min(chunks.rows, cy1 + 1)):
+        for cx in range(max(0, cx0 - 1), min(chunks.cols, cx1 + 1)):
+            if budget and chunks.dirty[cy, cx]:
+                render_chunk_terrain(cx, cy)
+                budget -= 1
+
+    excess = len(chunks.surfaces) - CHUNK_CACHE_LIMIT
+    if excess > 0:
+        mid_x, mid_y = (cx0 + cx1) / 2, (cy0 + cy1) / 2
+        by_distance = sorted(chunks.surfaces, key=lambda key: -max(abs(key[0] + 0.5 - mid_x), abs(key[1] + 0.5 - mid_y)))
+        for (cx, cy) in by_distance[:excess]:
+            del chunks.surfaces[(cx, cy)]
+            chunks.dirty[cy, cx] = True
 
 def draw_jungle_and_fire():
-    for y in range(GRID_HEIGHT):
-        for x in range(GRID_WIDTH):
-            tile_rect = pygame.Rect(x * TILE_SIZE, y * TILE_SIZE + UI_HEIGHT, TILE_SIZE, TILE_SIZE)
-            tile_type = game_grid[y][x]
-            
-            if tile_type == TILE_GRASS:
-                pygame.draw.rect(screen, DARK_GREEN, tile_rect)
-            elif tile_type == TILE_DIRT:
-                pygame.draw.rect(screen, DIRT_COLOR, tile_rect)
-            elif tile_type == TILE_BUSH:
-                pygame.draw.rect(screen, DARK_GREEN, tile_rect)
-                pygame.draw.circle(screen, BUSH_COLOR_DARK, (tile_rect.centerx + 3, tile_rect.centery + 3), 6)
-                pygame.draw.circle(screen, BUSH_COLOR_LIGHT, (tile_rect.centerx, tile_rect.centery), 5)
-            elif tile_type == TILE_FLOWERS:
-                pygame.draw.rect(screen, DARK_GREEN, tile_rect)
-                pygame.draw.rect(screen, FLOWER_COLOR_1, (tile_rect.x + 5, tile_rect.y + 5, 3, 3))
-                pygame.draw.rect(screen, FLOWER_COLOR_2, (tile_rect.x + 12, tile_rect.y + 10, 3, 3))
-                pygame.draw.rect(screen, FLOWER_COLOR_3, (tile_rect.x + 8, tile_rect.y + 15, 3, 3))
-            elif tile_type == TILE_TREE:
-                pygame.draw.rect(screen, TREE_TRUNK_DARK, (tile_rect.x + 4, tile_rect.y + 17, 12, 3))
-                pygame.draw.rect(screen, TREE_TRUNK_LIGHT, (tile_rect.x + 5, tile_rect.y + 17, 10, 3))
-                pygame.draw.rect(screen, TREE_TRUNK_DARK, (tile_rect.x + 6, tile_rect.y + 10, 8, 7))
-                pygame.draw.rect(screen, TREE_TRUNK_LIGHT, (tile_rect.x + 7, tile_rect.y + 10, 6, 7))
-                pygame.draw.rect(screen, TREE_TRUNK_DARK, (tile_rect.x + 9, tile_rect.y + 13, 2, 2))
-                pygame.draw.rect(screen, TREE_LEAVES_DARK, (tile_rect.x + 2, tile_rect.y + 10, 16, 4))
-                pygame.draw.rect(screen, TREE_LEAVES_MEDIUM, (tile_rect.x + 3, tile_rect.y + 10, 14, 3))
-                pygame.draw.rect(screen, TREE_LEAVES_DARK, (tile_rect.x + 0, tile_rect.y + 6, 20, 4))
-                pygame.draw.rect(screen, TREE_LEAVES_MEDIUM, (tile_rect.x + 1, tile_rect.y + 6, 18, 3))
-                pygame.draw.rect(screen, TREE_LEAVES_LIGHT, (tile_rect.x + 4, tile_rect.y + 7, 12, 2))
-                pygame.draw.rect(screen, TREE_LEAVES_DARK, (tile_rect.x + 4, tile_rect.y + 2, 12, 4))
-                pygame.draw.rect(screen, TREE_LEAVES_MEDIUM, (tile_rect.x + 5, tile_rect.y + 2, 10, 3))
-                pygame.draw.rect(screen, TREE_LEAVES_LIGHT, (tile_rect.x + 7, tile_rect.y + 3, 6, 1))
-            elif tile_type == BURNT_GROUND:
-                pygame.draw.rect(screen, COLOR_BURNT_GROUND, tile_rect)
-
-    for (ox, oy) in obstacle_tiles:
-        r = pygame.Rect(ox * TILE_SIZE, oy * TILE_SIZE + UI_HEIGHT, TILE_SIZE, TILE_SIZE)
-        pygame.draw.ellipse(screen, OBSTACLE_COLOR, r)
-        pygame.draw.ellipse(screen, (169, 169, 169), (r.x + 4, r.y + 4, 8, 8))
+    # Terrain comes from the per-chunk cache: only visible chunks are blitted, and a chunk is only
+    # drawn again after one of its tiles changed
+    area = chunks.chunk_range(view_rect())
+    cx0, cy0, cx1, cy1 = area
+    blits = []
+    for cy in range(cy0, cy1):
+        for cx in range(cx0, cx1):
+            rect = chunks.pixel_rect(cx, cy)
+            if chunks.dirty[cy, cx]:
+                render_chunk_terrain(cx, cy)
+                display_updates.add(to_screen(rect))
+            blits.append((chunks.surfaces[(cx, cy)], to_render(rect)))
+    screen.blits(blits, False)
+    stream_chunk_terrain(area)
+
+# --- Fire Atlas ---
+# Alternative to per tile particles: looping flame animations (ground and tree variant) drawn once
+# at startup from the same particle rules, then one blit per burning tile per frame. Spawns repeat
+# every loop, so the last frame runs straight into the first.
+FIRE_ATLAS_FRAME_SIZE = (TILE_SIZE * 2, TILE_SIZE * 3) # Flames rise about two tiles above their own
+FIRE_ATLAS_TILE_OFFSET = ((FIRE_ATLAS_FRAME_SIZE[0] - TILE_SIZE) // 2, FIRE_ATLAS_FRAME_SIZE[1] - TILE_SIZE) # Tile corner inside a frame
+
+def bake_fire_atlas():
+    rng = random.Random(0)
+    steps = max(1, round(FIRE_ATLAS_FRAME_MS * 60 / 1000)) # 60 FPS particle updates per atlas frame
+    period = FIRE_ATLAS_FRAMES * steps
+    fw, fh = FIRE_ATLAS_FRAME_SIZE
+    ox, oy = FIRE_ATLAS_TILE_OFFSET
+    atlas = pygame.Surface((fw * FIRE_ATLAS_FRAMES, fh * 2), pygame.SRCALPHA).convert_alpha()
+    atlas.fill((0, 0, 0, 0))
+    for row, is_tree in enumerate((False, True)):
+        spawns = []
+        for t in range(period):
+            for _ in range(rng.randint(1, 2)):
+                px = rng.uniform(5, TILE_SIZE - 5)
+                if is_tree: py = rng.uniform(2, TILE_SIZE - 10)
+                else: py = rng.uniform(TILE_SIZE // 2, TILE_SIZE)
+                spawns.append((t, px, py, rng.uniform(-0.5, 0.5), rng.uniform(-1.5, -0.5), rng.randint(20, 40), rng.choice([RED, ORANGE, YELLOW]), rng.uniform(3, 6)))
+        for frame in range(FIRE_ATLAS_FRAMES):
+            now = frame * steps
+            x0, y0 = frame * fw + ox, row * fh + oy
+            clip = pygame.Rect(frame * fw, row * fh, fw, fh)
+            atlas.set_clip(clip)
+            for (t, px, py, vx, vy, lifetime, color, radius) in spawns:
+                # Same particle seen at every age it has in this frame (one per earlier loop it was spawned in)
+                for age in range((now - t) % period, lifetime, period):
+                    r = int(radius - 0.1 * age)
+                    if age == 0 or r <= 0: continue
+                    pygame.draw.circle(atlas, color, (int(x0 + px + vx * age), int(y0 + py + vy * age)), r)
+    atlas.set_clip(None)
+    return atlas
+
+fire_atlas = None # Loaded the first time atlas mode draws
+# Source rects per variant: fire_atlas_frames[is_tree][frame]
+fire_atlas_frames = [[scaled_rect((frame * FIRE_ATLAS_FRAME_SIZE[0], row * FIRE_ATLAS_FRAME_SIZE[1], *FIRE_ATLAS_FRAME_SIZE)) for frame in range(FIRE_ATLAS_FRAMES)] for row in range(2)]
+
+def draw_fire_atlas(tiles):
+    # tiles: [(x, y, is_tree), ...]. Each tile runs the loop from its own phase so neighbours don't flicker
+    # in step. Frames go into the particle layer, which is added to the screen once like the particles
+    global fire_atlas
+    if not tiles: return
+    if fire_atlas is None:
+        fire_atlas, _ = assets.load(f"fire-atlas-{TILE_SIZE}-{FIRE_ATLAS_FRAMES}x{FIRE_ATLAS_FRAME_MS}", lambda: (bake_fire_atlas(), {}))
+        if RENDER_SCALE != 1: fire_atlas = pygame.transform.smoothscale(fire_atlas, scaled_rect(fire_atlas.get_rect()).size)
+    tick = int(level_clock.now_ms // FIRE_ATLAS_FRAME_MS)
+    ox, oy = FIRE_ATLAS_TILE_OFFSET
+    blits, centers = [], []
+    for (x, y, is_tree) in tiles:
+        sx = x * TILE_SIZE - camera_x - ox
+        sy = y * TILE_SIZE + UI_HEIGHT - camera_y - oy
+        blits.append((fire_atlas, scaled_point((sx, sy)), fire_atlas_frames[is_tree][(tick + x * 7 + y * 13) % FIRE_ATLAS_FRAMES]))
+        centers.append((sx + FIRE_ATLAS_FRAME_SIZE[0] // 2, sy + FIRE_ATLAS_FRAME_SIZE[1] // 2))
+    fire_particle_surface.blits(blits, False)
+    display_updates.add_points(centers, max(FIRE_ATLAS_FRAME_SIZE) // 2)
 
 def update_and_draw_fire_particles():
-    global fire_particles
-    fire_particle_surface.fill((0, 0, 0, 0))
+    global fire_layer_rects
+    # The particle layer is only cleared and blended where particles can be (see ChunkGrid)
+    for rect in fire_layer_rects:
+        fire_particle_surface.fill((0, 0, 0, 0), scaled_rect(rect))
+    chunks.update()
+    view = view_rect()
+    drawn = []
     for i in range(len(fire_particles) - 1, -1, -1):
         particle = fire_particles[i]
         particle[0] += particle[2]
@@ -452,68 +2305,45 @@ def update_and_draw_fire_particles():
         if particle[4] <= 0 or particle[6] <= 0:
             fire_particles.pop(i)
         else:
-            pos = (int(particle[0]), int(particle[1]))
-            pygame.draw.circle(fire_particle_surface, particle[5], pos, int(particle[6]))
+            pos = (int(particle[0]) - camera_x, int(particle[1]) - camera_y)
+            pygame.draw.circle(fire_particle_surface, particle[5], scaled_point(pos), int(particle[6] * RENDER_SCALE))
+            drawn.append(pos)
+    display_updates.add_points(drawn, 6) # Largest particle radius
 
+    atlas_tiles = []
     if game_state in [STATE_GAME_RUNNING, STATE_GAME_STARTING, STATE_GAME_PAUSED, STATE_GAME_PENALTY]:
-        for (x, y) in fire_tiles:
-            is_tree = game_grid[y][x] == TILE_TREE
-            for _ in range(random.randint(1, 2)):
-                px = x * TILE_SIZE + random.uniform(5, TILE_SIZE - 5)
-                if is_tree: py = y * TILE_SIZE + UI_HEIGHT + random.uniform(2, TILE_SIZE - 10) 
-                else: py = y * TILE_SIZE + UI_HEIGHT + random.uniform(TILE_SIZE // 2, TILE_SIZE)
-                p_x_vel = random.uniform(-0.5, 0.5)
-                p_y_vel = random.uniform(-1.5, -0.5)
-                p_lifetime = random.randint(20, 40)
-                p_color = random.choice([RED, ORANGE, YELLOW])
-                p_radius = random.uniform(3, 6)
+        # Only fires in or just below the view emit, particles rise up to 3 tiles
+        x0, y0 = view.left // TILE_SIZE - 1, (view.top - UI_HEIGHT) // TILE_SIZE - 1
+        for (x, y) in fire_index.in_rect(x0, y0, x0 + VIEW_WIDTH + 2, y0 + VIEW_HEIGHT + 5):
+            if smoulder_mask[y, x]:
+                # Embers: an occasional dim particle
+                if particle_rng.random() < 0.3:
+                    fire_particles.append([x * TILE_SIZE + particle_rng.uniform(5, TILE_SIZE - 5), y * TILE_SIZE + UI_HEIGHT + particle_rng.uniform(TILE_SIZE // 2, TILE_SIZE),
+                                           particle_rng.uniform(-0.3, 0.3), particle_rng.uniform(-1.0, -0.3), particle_rng.randint(15, 30), particle_rng.choice(SMOULDER_COLORS), particle_rng.uniform(2, 4)])
+                continue
+            is_tree = game_grid[y, x] == TILE_TREE
+            if fire_atlas_enabled:
+                # The atlas draws the flame, particles only for the odd spark
+                atlas_tiles.append((x, y, int(is_tree)))
+                if particle_rng.random() >= FIRE_ATLAS_SPARK_CHANCE: continue
+            for _ in range(1 if fire_atlas_enabled else particle_rng.randint(1, 2)):
+                px = x * TILE_SIZE + particle_rng.uniform(5, TILE_SIZE - 5)
+                if is_tree: py = y * TILE_SIZE + UI_HEIGHT + particle_rng.uniform(2, TILE_SIZE - 10) 
+                else: py = y * TILE_SIZE + UI_HEIGHT + particle_rng.uniform(TILE_SIZE // 2, TILE_SIZE)
+                p_x_vel = particle_rng.uniform(-0.5, 0.5)
+                p_y_vel = particle_rng.uniform(-1.5, -0.5)
+                p_lifetime = particle_rng.randint(20, 40)
+                p_color = particle_rng.choice([RED, ORANGE, YELLOW])
+                p_radius = particle_rng.uniform(3, 6)
                 fire_particles.append([px, py, p_x_vel, p_y_vel, p_lifetime, p_color, p_radius])
-    screen.blit(fire_particle_surface, (0, 0), special_flags=pygame.BLEND_RGBA_ADD)
-
-def draw_zombies():
-    for z_data in zombies:
-        z_rect = z_data[2]
-        pygame.draw.rect(screen, ZOMBIE_GREEN, z_rect)
-        pygame.draw.rect(screen, RED, (z_rect.x + 5, z_rect.y + 5, 5, 5))
-        pygame.draw.rect(screen, RED, (z_rect.x + 15, z_rect.y + 5, 5, 5))
-        pygame.draw.rect(screen, ZOMBIE_GREEN, (z_rect.x - 5, z_rect.y + 10, 5, 8))
-        pygame.draw.rect(screen, ZOMBIE_GREEN, (z_rect.x + PLAYER_SIZE, z_rect.y + 10, 5, 8))
-
-def draw_flame_zombies():
-    for fz in flame_zombies:
-        z_rect = fz[2]
-        pygame.draw.rect(screen, FLAME_ZOMBIE_COLOR, z_rect) 
-        pygame.draw.rect(screen, YELLOW, (z_rect.x + 5, z_rect.y + 5, 5, 5))
-        pygame.draw.rect(screen, YELLOW, (z_rect.x + 15, z_rect.y + 5, 5, 5))
-        pygame.draw.polygon(screen, YELLOW, [(z_rect.x+5, z_rect.y), (z_rect.x+10, z_rect.y-8), (z_rect.x+15, z_rect.y)])
-
-def draw_powerups():
-    # Water Powerup (Diamond Shape)
-    if water_powerup_rect:
-        center_x = water_powerup_rect.centerx
-        center_y = water_powerup_rect.centery
-        size = 6
-        points = [(center_x, center_y - size), (center_x + size, center_y), (center_x, center_y + size), (center_x - size, center_y)]
-        pygame.draw.polygon(screen, CYAN, points)
-        pygame.draw.polygon(screen, WHITE, points, 1)
-
-    # Speed Powerup (Lightning Bolt / Yellow Square)
-    if speed_powerup_rect:
-        pygame.draw.rect(screen, GOLD_SPEED, speed_powerup_rect)
-        pygame.draw.rect(screen, WHITE, speed_powerup_rect, 1)
-        # Simple lightning symbol
-        sx, sy = speed_powerup_rect.x, speed_powerup_rect.y
-        points = [(sx+10, sy+2), (sx+6, sy+8), (sx+12, sy+8), (sx+4, sy+14)]
-        pygame.draw.polygon(screen, RED, points)
-
-    # Heart Powerup (Red Heart)
-    if heart_powerup_rect:
-        hx, hy = heart_powerup_rect.x, heart_powerup_rect.y
-        # Two circles and a triangle for a heart
-        pygame.draw.circle(screen, HEART_RED, (hx + 4, hy + 4), 4)
-        pygame.draw.circle(screen, HEART_RED, (hx + 12, hy + 4), 4)
-        pygame.draw.polygon(screen, HEART_RED, [(hx, hy+6), (hx+16, hy+6), (hx+8, hy+15)])
-        pygame.draw.rect(screen, WHITE, heart_powerup_rect, 1) # Hitbox outline
+    draw_fire_atlas(atlas_tiles)
+    screen_view = to_screen(view)
+    previous_rects = fire_layer_rects
+    fire_layer_rects = [to_screen(rect).clip(screen_view) for rect in chunks.rects(chunks.effects, chunks.chunk_range(view))]
+    for rect in fire_layer_rects:
+        if rect not in previous_rects: display_updates.add(rect) # Newly blended area, may hold particles drawn outside the layer
+        area = scaled_rect(rect)
+        screen.blit(fire_particle_surface, area, area, special_flags=pygame.BLEND_RGBA_ADD)
 
 def draw_hearts():
     start_x = SCREEN_WIDTH // 2 - 40 
@@ -526,15 +2356,19 @@ def draw_hearts():
         else:
             color = HEART_RED
             
-        x = start_x + (i * 30)
+        hud_layer.add(heart_sprite(color), (start_x + (i * 30), y))
+
+def heart_sprite(color):
+    def paint(surface):
         # Simple Heart Shape
-        pygame.draw.rect(screen, color, (x + 3, y, 6, 3)) 
-        pygame.draw.rect(screen, color, (x + 12, y, 6, 3))
-        pygame.draw.rect(screen, color, (x, y + 3, 21, 3)) 
-        pygame.draw.rect(screen, color, (x, y + 6, 21, 3)) 
-        pygame.draw.rect(screen, color, (x + 3, y + 9, 15, 3)) 
-        pygame.draw.rect(screen, color, (x + 6, y + 12, 9, 3)) 
-        pygame.draw.rect(screen, color, (x + 9, y + 15, 3, 3)) 
+        pygame.draw.rect(surface, color, (3, 0, 6, 3)) 
+        pygame.draw.rect(surface, color, (12, 0, 6, 3))
+        pygame.draw.rect(surface, color, (0, 3, 21, 3)) 
+        pygame.draw.rect(surface, color, (0, 6, 21, 3)) 
+        pygame.draw.rect(surface, color, (3, 9, 15, 3)) 
+        pygame.draw.rect(surface, color, (6, 12, 9, 3)) 
+        pygame.draw.rect(surface, color, (9, 15, 3, 3)) 
+    return cached_sprite(("heart", color), (21, 18), paint)
 
 def draw_player_model(surface, x, y, size, skin, helmet, direction):
     s = size / 25.0
@@ -579,18 +2413,24 @@ def draw_player_model(surface, x, y, size, skin, helmet, direction):
         pygame.draw.rect(surface, SKIN_COLOR, (x+11*s, y+5*s, 5*s, 5*s))
         pygame.draw.rect(surface, NOZZLE, (x+20*s, y+12*s, 5*s, 7*s))
 
+def player_sprite(size, skin, helmet, direction):
+    return cached_sprite(("player", size, skin, helmet, direction), (size, size), lambda surface: draw_player_model(surface, 0, 0, size, skin, helmet, direction))
+
 def draw_player_preview(x, y, skin, helmet):
-    draw_player_model(screen, x, y, 100, skin, helmet, 'down')
+    screen.blit(player_sprite(100, skin, helmet, 'down'), scaled_point((x, y)))
 
-def draw_player():
-    if pygame.time.get_ticks() - last_damage_time < 2000:
-        if (pygame.time.get_ticks() // 100) % 2 == 0:
+def draw_player(batch):
+    r = to_screen(player_rect)
+    display_updates.add(r.inflate(10, 10)) # Also while blinking
+    if invulnerable:
+        if (int(level_clock.now_ms) // 100) % 2 == 0:
             return 
-    draw_player_model(screen, player_rect.x, player_rect.y, PLAYER_SIZE, player_skin_color, player_helmet_color, player_direction)
+    batch.add(player_sprite(PLAYER_SIZE, player_skin_color, player_helmet_color, player_direction), r.topleft, r.bottom)
 
 # --- UPDATED WATER SPRAY LOGIC (Proper Stream) ---
+DIRECTION_VECTORS = {'up': (0, -1), 'down': (0, 1), 'left': (-1, 0), 'right': (1, 0)}
+
 def create_water_spray():
-    global water_particles
     # Base Position
     if player_direction == 'up': px, py = player_rect.centerx, player_rect.top
     elif player_direction == 'down': px, py = player_rect.centerx, player_rect.bottom
@@ -598,60 +2438,167 @@ def create_water_spray():
     else: px, py = player_rect.right, player_rect.centery
     
     # Increase density of particles (SUPER SOAKER EFFECT)
-    particles_per_frame = 5 if has_water_powerup else 3 
+    particles_per_frame = 5 if "water" in player_effects else 3 
     
     speed_base = 7 
     spread = 1.5   # Cone spread
 
+    # Stream axis: the facing direction, or bent toward the nearest fire in front with aim assist
+    aim_x, aim_y = DIRECTION_VECTORS[player_direction]
+    if aim_assist_active:
+        target = aim_assist_target(px, py, aim_x, aim_y)
+        if target:
+            aim_x, aim_y = target
+
     for _ in range(particles_per_frame):
-        # Calculate velocity based on direction + random spread
-        if player_direction == 'up':
-            dx = random.uniform(-spread, spread)
-            dy = -speed_base - random.uniform(0, 2)
-        elif player_direction == 'down':
-            dx = random.uniform(-spread, spread)
-            dy = speed_base + random.uniform(0, 2)
-        elif player_direction == 'left':
-            dx = -speed_base - random.uniform(0, 2)
-            dy = random.uniform(-spread, spread)
-        else: # Right
-            dx = speed_base + random.uniform(0, 2)
-            dy = random.uniform(-spread, spread)
+        # Velocity along the stream axis + random spread across it
+        speed = speed_base + random.uniform(0, 2)
+        side = random.uniform(-spread, spread)
+        dx = aim_x * speed - aim_y * side
+        dy = aim_y * speed + aim_x * side
             
         # Lifetime: Enough to reach across screen partway
         lifetime = random.randint(30, 45) 
-        water_particles.append([px, py, dx, dy, lifetime])
-
-def update_and_draw_water():
-    global water_particles
-    for i in range(len(water_particles) - 1, -1, -1):
-        particle = water_particles[i]
-        
-        # Move
-        particle[0] += particle[2]
-        particle[1] += particle[3]
-        particle[4] -= 1
-        
-        # Hit Detection
-        grid_x = int(particle[0] // TILE_SIZE)
-        grid_y = int((particle[1] - UI_HEIGHT) // TILE_SIZE)
-        
-        if 0 <= grid_x < GRID_WIDTH and 0 <= grid_y < GRID_HEIGHT:
-            if (grid_x, grid_y) in fire_tiles:
-                extinguish_fire(grid_x, grid_y)
-                
-        if particle[4] <= 0:
-            water_particles.pop(i)
-        else:
-            # Draw larger, more visible water
-            radius = 4 if has_water_powerup else 3
-            pygame.draw.circle(screen, WATER_BLUE, (int(particle[0]), int(particle[1])), radius)
+        water_particles.add(px, py, dx, dy, lifetime)
+
+def aim_assist_target(px, py, facing_x, facing_y):
+    # Unit vector from the nozzle to the nearest fire within AIM_ASSIST_MAX_ANGLE of the facing direction
+    x, y = px / TILE_SIZE, (py - UI_HEIGHT) / TILE_SIZE
+    min_cos = math.cos(math.radians(AIM_ASSIST_MAX_ANGLE))
+    best, best_d2 = None, 0
+    for tile in fire_index.within(x, y, AIM_ASSIST_RANGE):
+        dx, dy = tile[0] + 0.5 - x, tile[1] + 0.5 - y
+        d2 = dx * dx + dy * dy
+        if d2 == 0 or (best is not None and d2 >= best_d2): continue
+        if (dx * facing_x + dy * facing_y) / math.sqrt(d2) >= min_cos:
+            best, best_d2 = (dx, dy), d2
+    if best is None: return None
+    dist = math.sqrt(best_d2)
+    return best[0] / dist, best[1] / dist
+
+def draw_fire_indicator():
+    # Arrow toward the nearest fire: at the screen edge when it's off screen, next to the player
+    # when it's out of aim assist range
+    px, py = player_rect.center
+    tile = fire_index.nearest(px / TILE_SIZE, (py - UI_HEIGHT) / TILE_SIZE)
+    if tile is None: return
+    fx = tile[0] * TILE_SIZE + TILE_SIZE / 2
+    fy = tile[1] * TILE_SIZE + UI_HEIGHT + TILE_SIZE / 2
+    dx, dy = fx - px, fy - py
+    dist = math.hypot(dx, dy)
+    if dist == 0: return
+    ux, uy = dx / dist, dy / dist
+
+    view = view_rect()
+    if view.collidepoint(fx, fy):
+        if dist <= AIM_ASSIST_RANGE * TILE_SIZE: return
+        ax, ay = px + ux * 30, py + uy * 30
+    else:
+        margin = 14
+        scale = dist
+        if ux > 0: scale = min(scale, (view.right - margin - px) / ux)
+        elif ux < 0: scale = min(scale, (view.left + margin - px) / ux)
+        if uy > 0: scale = min(scale, (view.bottom - margin - py) / uy)
+        elif uy < 0: scale = min(scale, (view.top + margin - py) / uy)
+        ax, ay = px + ux * scale, py + uy * scale
+
+    ax, ay = ax - camera_x, ay - camera_y
+    points = [(ax + ux * 10, ay + uy * 10), (ax - ux * 6 - uy * 7, ay - uy * 6 + ux * 7), (ax - ux * 6 + uy * 7, ay - uy * 6 - ux * 7)]
+    points = [scaled_point(point) for point in points]
+    pygame.draw.polygon(screen, YELLOW, points)
+    display_updates.add_render(pygame.draw.polygon(screen, BLACK, points, scaled_line(2)))
+
+# --- Minimap ---
+MINIMAP_FIRE = TILE_OBSTACLE + 1 # Lookup table rows for burning and smouldering tiles
+MINIMAP_SMOULDER = TILE_OBSTACLE + 2
+
+class Minimap:
+    # Overview of the whole world. Tile types, obstacles and fire go through a colour lookup table
+    # into a one pixel per tile image (surfarray), which is scaled up; no per tile drawing.
+    # Fire front boxes, zombies, the player and the camera view are drawn on top every frame.
+    def __init__(self):
+        self.lut = np.zeros((MINIMAP_SMOULDER + 1, 3), dtype=np.uint8)
+        for tile_type, color in [(TILE_GRASS, DARK_GREEN), (TILE_TREE, TREE_LEAVES_MEDIUM), (BURNT_GROUND, COLOR_BURNT_GROUND),
+                                 (TILE_DIRT, DIRT_COLOR), (TILE_BUSH, BUSH_COLOR_LIGHT), (TILE_FLOWERS, DARK_GREEN),
+                                 (TILE_OBSTACLE, OBSTACLE_COLOR), (MINIMAP_FIRE, ORANGE), (MINIMAP_SMOULDER, SMOULDER_COLORS[0])]:
+            self.lut[tile_type] = color
+        scale = min(MINIMAP_MAX_SIZE[0] / GRID_WIDTH, MINIMAP_MAX_SIZE[1] / GRID_HEIGHT)
+        self.scale = max(1, int(scale)) if scale >= 1 else scale
+        self.image = pygame.Surface((GRID_WIDTH, GRID_HEIGHT)).convert()
+        self.size = (int(GRID_WIDTH * self.scale), int(GRID_HEIGHT * self.scale))
+        self.surface = pygame.Surface(scaled_rect((0, 0) + self.size).size).convert()
+        self.tiles = np.zeros((GRID_HEIGHT, GRID_WIDTH), dtype=np.uint8)
+        self.fronts = []
+        self.next_refresh = 0
+
+    def refresh(self):
+        self.tiles[:] = game_grid
+        if obstacle_tiles:
+            xs, ys = zip(*obstacle_tiles)
+            self.tiles[ys, xs] = TILE_OBSTACLE
+        self.tiles[fire_mask] = MINIMAP_FIRE
+        self.tiles[smoulder_mask] = MINIMAP_SMOULDER
+        pygame.surfarray.blit_array(self.image, self.lut[self.tiles.T]) # surfarray is indexed [x, y]
+        pygame.transform.scale(self.image, self.surface.get_size(), self.surface)
+        self.fronts = fire_clusters.clusters()
+
+    def draw(self, now_ms):
+        if now_ms >= self.next_refresh:
+            self.refresh()
+            self.next_refresh = now_ms + MINIMAP_REFRESH_MS
+        w, h = self.size
+        x0, y0 = SCREEN_WIDTH - w - 10, SCREEN_HEIGHT - h - 10
+        screen.blit(self.surface, scaled_point((x0, y0)))
+        s = self.scale
+
+        def marker(rect, color, size):
+            mx = x0 + int(rect.centerx / TILE_SIZE * s)
+            my = y0 + int((rect.centery - UI_HEIGHT) / TILE_SIZE * s)
+            pygame.draw.rect(screen, color, scaled_rect((mx - size // 2, my - size // 2, size, size)))
+
+        # Fire fronts, the largest one highlighted
+        for i, (size, (min_x, min_y, max_x, max_y)) in enumerate(self.fronts):
+            box = pygame.Rect(x0 + int(min_x * s) - 1, y0 + int(min_y * s) - 1, int((max_x - min_x + 1) * s) + 2, int((max_y - min_y + 1) * s) + 2)
+            pygame.draw.rect(screen, YELLOW if i == 0 else RED, scaled_rect(box), 1)
+
+        for z in zombies: marker(z.rect, ZOMBIE_GREEN, 4)
+        for fz in flame_zombies: marker(fz.rect, FLAME_ZOMBIE_COLOR, 4)
+        marker(player_rect, CYAN, 5)
+
+        view = view_rect()
+        pygame.draw.rect(screen, WHITE, scaled_rect((x0 + int(view.x / TILE_SIZE * s), y0 + int((view.y - UI_HEIGHT) / TILE_SIZE * s),
+                                                     int(VIEW_WIDTH * s), int(VIEW_HEIGHT * s))), 1)
+        pygame.draw.rect(screen, BLACK, scaled_rect((x0 - 1, y0 - 1, w + 2, h + 2)), 1)
+        display_updates.add((x0 - 3, y0 - 3, w + 6, h + 6)) # Markers stick out of the edge by up to 2px
+
+minimap = Minimap()
+
+def update_water():
+    if not water_particles.count: return
+    # Move, then put out every burning tile a particle passed over (fast particles can't skip a tile)
+    start, end = water_particles.step()
+    if fire_tiles:
+        hit_xs, hit_ys = swept_fire_hits(start, end)
+        for grid_x, grid_y in zip(hit_xs.tolist(), hit_ys.tolist()):
+            extinguish_fire(grid_x, grid_y)
+    water_particles.remove_expired()
+
+def draw_water():
+    # Draw larger, more visible water
+    radius = 4 if "water" in player_effects else 3
+    pos = water_particles.pos[:water_particles.count].astype(int) - (camera_x, camera_y)
+    if WORLD_SIZE: # Cull to the view, with one screen everything is in it
+        pos = pos[(pos[:, 0] > -radius) & (pos[:, 0] < SCREEN_WIDTH + radius) & (pos[:, 1] > UI_HEIGHT - radius) & (pos[:, 1] < SCREEN_HEIGHT + radius)]
+    points = pos if RENDER_SCALE == 1 else np.rint(pos * RENDER_SCALE).astype(int)
+    for x, y in points.tolist():
+        pygame.draw.circle(screen, WATER_BLUE, (x, y), scaled_line(radius))
+    display_updates.add_points(pos, radius)
 
 def extinguish_fire(grid_x, grid_y):
-    global score, game_state, pause_start_time
+    global score, game_state, high_score
     if (grid_x, grid_y) in fire_tiles:
-        game_grid[grid_y][grid_x] = BURNT_GROUND
-        fire_tiles.remove((grid_x, grid_y))
+        set_tile(grid_x, grid_y, BURNT_GROUND)
+        remove_fire_tile((grid_x, grid_y))
         score += 1
         
         if current_level_id == 6: return # Normal Survival
@@ -666,13 +2613,15 @@ def extinguish_fire(grid_x, grid_y):
             if score == 1:
                 spawn_new_fire_cluster(1)
                 if current_level_id == 5:
-                    game_state = STATE_GAME_PAUSED
-                    pause_start_time = pygame.time.get_ticks()
+                    start_countdown(STATE_GAME_PAUSED, COUNTDOWN_DURATION_MS)
             elif score == 3: spawn_new_fire_cluster(2)
             elif score == 8: spawn_new_fire_cluster(3)
+            if not fire_tiles: # Put out the last fire
+                game_state = STATE_GAME_WON
+                if score > high_score: high_score = score
 
 def draw_game_ui():
-    pygame.draw.rect(screen, UI_BG_COLOR, (0, 0, SCREEN_WIDTH, UI_HEIGHT))
+    pygame.draw.rect(screen, UI_BG_COLOR, scaled_rect((0, 0, SCREEN_WIDTH, UI_HEIGHT)))
     draw_text(f"Score: {score}", font_menu_item, WHITE, screen, 20, 10)
     
     display_level = 1
@@ -686,14 +2635,15 @@ def draw_game_ui():
     
     # Draw Hearts for survival modes or if user has heart powerup
     if current_level_id in [6, 7, 9] or player_lives > 3: draw_hearts()
+    hud_layer.draw(screen)
     
     # Powerup Status
     status_x = 280
-    if has_water_powerup:
-        draw_text("2x WATER!", font_menu_tiny, CYAN, screen, status_x, 5)
+    for kind in player_effects.values():
+        draw_text(kind.LABEL, font_menu_tiny, kind.LABEL_COLOR, screen, status_x, 5)
         status_x += 100
-    if has_speed_powerup:
-        draw_text("SPEED!", font_menu_tiny, GOLD_SPEED, screen, status_x, 5)
+    if fire_clusters.count() > 1:
+        draw_text(f"{fire_clusters.count()} FRONTS", font_menu_tiny, ORANGE, screen, 280, 24)
 
     if current_level_id == 1 or current_level_id == 3: 
         fire_text = f"Fires Left: {len(fire_tiles)}"
@@ -703,7 +2653,7 @@ def draw_game_ui():
     draw_text(f"Time: {time_remaining}", font_menu_item, WHITE, screen, SCREEN_WIDTH - 130, 10)
 
 def draw_countdown(start_time_ref):
-    elapsed = pygame.time.get_ticks() - start_time_ref
+    elapsed = level_clock.now_ms - start_time_ref
     if elapsed < 1000: text = "3"
     elif elapsed < 2000: text = "2"
     elif elapsed < 3000: text = "1"
@@ -712,38 +2662,125 @@ def draw_countdown(start_time_ref):
     draw_text(text, font_huge, WHITE, screen, SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2, center=True)
 
 def draw_penalty_countdown():
-    elapsed = pygame.time.get_ticks() - penalty_start_time
-    remaining = 3 - (elapsed // 1000)
+    elapsed = level_clock.now_ms - countdown_start_time
+    remaining = 3 - int(elapsed // 1000)
     if remaining < 0: remaining = 0
     draw_text("STUCK!", font_large, RED, screen, SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2 - 50, center=True)
     draw_text(str(remaining), font_huge, WHITE, screen, SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2 + 50, center=True)
 
+def draw_debug_overlay():
+    panel = pygame.Surface(scaled_rect((0, 0, 360, 360)).size, pygame.SRCALPHA)
+    panel.fill((0, 0, 0, 180))
+    display_updates.add_render(screen.blit(panel, scaled_point((10, UI_HEIGHT + 10))))
+    x = 20
+    y = UI_HEIGHT + 20
+
+    draw_text(f"FPS {clock.get_fps():.1f}", font_menu_tiny, WHITE, screen, x, y)
+    y += 18
+    draw_text(f"MAP {GRID_WIDTH}x{GRID_HEIGHT} seed {map_seed}, wind {fire_wind}", font_menu_tiny, WHITE, screen, x, y)
+    y += 18
+    draw_text(f"FIRES {len(fire_tiles)} in {fire_clusters.count()} fronts, largest {fire_clusters.largest()}", font_menu_tiny, WHITE, screen, x, y)
+    y += 18
+    draw_text(f"BURN {int(smoulder_mask.sum())} smouldering, {burnt_out_count} burnt out", font_menu_tiny, WHITE, screen, x, y)
+    y += 18
+    draw_text(f"FLAMES {'atlas' if fire_atlas_enabled else 'particles'}, {len(fire_particles)} particles", font_menu_tiny, WHITE, screen, x, y)
+    y += 18
+    draw_text(f"CHUNKS {int(chunks.effects.sum())}/{chunks.effects.size} hot, {len(chunks.surfaces)} cached, {chunks.take_redraws()} redrawn", font_menu_tiny, WHITE, screen, x, y)
+    y += 18
+    draw_text(f"ENTITIES {broadphase.count} in {len(broadphase.cells)} cells", font_menu_tiny, WHITE, screen, x, y)
+    y += 18
+    present = f"{display_updates.fraction * 100:.0f}% dirty" if DIRTY_RECTS else "full flip"
+    window_w, window_h = pygame.display.get_window_size()
+    draw_text(f"DISPLAY {RENDER_WIDTH}x{RENDER_HEIGHT} in {window_w}x{window_h}, {present}", font_menu_tiny, WHITE, screen, x, y)
+    y += 18
+    draw_text(f"ASSETS {assets.hits} cached, {assets.misses} built, {assets.load_ms:.0f}ms", font_menu_tiny, WHITE, screen, x, y)
+    y += 18
+    draw_text(f"RESTART {restart_timer.reset_ms:.1f}ms, to frame {restart_timer.first_frame_ms:.1f}ms, {restart_timer.last_collections} gc", font_menu_tiny, WHITE, screen, x, y)
+    y += 18
+    summary = latency_tracker.last_summary
+    if not summary:
+        draw_text(f"Latency: collecting ({TELEMETRY_INTERVAL_SEC}s)", font_menu_tiny, WHITE, screen, x, y)
+        return
+
+    labels = [("sample_to_consume", "IN>USE"), ("consume_to_flip", "USE>PX"), ("sample_to_flip", "IN>PX")]
+    for name, label in labels:
+        s = summary[name]
+        draw_text(f"{label} p50 {s['p50']:.1f} p95 {s['p95']:.1f}ms", font_menu_tiny, WHITE, screen, x, y)
+        y += 16
+    extra = latency_tracker.last_extra
+    if extra:
+        draw_text(f"FILTER lag {extra['filter_lag_ms']:.1f}ms poll {extra['input_poll_hz']:.0f}Hz", font_menu_tiny, WHITE, screen, x, y)
+
+    # Input-to-photon histogram (one bar per bucket)
+    counts = summary["sample_to_flip"]["hist"]
+    peak = max(counts) if max(counts) > 0 else 1
+    bar_w = 20
+    base_y = y + 70
+    for i, count in enumerate(counts):
+        h = int(60 * count / peak)
+        color = YELLOW if i < LATENCY_BUCKET_COUNT - 1 else RED
+        pygame.draw.rect(screen, color, scaled_rect((x + i * bar_w, base_y - h, bar_w - 2, h)))
+    draw_text(f"0-{LATENCY_BUCKET_MS * LATENCY_BUCKET_COUNT}ms, n={summary['sample_to_flip']['n']}", font_menu_tiny, WHITE, screen, x, base_y + 4)
+
+def start_countdown(state, duration_ms):
+    # Freezes game time (spread, spawns, round timer) while a countdown / penalty is on screen
+    global game_state, countdown_start_time
+    game_state = state
+    countdown_start_time = level_clock.now_ms
+    game_clock.pause()
+    level_scheduler.schedule(duration_ms, end_countdown)
+
+def end_countdown():
+    global game_state
+    if game_state in [STATE_GAME_STARTING, STATE_GAME_PAUSED, STATE_GAME_PENALTY]:
+        game_state = STATE_GAME_RUNNING
+        game_clock.resume()
+
+def end_invulnerability():
+    global invulnerable
+    invulnerable = False
+
+def schedule_level_timers(spread_interval_ms, obstacle_interval_ms=0, burn_out=False):
+    if spread_interval_ms > 0:
+        game_scheduler.schedule(spread_interval_ms, spread_fire, spread_interval_ms)
+    if burn_out:
+        game_scheduler.schedule(FIRE_BURN_TICK_MS, burn_tick, FIRE_BURN_TICK_MS)
+    if obstacle_interval_ms > 0:
+        game_scheduler.schedule(obstacle_interval_ms, spawn_obstacle, obstacle_interval_ms)
+
+def advance_game_time(dt_ms):
+    # Called once per frame (or headless step) while a round is on screen
+    dt_ms = min(dt_ms, MAX_FRAME_DT_MS)
+    level_clock.advance(dt_ms)
+    level_scheduler.update()
+    game_clock.advance(dt_ms)
+    game_scheduler.update()
+
 def init_game():
-    global game_state, score, game_start_time, time_remaining, player_rect, water_particles, player_direction, player_speed
-    global pause_start_time, total_paused_time, fire_particles, obstacle_tiles, penalty_start_time, current_level_id
-    global zombies, player_lives, last_damage_time, flame_zombies, water_powerup_rect, speed_powerup_rect, heart_powerup_rect
-    global has_water_powerup, has_speed_powerup
+    # Resets the round in place: the map, fire arrays, particle lists, entity registries and chunk
+    # surfaces all keep their storage, so a restart allocates next to nothing
+    global game_state, score, time_remaining, player_rect, player_direction, player_speed
+    global current_level_id
+    global player_lives, invulnerable, aim_assist_active
     
+    restart_timer.start()
     score = 0
-    game_start_time = pygame.time.get_ticks()
-    total_paused_time = 0
+    level_clock.reset()
+    game_clock.reset()
+    level_scheduler.clear()
+    game_scheduler.clear()
     time_remaining = GAME_DURATION_SEC
-    player_rect.center = (SCREEN_WIDTH // 2, (SCREEN_HEIGHT - UI_HEIGHT) // 2 + UI_HEIGHT)
-    water_particles = []
-    fire_particles = []
-    zombies = [] 
-    flame_zombies = []
-    
-    water_powerup_rect = None
-    speed_powerup_rect = None
-    heart_powerup_rect = None
-    
-    has_water_powerup = False
-    has_speed_powerup = False
+    player_rect.center = (WORLD_PIXEL_WIDTH // 2, WORLD_PIXEL_HEIGHT // 2 + UI_HEIGHT)
+    update_camera()
+    water_particles.clear()
+    minimap.next_refresh = 0
+    fire_particles.clear()
+    for registry in ENTITY_REGISTRIES: registry.clear()
+    player_effects.clear()
     player_speed = player_base_speed
     
     player_lives = 3 
-    last_damage_time = 0
+    invulnerable = False
     player_direction = 'down'
     
     if selected_player_index == 0:
@@ -756,6 +2793,13 @@ def init_game():
         player_skin_color = PLAYER_SKIN_BROWN
         player_helmet_color = PLAYER_HELMET_GREEN
     
+    # Per-player stick calibration, tremor filter for Parkinson's mode
+    joy1.apply_calibration(player_calibrations.get(str(selected_player_index), {}))
+    use_filter = selected_mode_index == 0 or not TREMOR_FILTER_PARKINSONS_ONLY
+    joy1.set_filter(use_filter)
+    joy2.set_filter(use_filter)
+    aim_assist_active = AIM_ASSIST_ENABLED and (selected_mode_index == 0 or not AIM_ASSIST_PARKINSONS_ONLY)
+
     create_grid()
     
     # --- PARKINSONS MODE ---
@@ -764,27 +2808,18 @@ def init_game():
             current_level_id = 1
             spawn_initial_fire(LEVEL_1_FIRE_COUNT)
             game_state = STATE_GAME_RUNNING
-            pygame.time.set_timer(FIRE_SPREAD_EVENT, 0)
-            pygame.time.set_timer(OBSTACLE_SPAWN_EVENT, 0)
         elif selected_level_index == 1:
             current_level_id = 2
             spawn_initial_fire(1)
             game_state = STATE_GAME_RUNNING
-            pygame.time.set_timer(FIRE_SPREAD_EVENT, 0)
-            pygame.time.set_timer(OBSTACLE_SPAWN_EVENT, 0)
         elif selected_level_index == 2: 
             current_level_id = 8
             spawn_initial_fire(3)
             game_state = STATE_GAME_RUNNING
-            pygame.time.set_timer(FIRE_SPREAD_EVENT, 3000)
-            pygame.time.set_timer(OBSTACLE_SPAWN_EVENT, 0)
         elif selected_level_index == 3: # NEW: Parkinson's Level 4
             current_level_id = 9 # Unique ID for Parkinson Survival
             spawn_initial_fire(3) 
-            game_state = STATE_GAME_STARTING
-            pause_start_time = pygame.time.get_ticks()
-            pygame.time.set_timer(FIRE_SPREAD_EVENT, 2000) 
-            pygame.time.set_timer(OBSTACLE_SPAWN_EVENT, 0)
+            start_countdown(STATE_GAME_STARTING, COUNTDOWN_DURATION_MS)
             for _ in range(ZOMBIE_COUNT_PARKINSONS): spawn_zombie()
             
     # --- NORMAL MODE ---
@@ -793,542 +2828,837 @@ def init_game():
             current_level_id = 3
             spawn_initial_fire(LEVEL_1_FIRE_COUNT)
             game_state = STATE_GAME_RUNNING
-            pygame.time.set_timer(FIRE_SPREAD_EVENT, 0)
-            pygame.time.set_timer(OBSTACLE_SPAWN_EVENT, 0)
-            spawn_water_powerup() # Add water powerup
+            spawn_powerup(water_powerups)
             
         elif selected_level_index == 1: 
             current_level_id = 4
             spawn_initial_fire(1)
-            game_state = STATE_GAME_STARTING
-            pause_start_time = pygame.time.get_ticks()
-            pygame.time.set_timer(FIRE_SPREAD_EVENT, 2000)
-            pygame.time.set_timer(OBSTACLE_SPAWN_EVENT, 0)
-            spawn_water_powerup() # Add water powerup
+            start_countdown(STATE_GAME_STARTING, COUNTDOWN_DURATION_MS)
+            spawn_powerup(water_powerups)
             
         elif selected_level_index == 2: 
             current_level_id = 5
             spawn_initial_fire(1)
-            game_state = STATE_GAME_STARTING
-            pause_start_time = pygame.time.get_ticks()
-            pygame.time.set_timer(FIRE_SPREAD_EVENT, 2000)
-            pygame.time.set_timer(OBSTACLE_SPAWN_EVENT, OBSTACLE_SPAWN_RATE_MS)
+            start_countdown(STATE_GAME_STARTING, COUNTDOWN_DURATION_MS)
             
         elif selected_level_index == 3: # Normal Level 4: Survival
             current_level_id = 6
             spawn_initial_fire(3) 
-            game_state = STATE_GAME_STARTING
-            pause_start_time = pygame.time.get_ticks()
-            pygame.time.set_timer(FIRE_SPREAD_EVENT, 2000) 
-            pygame.time.set_timer(OBSTACLE_SPAWN_EVENT, 0)
+            start_countdown(STATE_GAME_STARTING, COUNTDOWN_DURATION_MS)
             for _ in range(ZOMBIE_COUNT_NORMAL): spawn_zombie() # 3 Zombies
-            spawn_water_powerup()
-            spawn_speed_powerup()
+            spawn_powerup(water_powerups)
+            spawn_powerup(speed_powerups)
 
         elif selected_level_index == 4: # Normal Level 5: Flame Zombie
             current_level_id = 7
             spawn_initial_fire(1)
-            game_state = STATE_GAME_STARTING
-            pause_start_time = pygame.time.get_ticks()
-            pygame.time.set_timer(FIRE_SPREAD_EVENT, 1500)
-            pygame.time.set_timer(OBSTACLE_SPAWN_EVENT, 0)
-            spawn_flame_zombie() 
-            spawn_flame_zombie() # 2 Flame Zombies
-            spawn_water_powerup()
-            spawn_speed_powerup()
-            spawn_heart_powerup()
+            start_countdown(STATE_GAME_STARTING, COUNTDOWN_DURATION_MS)
+            for _ in range(FLAME_ZOMBIE_COUNT): spawn_flame_zombie() # 2 Flame Zombies
+            spawn_powerup(water_powerups)
+            spawn_powerup(speed_powerups)
+            spawn_powerup(heart_powerups)
+
+    set_wind(FIRE_WIND.get(current_level_id, (0, 0)))
+    schedule_level_timers(FIRE_SPREAD_INTERVAL_MS[current_level_id], OBSTACLE_SPAWN_RATE_MS if current_level_id == 5 else 0,
+                          current_level_id in FIRE_BURN_OUT_LEVELS)
+    restart_timer.reset_done()
+
+def update_game(new_x, new_y, spraying):
+    # One STATE_GAME_RUNNING tick once input has been turned into a target position and
+    # player_direction. Shared by the main loop and the headless environment (forest_env.py).
+    global game_state, high_score, time_remaining
+
+    # OBSTACLE COLLISION
+    obstacle = obstacle_under(pygame.Rect(new_x, new_y, PLAYER_SIZE, PLAYER_SIZE))
+    if obstacle:
+        if current_level_id == 5: 
+            start_countdown(STATE_GAME_PENALTY, PENALTY_DURATION_MS)
+            remove_obstacle(obstacle)
+    else:
+        player_rect.x = new_x
+        player_rect.y = new_y
+
+    # Spray Trigger
+    if spraying:
+        create_water_spray()
+    update_water()
+
+    playable_rect = pygame.Rect(0, UI_HEIGHT, WORLD_PIXEL_WIDTH, WORLD_PIXEL_HEIGHT)
+    player_rect.clamp_ip(playable_rect)
+
+    # Zombies chase and hurt, flame zombies set fire, powerups get picked up (see ENTITY_REGISTRIES)
+    update_entities()
+
+    # WIN/LOSS LOGIC
+    if len(fire_tiles) == 0:
+        if current_level_id == 7:
+             spawn_new_fire_cluster(3) 
+        elif current_level_id == 8:
+             spawn_new_fire_cluster(3)
+        elif current_level_id in [4, 5]:
+            # Won in extinguish_fire when the water put the last fire out, otherwise it burnt out on its own
+            if game_state != STATE_GAME_WON: spawn_new_fire_cluster(3)
+        elif current_level_id != 6 and current_level_id != 9:
+            game_state = STATE_GAME_WON
+            if score > high_score: high_score = score
+        else:
+            spawn_new_fire_cluster(3)
+        
+    time_remaining = GAME_DURATION_SEC - int(game_clock.now_ms // 1000)
+
+    if time_remaining <= 0:
+        time_remaining = 0
+        if current_level_id in [6, 7, 8, 9]:
+            game_state = STATE_GAME_WON
+        else:
+            game_state = STATE_GAME_OVER
+        
+        if score > high_score: high_score = score
+
+    if current_level_id >= 4:
+        # Burned down tiles count as lost forest, as if they were still burning
+        fire_percentage = (len(fire_tiles) + burnt_out_count) / total_tiles
+        if fire_percentage >= MAX_FIRE_PERCENTAGE:
+            game_state = STATE_GAME_OVER
+            if score > high_score: high_score = score
+
+# --- Display Updates ---
+class DirtyRects:
+    # Screen areas that changed this frame. The frame is still drawn in full into screen, only the
+    # present is partial: display.update() gets this frame's rects plus last frame's, so whatever
+    # moved away is painted over too. Anything that can't be tracked (scrolling, menus, countdowns)
+    # asks for a full() flip, as does a dirty area above DIRTY_FULL_FLIP_FRACTION of the screen.
+    def __init__(self):
+        self.rects = []
+        self.previous = []
+        self.full_frame = True
+        self.camera = None
+        self.hud = None
+        self.fraction = 1.0 # Share of the screen presented last frame
+
+    def add(self, rect):
+        # rect in game pixels
+        self.add_render(scaled_rect(rect))
+
+    def add_render(self, rect):
+        # rect in render target pixels
+        self.rects.append(pygame.Rect(rect).inflate(DIRTY_MARGIN * 2, DIRTY_MARGIN * 2))
+
+    def add_points(self, points, radius):
+        # Screen points (particles) bucketed into DIRTY_CELL squares, runs along a row merged into one rect
+        if len(points) == 0: return
+        cells = np.unique(np.asarray(points, dtype=int) // DIRTY_CELL, axis=0).tolist()
+        start = end = None
+        for cx, cy in sorted(cells, key=lambda cell: (cell[1], cell[0])):
+            if end and cy == end[1] and cx == end[0] + 1:
+                end = (cx, cy)
+                continue
+            if start: self.add_cells(start, end, radius)
+            start = end = (cx, cy)
+        self.add_cells(start, end, radius)
+
+    def add_cells(self, start, end, radius):
+        self.add(pygame.Rect(start[0] * DIRTY_CELL - radius, start[1] * DIRTY_CELL - radius,
+                             (end[0] - start[0] + 1) * DIRTY_CELL + radius * 2, DIRTY_CELL + radius * 2))
+
+    def full(self):
+        self.full_frame = True
+
+    def present(self):
+        bounds = screen.get_rect()
+        current = [rect.clip(bounds) for rect in self.rects]
+        rects = [rect for rect in current + self.previous if rect.w and rect.h]
+        # Overlaps are counted twice, so this is an upper bound on the area
+        self.fraction = min(1.0, sum(rect.w * rect.h for rect in rects) / (bounds.w * bounds.h))
+        if not DIRTY_RECTS or self.full_frame or self.fraction > DIRTY_FULL_FLIP_FRACTION:
+            pygame.display.flip()
+            self.fraction = 1.0
+        else:
+            pygame.display.update(rects)
+        # Nothing tracked what a full() frame drew, so the next frame presents all of it again
+        self.previous = [bounds] if self.full_frame else current
+        self.rects = []
+        self.full_frame = False
+
+display_updates = DirtyRects()
+
+def track_gameplay_changes():
+    # Scrolling moves every pixel, and the HUD bar is only redrawn on screen when a value in it changed
+    if (camera_x, camera_y) != display_updates.camera:
+        display_updates.camera = (camera_x, camera_y)
+        display_updates.full()
+    hud = (score, current_level_id, player_lives, tuple(player_effects), fire_clusters.count(), len(fire_tiles), time_remaining)
+    if hud != display_updates.hud:
+        display_updates.hud = hud
+        display_updates.add((0, 0, SCREEN_WIDTH, UI_HEIGHT))
+
+def draw_gameplay():
+    update_camera()
+    track_gameplay_changes()
+    draw_jungle_and_fire()
+    update_and_draw_fire_particles()
+    
+    # Player, zombies and powerups go out in one depth sorted batch, above the water stream
+    draw_player(actor_layer)
+    if game_state == STATE_GAME_RUNNING:
+        draw_water()
+        for registry in ENTITY_REGISTRIES:
+            registry.draw(actor_layer)
+    actor_layer.draw(screen)
+    if game_state == STATE_GAME_RUNNING and aim_assist_active:
+        draw_fire_indicator()
+    if show_minimap:
+        minimap.draw(level_clock.now_ms)
+    
+    draw_game_ui()
+    if autopilot_enabled:
+        draw_text("AUTOPILOT", font_menu_tiny, YELLOW, screen, 10, SCREEN_HEIGHT - 20)
+    
+    if current_level_id >= 4: 
+        if game_state == STATE_GAME_STARTING:
+            draw_text("GET READY!", font_large, WHITE, screen, SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2 - 100, center=True)
+            draw_countdown(countdown_start_time)
+        elif game_state == STATE_GAME_PAUSED:
+             pass
+        elif game_state == STATE_GAME_PENALTY:
+            draw_penalty_countdown()
+
+# --- Autopilot (Soak Testing) ---
+# Plays through the same update_game() path as a human: picks a target position + player_direction
+# each frame. Runs from zombies, steps around obstacles, grabs nearby powerups, then lines up with
+# the nearest fire and sprays along the stream axis.
+
+AUTOPILOT_DIRECTIONS = {(0, -1): 'up', (0, 1): 'down', (-1, 0): 'left', (1, 0): 'right'}
+
+def autopilot_nearest(points, px, py):
+    best, best_dist = None, 0
+    for (x, y) in points:
+        dist = abs(x - px) + abs(y - py)
+        if best is None or dist < best_dist:
+            best, best_dist = (x, y), dist
+    return best, best_dist
+
+def autopilot_blocked(new_x, new_y):
+    test_rect = pygame.Rect(new_x, new_y, PLAYER_SIZE, PLAYER_SIZE)
+    if not pygame.Rect(0, UI_HEIGHT, WORLD_PIXEL_WIDTH, WORLD_PIXEL_HEIGHT).contains(test_rect):
+        return True
+    return obstacle_under(test_rect) is not None
+
+def autopilot_move(dx, dy, step):
+    # One step along (dx, dy), sidestepping along the other axis when an obstacle or wall is in the way
+    global player_direction
+    for mx, my in [(dx, dy), (dy, dx), (-dy, -dx)]:
+        new_x = player_rect.x + mx * step
+        new_y = player_rect.y + my * step
+        if not autopilot_blocked(new_x, new_y):
+            player_direction = AUTOPILOT_DIRECTIONS[(mx, my)]
+            return new_x, new_y
+    return player_rect.x, player_rect.y
+
+def autopilot_approach(dx, dy):
+    # Close the larger gap first, never overshooting the target
+    if abs(dx) >= abs(dy): return autopilot_move(1 if dx > 0 else -1, 0, min(player_speed, abs(dx)))
+    return autopilot_move(0, 1 if dy > 0 else -1, min(player_speed, abs(dy)))
+
+def autopilot_input():
+    # Returns (new_x, new_y, spraying) like the keyboard / joystick code
+    global player_direction
+    px, py = player_rect.center
+
+    # 1. Run from the closest zombie
+    threats = [z.rect.center for z in zombies] + [fz.rect.center for fz in flame_zombies]
+    threat, dist = autopilot_nearest(threats, px, py)
+    if threat and dist < AUTOPILOT_FLEE_DISTANCE:
+        ax, ay = px - threat[0], py - threat[1]
+        if abs(ax) >= abs(ay): return autopilot_move(1 if ax >= 0 else -1, 0, player_speed) + (False,)
+        return autopilot_move(0, 1 if ay >= 0 else -1, player_speed) + (False,)
+
+    # 2. Pick up powerups that are close
+    powerups = [p.rect.center for registry in POWERUP_REGISTRIES for p in registry if p.available()]
+    powerup, dist = autopilot_nearest(powerups, px, py)
+    if powerup and dist < AUTOPILOT_POWERUP_DISTANCE:
+        return autopilot_approach(powerup[0] - px, powerup[1] - py) + (False,)
+
+    # 3. Line up with the nearest fire on one axis, then spray along the other
+    tile = fire_index.nearest(px / TILE_SIZE, (py - UI_HEIGHT) / TILE_SIZE)
+    if not tile:
+        return player_rect.x, player_rect.y, False
+    dx = tile[0] * TILE_SIZE + TILE_SIZE // 2 - px
+    dy = tile[1] * TILE_SIZE + UI_HEIGHT + TILE_SIZE // 2 - py
+    half = TILE_SIZE // 2
+
+    if abs(dy) <= half:
+        if abs(dx) < TILE_SIZE: # Standing on it, the nozzle is past the tile - back off first
+            return autopilot_move(-1 if dx > 0 else 1, 0, player_speed) + (False,)
+        if abs(dx) <= AUTOPILOT_SPRAY_RANGE:
+            player_direction = 'right' if dx > 0 else 'left'
+            return player_rect.x, player_rect.y, True
+        return autopilot_move(1 if dx > 0 else -1, 0, min(player_speed, abs(dx))) + (False,)
+    if abs(dx) <= half:
+        if abs(dy) < TILE_SIZE:
+            return autopilot_move(0, -1 if dy > 0 else 1, player_speed) + (False,)
+        if abs(dy) <= AUTOPILOT_SPRAY_RANGE:
+            player_direction = 'down' if dy > 0 else 'up'
+            return player_rect.x, player_rect.y, True
+        return autopilot_move(0, 1 if dy > 0 else -1, min(player_speed, abs(dy))) + (False,)
+
+    # Line up on whichever axis is closer
+    if abs(dy) < abs(dx): return autopilot_move(0, 1 if dy > 0 else -1, min(player_speed, abs(dy))) + (False,)
+    return autopilot_move(1 if dx > 0 else -1, 0, min(player_speed, abs(dx))) + (False,)
+
+def current_rss_mb():
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 1048576.0
+    except (OSError, ValueError, AttributeError):
+        return 0.0 # Not Linux
+
+class SoakMonitor:
+    # Frame work time (loop start -> flip, without the tick() sleep) and memory over long autopilot runs
+    def __init__(self, telemetry):
+        self.telemetry = telemetry
+        self.start = time.perf_counter()
+        self.window_start = self.start
+        self.frame_times = LatencyHistogram()
+        self.frames = 0
+        self.total_frames = 0
+        self.rounds = 0
+        self.wins = 0
+        self.losses = 0
+        self.start_rss_mb = current_rss_mb()
+
+    def uptime(self):
+        return time.perf_counter() - self.start
+
+    def round_end(self, state):
+        if state == STATE_GAME_WON: self.wins += 1
+        elif state == STATE_GAME_OVER: self.losses += 1
+        else: return
+        self.rounds += 1
+
+    def frame(self, frame_ms):
+        self.frame_times.add(frame_ms)
+        self.frames += 1
+        self.total_frames += 1
+        if time.perf_counter() - self.window_start >= SOAK_REPORT_INTERVAL_SEC:
+            self.report()
+
+    def report(self):
+        now = time.perf_counter()
+        elapsed = max(now - self.window_start, 1e-6)
+        rss = current_rss_mb()
+        summary = self.frame_times.summary()
+        self.telemetry.write("soak", uptime_s=round(now - self.start, 1), frames=self.total_frames, fps=round(self.frames / elapsed, 1),
+                             frame_ms=summary, rss_mb=round(rss, 1), rss_growth_mb=round(rss - self.start_rss_mb, 1),
+                             gc_objects=len(gc.get_objects()), fire_particles=len(fire_particles), water_particles=len(water_particles),
+                             rounds=self.rounds, wins=self.wins, losses=self.losses)
+        print(f"[SOAK] {now - self.start:.0f}s {self.total_frames} frames {self.frames / elapsed:.0f} fps "
+              f"p95 {summary['p95']:.1f}ms max {summary['max']:.1f}ms rss {rss:.1f}MB ({rss - self.start_rss_mb:+.1f}) "
+              f"rounds {self.rounds} (W {self.wins} / L {self.losses})")
+        self.frame_times = LatencyHistogram()
+        self.frames = 0
+        self.window_start = now
+
+def gc_collections():
+    return sum(stats["collections"] for stats in gc.get_stats())
+
+class RestartTimer:
+    # Time to first frame of every round: init_game() -> the first presented frame of the new round,
+    # and the garbage collections that ran in between
+    def __init__(self, telemetry):
+        self.telemetry = telemetry
+        self.started = None # perf_counter() of the init_game() still waiting for its first frame
+        self.collections = 0
+        self.reset_ms = 0.0
+        self.first_frame_ms = 0.0
+        self.last_collections = 0
+
+    def start(self):
+        self.started = time.perf_counter()
+        self.collections = gc_collections()
+
+    def reset_done(self):
+        self.reset_ms = (time.perf_counter() - self.started) * 1000.0
+
+    def frame_presented(self):
+        if self.started is None: return
+        self.first_frame_ms = (time.perf_counter() - self.started) * 1000.0
+        self.last_collections = gc_collections() - self.collections
+        self.started = None
+        self.telemetry.write("restart", level=current_level_id, reset_ms=round(self.reset_ms, 2),
+                             first_frame_ms=round(self.first_frame_ms, 2), gc_collections=self.last_collections)
+
+restart_timer = RestartTimer(telemetry)
+soak_monitor = None # Created by --autopilot
+soak_levels = list(LEVEL_MENU_INDEX)
+soak_round = 0
+soak_round_end_time = None
+
+def autopilot_next_round():
+    # Soak runs cycle through every level (or the --level ones) in menu order
+    global selected_mode_index, selected_level_index, soak_round
+    level_id = soak_levels[soak_round % len(soak_levels)]
+    selected_mode_index, selected_level_index = LEVEL_MENU_INDEX[level_id]
+    soak_round += 1
+    init_game()
 
 def draw_menu_background():
+    global jungle_background_image
+    if jungle_background_image is False:
+        try:
+            jungle_background_image, _ = assets.load("menu-background", build_menu_background, (BACKGROUND_FILENAME,))
+        except (pygame.error, FileNotFoundError):
+            jungle_background_image = None
     if jungle_background_image: 
-        screen.blit(jungle_background_image, (0, UI_HEIGHT))
+        screen.blit(jungle_background_image, scaled_point((0, UI_HEIGHT)))
     else: 
-        pygame.draw.rect(screen, BLACK, (0, UI_HEIGHT, SCREEN_WIDTH, SCREEN_HEIGHT - UI_HEIGHT))
-    overlay = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT), pygame.SRCALPHA)
+        pygame.draw.rect(screen, BLACK, scaled_rect((0, UI_HEIGHT, SCREEN_WIDTH, SCREEN_HEIGHT - UI_HEIGHT)))
+    overlay = pygame.Surface(screen.get_size(), pygame.SRCALPHA)
     overlay.fill((0, 0, 0, 128))
     screen.blit(overlay, (0, 0))
 
 # --- INIT JOYSTICKS ---
 print("Initializing Joysticks...")
-joy1 = JoystickHandler(0, 1, 17) # Move
-joy2 = JoystickHandler(2, 3, 27) # Action/Menu
+adc_sampler = None
+if HARDWARE_CONNECTED and ADC_SAMPLING_MODE == 'batched':
+    adc_sampler = ADS1115Sampler([0, 1, 2, 3])
+    if not adc_sampler.inputs:
+        adc_sampler = None # Configuring it failed, each stick opens its own channels
+        print("[HW] Falling back to per-joystick ADC reads")
+joy1 = JoystickHandler(0, 1, 17, adc_sampler) # Move
+joy2 = JoystickHandler(2, 3, 27, adc_sampler) # Action/Menu
+player_calibrations = load_calibrations()
+
+input_pipeline = None # Started in the main loop below (not when imported by forest_env.py)
+
+def collect_input_stats():
+    return {
+        "filter_lag_ms": round(joy1.take_filter_lag(), 2),
+        "input_poll_hz": round(input_pipeline.take_poll_rate(), 1) if input_pipeline else 0.0,
+    }
+
+latency_tracker.extra_stats = collect_input_stats
+
+# --- EVENT DISPATCH ---
+# Handlers are looked up by (event type, game state) first, then (event type, None) for any state
+
+def on_quit(event):
+    global running
+    running = False
+
+def on_keydown(event):
+    global game_state, high_score, running, show_debug_overlay, autopilot_enabled, show_minimap, fire_atlas_enabled
+    global menu_up, menu_down, menu_left, menu_right, menu_enter, menu_calibrate
+
+    if event.key == pygame.K_x:
+        if game_state in [STATE_GAME_RUNNING, STATE_GAME_STARTING, STATE_GAME_PAUSED, STATE_GAME_PENALTY]:
+            game_state = STATE_PAUSED_MENU
+            if score > high_score: high_score = score
+        else:
+            running = False 
+
+    # KEYBOARD MAPPING (Merged with Joystick Flags)
+    if event.key == pygame.K_UP: menu_up = True
+    if event.key == pygame.K_DOWN: menu_down = True
+    if event.key == pygame.K_LEFT: menu_left = True
+    if event.key == pygame.K_RIGHT: menu_right = True
+    if event.key == pygame.K_RETURN: menu_enter = True
+    if event.key == DEBUG_OVERLAY_KEY: show_debug_overlay = not show_debug_overlay
+    if event.key == AUTOPILOT_KEY: autopilot_enabled = not autopilot_enabled
+    if event.key == MINIMAP_KEY: show_minimap = not show_minimap
+    if event.key == FIRE_ATLAS_KEY: fire_atlas_enabled = not fire_atlas_enabled
+    if event.key == pygame.K_c and game_state == STATE_PLAYER_SELECT: menu_calibrate = True
+
+def on_window_exposed(event):
+    # The window was uncovered or restored: what's on screen is stale wherever no dirty rect lands
+    display_updates.full()
+
+EVENT_HANDLERS = {
+    (pygame.QUIT, None): on_quit,
+    (pygame.KEYDOWN, None): on_keydown,
+    (pygame.WINDOWEXPOSED, None): on_window_exposed,
+    (pygame.WINDOWRESTORED, None): on_window_exposed,
+    (pygame.VIDEOEXPOSE, None): on_window_exposed,
+}
+
+# Only queue event types that have a handler (mouse motion, key up, most window events never reach the queue)
+pygame.event.set_blocked(None)
+pygame.event.set_allowed(list({event_type for (event_type, _) in EVENT_HANDLERS}))
 
 # --- Main Game Loop ---
-running = True
-while running:
-    # Always update joysticks first
-    joy1.update()
-    joy2.update()
-    current_time = pygame.time.get_ticks()
-
-    # --- INPUT HELPER: Check Joystick 2 for Menu Nav ---
-    # Directions for Menu (Debounced)
-    menu_up = False
-    menu_down = False
-    menu_left = False
-    menu_right = False
-    menu_enter = False
-
-    if abs(joy2.norm_x) > 0.5 or abs(joy2.norm_y) > 0.5:
-        if current_time - last_menu_move_time > MENU_MOVE_DELAY:
-            if joy2.norm_x < -0.5: menu_left = True
-            elif joy2.norm_x > 0.5: menu_right = True
+# Only when run as a script, so the game rules can be imported headless (see forest_env.py)
+if __name__ == "__main__":
+    if HARDWARE_CONNECTED and INPUT_PIPELINE_THREADED:
+        input_pipeline = InputPipeline([joy1, joy2], adc_sampler)
+        input_pipeline.start()
+
+    if cli_args.autopilot:
+        autopilot_enabled = True
+        soak_monitor = SoakMonitor(telemetry)
+        if cli_args.level: soak_levels = [level_id for level_id in cli_args.level if level_id in LEVEL_MENU_INDEX]
+        print(f"[SOAK] Autopilot on levels {soak_levels}{' (headless)' if cli_args.headless else ''}")
+
+    # Everything created up to here (assets, fonts, caches, pools) lives for the whole session:
+    # freeze it so the collector's full passes during play only walk what the rounds create
+    gc.collect()
+    gc.freeze()
+
+    running = True
+    frame_dt = 0
+    while running:
+        frame_start = time.perf_counter()
+        # Always update joysticks first (one batched ADC sweep feeds both sticks, unless the input thread owns the ADC)
+        if adc_sampler and not input_pipeline: adc_sampler.poll()
+        joy1.update()
+        joy2.update()
+        current_time = pygame.time.get_ticks()
+
+        # --- INPUT HELPER: Check Joystick 2 for Menu Nav ---
+        # Directions for Menu (Debounced)
+        menu_up = False
+        menu_down = False
+        menu_left = False
+        menu_right = False
+        menu_enter = False
+        menu_calibrate = joy1.just_pressed # Movement stick button = calibrate on the player select screen (capture waits for the stick to settle)
+
+        if abs(joy2.norm_x) > 0.5 or abs(joy2.norm_y) > 0.5:
+            if current_time - last_menu_move_time > MENU_MOVE_DELAY:
+                if joy2.norm_x < -0.5: menu_left = True
+                elif joy2.norm_x > 0.5: menu_right = True
             
-            if joy2.norm_y < -0.5: menu_up = True
-            elif joy2.norm_y > 0.5: menu_down = True
+                if joy2.norm_y < -0.5: menu_up = True
+                elif joy2.norm_y > 0.5: menu_down = True
             
-            last_menu_move_time = current_time
-
-    # Button for Menu (Just Pressed)
-    if joy2.just_pressed:
-        menu_enter = True
-
-    # --- EVENTS ---
-    for event in pygame.event.get():
-        if event.type == pygame.QUIT:
+                last_menu_move_time = current_time
+
+        # Button for Menu (Just Pressed)
+        if joy2.just_pressed:
+            menu_enter = True
+
+        # --- EVENTS ---
+        keyboard_sample_time = time.perf_counter() # Key state behind get_pressed() is sampled by this pump
+        # Single pump per frame, every event goes through the dispatch table
+        for event in pygame.event.get():
+            handler = EVENT_HANDLERS.get((event.type, game_state)) or EVENT_HANDLERS.get((event.type, None))
+            if handler: handler(event)
+
+        # --- SOAK: autopilot starts the next level from any menu or result screen ---
+        if soak_monitor and game_state not in [STATE_GAME_RUNNING, STATE_GAME_STARTING, STATE_GAME_PAUSED, STATE_GAME_PENALTY]:
+            if soak_round_end_time is None:
+                soak_round_end_time = current_time
+                soak_monitor.round_end(game_state)
+            if cli_args.headless or current_time - soak_round_end_time >= AUTOPILOT_RESULT_SCREEN_MS:
+                soak_round_end_time = None
+                autopilot_next_round()
+        if soak_monitor and cli_args.hours > 0 and soak_monitor.uptime() >= cli_args.hours * 3600:
             running = False
-            
-        if event.type == pygame.KEYDOWN:
-            if event.key == pygame.K_x:
-                if game_state in [STATE_GAME_RUNNING, STATE_GAME_STARTING, STATE_GAME_PAUSED, STATE_GAME_PENALTY]:
-                    game_state = STATE_PAUSED_MENU
-                    if score > high_score: high_score = score
-                    pygame.time.set_timer(FIRE_SPREAD_EVENT, 0) 
-                    pygame.time.set_timer(OBSTACLE_SPAWN_EVENT, 0)
-                else:
-                    running = False 
-
-        # KEYBOARD MAPPING (Merged with Joystick Flags)
-        if event.type == pygame.KEYDOWN:
-            if event.key == pygame.K_UP: menu_up = True
-            if event.key == pygame.K_DOWN: menu_down = True
-            if event.key == pygame.K_LEFT: menu_left = True
-            if event.key == pygame.K_RIGHT: menu_right = True
-            if event.key == pygame.K_RETURN: menu_enter = True
-
-    # --- STATE LOGIC ---
-    if game_state == STATE_START_MENU:
-        if menu_enter:
-            game_state = STATE_PLAYER_SELECT
+
+        # --- STATE LOGIC ---
+        if game_state == STATE_START_MENU:
+            if menu_enter:
+                game_state = STATE_PLAYER_SELECT
     
-    elif game_state == STATE_PLAYER_SELECT:
-        if menu_left:
-            selected_player_index = (selected_player_index - 1) % 3
-        elif menu_right:
-            selected_player_index = (selected_player_index + 1) % 3
-        elif menu_enter:
-            game_state = STATE_MODE_SELECT
+        elif game_state == STATE_PLAYER_SELECT:
+            if menu_left:
+                selected_player_index = (selected_player_index - 1) % 3
+            elif menu_right:
+                selected_player_index = (selected_player_index + 1) % 3
+            elif menu_enter:
+                game_state = STATE_MODE_SELECT
+            elif menu_calibrate and HARDWARE_CONNECTED and not joy1.is_calibrating():
+                calibration_player_index = selected_player_index
+                joy1.start_calibration()
+
+            if calibration_player_index is not None and joy1.calibration_result:
+                player_calibrations[str(calibration_player_index)] = joy1.calibration_result
+                save_calibrations(player_calibrations)
+                calibration_player_index = None
     
-    elif game_state == STATE_MODE_SELECT:
-        if menu_left: selected_mode_index = 0
-        elif menu_right: selected_mode_index = 1
-        elif menu_enter: game_state = STATE_LEVEL_SELECT
+        elif game_state == STATE_MODE_SELECT:
+            if menu_left: selected_mode_index = 0
+            elif menu_right: selected_mode_index = 1
+            elif menu_enter: game_state = STATE_LEVEL_SELECT
     
-    elif game_state == STATE_LEVEL_SELECT:
-        # PARKINSON'S MODE SELECTION
-        if selected_mode_index == 0: 
-            if menu_left: selected_level_index = max(0, selected_level_index - 1)
-            elif menu_right: selected_level_index = min(3, selected_level_index + 1) # Now 4 levels (0-3)
-            elif menu_enter: init_game()
+        elif game_state == STATE_LEVEL_SELECT:
+            # PARKINSON'S MODE SELECTION
+            if selected_mode_index == 0: 
+                if menu_left: selected_level_index = max(0, selected_level_index - 1)
+                elif menu_right: selected_level_index = min(3, selected_level_index + 1) # Now 4 levels (0-3)
+                elif menu_enter: init_game()
         
-        # NORMAL MODE SELECTION (Updated grid logic)
-        elif selected_mode_index == 1:
-            # 5 Levels: 0,1,2 on top row. 3,4 on bottom row.
-            if menu_left: 
-                selected_level_index = max(0, selected_level_index - 1)
-            elif menu_right: 
-                selected_level_index = min(4, selected_level_index + 1)
-            elif menu_down: 
-                if selected_level_index < 3: selected_level_index = min(4, selected_level_index + 3)
-            elif menu_up:
-                if selected_level_index >= 3: selected_level_index = selected_level_index - 3
-            elif menu_enter: init_game()
+            # NORMAL MODE SELECTION (Updated grid logic)
+            elif selected_mode_index == 1:
+                # 5 Levels: 0,1,2 on top row. 3,4 on bottom row.
+                if menu_left: 
+                    selected_level_index = max(0, selected_level_index - 1)
+                elif menu_right: 
+                    selected_level_index = min(4, selected_level_index + 1)
+                elif menu_down: 
+                    if selected_level_index < 3: selected_level_index = min(4, selected_level_index + 3)
+                elif menu_up:
+                    if selected_level_index >= 3: selected_level_index = selected_level_index - 3
+                elif menu_enter: init_game()
                     
-    elif game_state in [STATE_GAME_RUNNING, STATE_GAME_STARTING, STATE_GAME_PAUSED, STATE_GAME_PENALTY]:
-        # GAME LOOP EVENTS
-        for event in pygame.event.get(): 
-             if event.type == FIRE_SPREAD_EVENT: spread_fire()
-             if event.type == OBSTACLE_SPAWN_EVENT and current_level_id == 5: spawn_obstacle()
-                    
-    elif game_state == STATE_GAME_OVER or game_state == STATE_GAME_WON:
-        if menu_enter:
-            game_state = STATE_START_MENU
-            pygame.time.set_timer(FIRE_SPREAD_EVENT, 0)
-            pygame.time.set_timer(OBSTACLE_SPAWN_EVENT, 0)
-
-    elif game_state == STATE_PAUSED_MENU:
-        if menu_enter:
-            init_game()
-
-    # --- GAMEPLAY UPDATE ---
-    if game_state == STATE_GAME_STARTING:
-        if pygame.time.get_ticks() - pause_start_time > 3000:
-            total_paused_time += (pygame.time.get_ticks() - pause_start_time)
-            game_state = STATE_GAME_RUNNING
-    
-    elif game_state == STATE_GAME_PAUSED:
-        if pygame.time.get_ticks() - pause_start_time > 3000:
-            total_paused_time += (pygame.time.get_ticks() - pause_start_time)
-            game_state = STATE_GAME_RUNNING
+        elif game_state == STATE_GAME_OVER or game_state == STATE_GAME_WON:
+            if menu_enter:
+                game_state = STATE_START_MENU
 
-    elif game_state == STATE_GAME_PENALTY:
-        if pygame.time.get_ticks() - penalty_start_time > 3000:
-            total_paused_time += (pygame.time.get_ticks() - penalty_start_time)
-            game_state = STATE_GAME_RUNNING
+        elif game_state == STATE_PAUSED_MENU:
+            if menu_enter:
+                init_game()
 
-    elif game_state == STATE_GAME_RUNNING:
-        
-        keys = pygame.key.get_pressed()
-        new_x = player_rect.x
-        new_y = player_rect.y
-        
-        # KEYBOARD INPUT
-        if keys[pygame.K_LEFT] or keys[pygame.K_a]:
-            new_x -= player_speed
-            player_direction = 'left'
-        if keys[pygame.K_RIGHT] or keys[pygame.K_d]:
-            new_x += player_speed
-            player_direction = 'right'
-        if keys[pygame.K_UP] or keys[pygame.K_w]:
-            new_y -= player_speed
-            player_direction = 'up'
-        if keys[pygame.K_DOWN] or keys[pygame.K_s]:
-            new_y += player_speed
-            player_direction = 'down'
-
-        # JOYSTICK INPUT
-        if abs(joy1.norm_x) > 0 or abs(joy1.norm_y) > 0:
-            new_x = player_rect.x + (joy1.norm_x * player_speed)
-            new_y = player_rect.y + (joy1.norm_y * player_speed)
-            
-            if abs(joy1.norm_x) > abs(joy1.norm_y):
-                if joy1.norm_x < 0: player_direction = 'left'
-                elif joy1.norm_x > 0: player_direction = 'right'
-            else:
-                if joy1.norm_y < 0: player_direction = 'up'
-                elif joy1.norm_y > 0: player_direction = 'down'
-
-        # OBSTACLE COLLISION
-        test_rect = pygame.Rect(new_x, new_y, PLAYER_SIZE, PLAYER_SIZE)
-        collision = False
-        for (ox, oy) in obstacle_tiles:
-            obs_rect = pygame.Rect(ox * TILE_SIZE, oy * TILE_SIZE + UI_HEIGHT, TILE_SIZE, TILE_SIZE)
-            if test_rect.colliderect(obs_rect):
-                collision = True
-                if current_level_id == 5: 
-                    game_state = STATE_GAME_PENALTY
-                    penalty_start_time = pygame.time.get_ticks()
-                    obstacle_tiles.remove((ox, oy)) 
-                break
-        
-        if not collision:
-            player_rect.x = new_x
-            player_rect.y = new_y
-
-        # Spray Trigger
-        if keys[pygame.K_SPACE] or joy2.is_pressed:
-            create_water_spray()
-
-        playable_rect = pygame.Rect(0, UI_HEIGHT, SCREEN_WIDTH, SCREEN_HEIGHT - UI_HEIGHT)
-        player_rect.clamp_ip(playable_rect)
-
-        # ZOMBIE LOGIC (For Normal Level 4 OR Parkinson's Level 4)
-        if current_level_id == 6 or current_level_id == 9:
-            # Determine speed based on level
-            current_z_speed = ZOMBIE_SPEED if current_level_id == 6 else PARKINSON_ZOMBIE_SPEED
-
-            for z_data in zombies:
-                z_rect = z_data[2]
-                dx = player_rect.x - z_data[0]
-                dy = player_rect.y - z_data[1]
-                dist = math.hypot(dx, dy)
-                if dist != 0:
-                    z_data[0] += (dx / dist) * current_z_speed
-                    z_data[1] += (dy / dist) * current_z_speed
-                    z_rect.x = int(z_data[0])
-                    z_rect.y = int(z_data[1])
-                
-                if z_rect.colliderect(player_rect):
-                    current_time = pygame.time.get_ticks()
-                    if current_time - last_damage_time > 2000:
-                        player_lives -= 1
-                        last_damage_time = current_time
-                        if player_lives <= 0:
-                            game_state = STATE_GAME_OVER
-                            if score > high_score: high_score = score
+        # --- GAMEPLAY UPDATE ---
+        # Game time only moves while a round is on screen (countdowns end through scheduled callbacks)
+        if game_state in [STATE_GAME_RUNNING, STATE_GAME_STARTING, STATE_GAME_PAUSED, STATE_GAME_PENALTY]:
+            advance_game_time(frame_dt)
+
+        if game_state == STATE_GAME_RUNNING and autopilot_enabled:
+            new_x, new_y, spraying = autopilot_input()
+            update_game(new_x, new_y, spraying)
+
+        elif game_state == STATE_GAME_RUNNING:
         
-        # FLAME ZOMBIE LOGIC (Handle list of zombies)
-        if current_level_id == 7 and flame_zombies:
-            for fz in flame_zombies:
-                z_rect = fz[2]
-                dx = player_rect.x - fz[0]
-                dy = player_rect.y - fz[1]
-                dist = math.hypot(dx, dy)
-                if dist != 0:
-                    fz[0] += (dx / dist) * FLAME_ZOMBIE_SPEED
-                    fz[1] += (dy / dist) * FLAME_ZOMBIE_SPEED
-                    z_rect.x = int(fz[0])
-                    z_rect.y = int(fz[1])
-                
-                grid_x = int(z_rect.centerx // TILE_SIZE)
-                grid_y = int((z_rect.centery - UI_HEIGHT) // TILE_SIZE)
-                if 0 <= grid_x < GRID_WIDTH and 0 <= grid_y < GRID_HEIGHT:
-                     if (grid_x, grid_y) not in fire_tiles:
-                         fire_tiles.add((grid_x, grid_y))
-
-                if z_rect.colliderect(player_rect):
-                     game_state = STATE_GAME_OVER
-                     if score > high_score: high_score = score
-            
-        # POWERUP COLLISIONS
-        # 1. Water Powerup
-        if water_powerup_rect and not has_water_powerup:
-            if player_rect.colliderect(water_powerup_rect):
-                has_water_powerup = True
-                water_powerup_rect = None
+            keys = pygame.key.get_pressed()
+            new_x = player_rect.x
+            new_y = player_rect.y
+            input_sample_time = 0.0
         
-        # 2. Speed Powerup (Boosts speed)
-        if speed_powerup_rect and not has_speed_powerup:
-            if player_rect.colliderect(speed_powerup_rect):
-                has_speed_powerup = True
-                player_speed = player_base_speed * 1.75
-                speed_powerup_rect = None
-
-        # 3. Heart Powerup (Extra Life)
-        if heart_powerup_rect:
-            if player_rect.colliderect(heart_powerup_rect):
-                player_lives += 1
-                heart_powerup_rect = None
-
-        # WIN/LOSS LOGIC
-        if len(fire_tiles) == 0:
-            if current_level_id == 7:
-                 spawn_new_fire_cluster(3) 
-            elif current_level_id == 8:
-                 spawn_new_fire_cluster(3)
-            elif current_level_id != 6 and current_level_id != 9:
-                game_state = STATE_GAME_WON
-                if score > high_score: high_score = score
-                pygame.time.set_timer(FIRE_SPREAD_EVENT, 0)
-                pygame.time.set_timer(OBSTACLE_SPAWN_EVENT, 0) 
-            else:
-                spawn_new_fire_cluster(3)
+            # KEYBOARD INPUT
+            if keys[pygame.K_LEFT] or keys[pygame.K_a]:
+                new_x -= player_speed
+                player_direction = 'left'
+            if keys[pygame.K_RIGHT] or keys[pygame.K_d]:
+                new_x += player_speed
+                player_direction = 'right'
+            if keys[pygame.K_UP] or keys[pygame.K_w]:
+                new_y -= player_speed
+                player_direction = 'up'
+            if keys[pygame.K_DOWN] or keys[pygame.K_s]:
+                new_y += player_speed
+                player_direction = 'down'
+            if new_x != player_rect.x or new_y != player_rect.y:
+                input_sample_time = keyboard_sample_time
+
+            # JOYSTICK INPUT
+            if abs(joy1.norm_x) > 0 or abs(joy1.norm_y) > 0:
+                input_sample_time = joy1.sample_time
+                new_x = player_rect.x + (joy1.norm_x * player_speed)
+                new_y = player_rect.y + (joy1.norm_y * player_speed)
             
-        elapsed_ticks = pygame.time.get_ticks() - game_start_time
-        running_ticks = elapsed_ticks - total_paused_time
-        time_remaining = GAME_DURATION_SEC - (running_ticks // 1000)
+                # Hysteresis keeps tremor near the diagonal from flipping the facing direction every frame
+                ax, ay = abs(joy1.norm_x), abs(joy1.norm_y)
+                if player_direction in ('left', 'right'): use_x = ay <= ax * JOYSTICK_DIRECTION_HYSTERESIS
+                else: use_x = ax > ay * JOYSTICK_DIRECTION_HYSTERESIS
+
+                if use_x:
+                    if joy1.norm_x < 0: player_direction = 'left'
+                    elif joy1.norm_x > 0: player_direction = 'right'
+                else:
+                    if joy1.norm_y < 0: player_direction = 'up'
+                    elif joy1.norm_y > 0: player_direction = 'down'
 
-        if time_remaining <= 0:
-            time_remaining = 0
-            if current_level_id in [6, 7, 8, 9]:
-                game_state = STATE_GAME_WON
-            else:
-                game_state = STATE_GAME_OVER
-            
-            if score > high_score: high_score = score
-            pygame.time.set_timer(FIRE_SPREAD_EVENT, 0)
-            pygame.time.set_timer(OBSTACLE_SPAWN_EVENT, 0)
+            latency_tracker.consume(input_sample_time)
 
-        if current_level_id >= 4:
-            fire_percentage = len(fire_tiles) / total_tiles
-            if fire_percentage >= MAX_FIRE_PERCENTAGE:
-                game_state = STATE_GAME_OVER
-                if score > high_score: high_score = score
-                pygame.time.set_timer(FIRE_SPREAD_EVENT, 0)
-                pygame.time.set_timer(OBSTACLE_SPAWN_EVENT, 0)
+            update_game(new_x, new_y, keys[pygame.K_SPACE] or joy2.is_pressed)
 
-    # --- Drawing ---
-    screen.fill(DARK_GREEN)
+        # --- Drawing ---
+        screen.fill(DARK_GREEN)
     
-    if game_state == STATE_START_MENU:
-        draw_menu_background()
-        draw_text("FOREST FIRE", font_large, WHITE, screen, SCREEN_WIDTH // 2, SCREEN_HEIGHT // 3, center=True)
-        draw_text("Press JOYSTICK or ENTER to Start", font_medium, WHITE, screen, SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2 + 30, center=True)
-        draw_text("Use Arrow Keys to Move", font_small, WHITE, screen, SCREEN_WIDTH // 2, SCREEN_HEIGHT - 100, center=True)
-        draw_text("Press SPACE to Spray Water", font_small, WHITE, screen, SCREEN_WIDTH // 2, SCREEN_HEIGHT - 60, center=True)
+        if game_state == STATE_START_MENU:
+            draw_menu_background()
+            draw_text("FOREST FIRE", font_large, WHITE, screen, SCREEN_WIDTH // 2, SCREEN_HEIGHT // 3, center=True)
+            draw_text("Press JOYSTICK or ENTER to Start", font_medium, WHITE, screen, SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2 + 30, center=True)
+            draw_text("Use Arrow Keys to Move", font_small, WHITE, screen, SCREEN_WIDTH // 2, SCREEN_HEIGHT - 100, center=True)
+            draw_text("Press SPACE to Spray Water", font_small, WHITE, screen, SCREEN_WIDTH // 2, SCREEN_HEIGHT - 60, center=True)
     
-    elif game_state == STATE_PLAYER_SELECT:
-        draw_menu_background()
-        draw_text("Choose Your Firefighter", font_menu_title, WHITE, screen, SCREEN_WIDTH // 2, 80, center=True)
-
-        p_y = SCREEN_HEIGHT // 2 
-        p1_x = 125
-        draw_player_preview(p1_x, p_y - 50, PLAYER_SKIN_WHITE, PLAYER_HELMET_BLUE)
-        draw_text("Alpha", font_menu_item, WHITE, screen, p1_x + 50, p_y + 70, center=True)
-
-        p2_x = 350
-        draw_player_preview(p2_x, p_y - 50, PLAYER_SKIN_BLACK, PLAYER_HELMET_RED)
-        draw_text("Bravo", font_menu_item, WHITE, screen, p2_x + 50, p_y + 70, center=True)
+        elif game_state == STATE_PLAYER_SELECT:
+            draw_menu_background()
+            draw_text("Choose Your Firefighter", font_menu_title, WHITE, screen, SCREEN_WIDTH // 2, 80, center=True)
+
+            p_y = SCREEN_HEIGHT // 2 
+            p1_x = 125
+            draw_player_preview(p1_x, p_y - 50, PLAYER_SKIN_WHITE, PLAYER_HELMET_BLUE)
+            draw_text("Alpha", font_menu_item, WHITE, screen, p1_x + 50, p_y + 70, center=True)
+
+            p2_x = 350
+            draw_player_preview(p2_x, p_y - 50, PLAYER_SKIN_BLACK, PLAYER_HELMET_RED)
+            draw_text("Bravo", font_menu_item, WHITE, screen, p2_x + 50, p_y + 70, center=True)
         
-        p3_x = 575
-        draw_player_preview(p3_x, p_y - 50, PLAYER_SKIN_BROWN, PLAYER_HELMET_GREEN)
-        draw_text("Charlie", font_menu_item, WHITE, screen, p3_x + 50, p_y + 70, center=True)
+            p3_x = 575
+            draw_player_preview(p3_x, p_y - 50, PLAYER_SKIN_BROWN, PLAYER_HELMET_GREEN)
+            draw_text("Charlie", font_menu_item, WHITE, screen, p3_x + 50, p_y + 70, center=True)
 
-        if selected_player_index == 0: selector_rect = pygame.Rect(p1_x - 10, p_y - 60, 120, 180)
-        elif selected_player_index == 1: selector_rect = pygame.Rect(p2_x - 10, p_y - 60, 120, 180)
-        else: selector_rect = pygame.Rect(p3_x - 10, p_y - 60, 120, 180)
+            if selected_player_index == 0: selector_rect = pygame.Rect(p1_x - 10, p_y - 60, 120, 180)
+            elif selected_player_index == 1: selector_rect = pygame.Rect(p2_x - 10, p_y - 60, 120, 180)
+            else: selector_rect = pygame.Rect(p3_x - 10, p_y - 60, 120, 180)
         
-        pygame.draw.rect(screen, YELLOW, selector_rect, 5)
-        draw_text("JOYSTICK to select & confirm", font_menu_tiny, WHITE, screen, SCREEN_WIDTH // 2, SCREEN_HEIGHT - 40, center=True)
+            pygame.draw.rect(screen, YELLOW, scaled_rect(selector_rect), scaled_line(5))
+            draw_text("JOYSTICK to select & confirm", font_menu_tiny, WHITE, screen, SCREEN_WIDTH // 2, SCREEN_HEIGHT - 40, center=True)
 
-    elif game_state == STATE_MODE_SELECT:
-        draw_menu_background()
-        draw_text("Select Mode", font_menu_title, WHITE, screen, SCREEN_WIDTH // 2, 80, center=True)
+            if HARDWARE_CONNECTED:
+                if joy1.is_settling():
+                    cal_text = "CALIBRATING... let go of the move stick"
+                elif joy1.is_calibrating():
+                    cal_text = "CALIBRATING... leave the move stick at rest"
+                elif str(selected_player_index) in player_calibrations:
+                    cal_text = f"Calibrated (deadzone {player_calibrations[str(selected_player_index)]['deadzone']}) - C to redo"
+                else:
+                    cal_text = "Press move stick or C to calibrate"
+                draw_text(cal_text, font_menu_tiny, YELLOW, screen, SCREEN_WIDTH // 2, SCREEN_HEIGHT - 70, center=True)
+
+        elif game_state == STATE_MODE_SELECT:
+            draw_menu_background()
+            draw_text("Select Mode", font_menu_title, WHITE, screen, SCREEN_WIDTH // 2, 80, center=True)
         
-        mode1_x = SCREEN_WIDTH // 2 - 225
-        mode_y = SCREEN_HEIGHT // 2 - 50
-        mode1_rect = pygame.Rect(mode1_x, mode_y, 200, 150)
-        pygame.draw.rect(screen, DARK_GREEN, mode1_rect)
-        draw_text("Parkinson's", font_menu_item, WHITE, screen, mode1_rect.centerx, mode1_rect.centery, center=True)
-
-        mode2_x = SCREEN_WIDTH // 2 + 25
-        mode2_rect = pygame.Rect(mode2_x, mode_y, 200, 150)
-        pygame.draw.rect(screen, RED, mode2_rect)
-        draw_text("Normal", font_menu_item, WHITE, screen, mode2_rect.centerx, mode2_rect.centery, center=True)
-
-        if selected_mode_index == 0: selector_rect = pygame.Rect(mode1_x - 10, mode_y - 10, 220, 170)
-        else: selector_rect = pygame.Rect(mode2_x - 10, mode_y - 10, 220, 170)
+            mode1_x = SCREEN_WIDTH // 2 - 225
+            mode_y = SCREEN_HEIGHT // 2 - 50
+            mode1_rect = pygame.Rect(mode1_x, mode_y, 200, 150)
+            pygame.draw.rect(screen, DARK_GREEN, scaled_rect(mode1_rect))
+            draw_text("Parkinson's", font_menu_item, WHITE, screen, mode1_rect.centerx, mode1_rect.centery, center=True)
+
+            mode2_x = SCREEN_WIDTH // 2 + 25
+            mode2_rect = pygame.Rect(mode2_x, mode_y, 200, 150)
+            pygame.draw.rect(screen, RED, scaled_rect(mode2_rect))
+            draw_text("Normal", font_menu_item, WHITE, screen, mode2_rect.centerx, mode2_rect.centery, center=True)
+
+            if selected_mode_index == 0: selector_rect = pygame.Rect(mode1_x - 10, mode_y - 10, 220, 170)
+            else: selector_rect = pygame.Rect(mode2_x - 10, mode_y - 10, 220, 170)
         
-        pygame.draw.rect(screen, YELLOW, selector_rect, 5)
-        draw_text("JOYSTICK to select & confirm", font_menu_tiny, WHITE, screen, SCREEN_WIDTH // 2, SCREEN_HEIGHT - 60, center=True)
+            pygame.draw.rect(screen, YELLOW, scaled_rect(selector_rect), scaled_line(5))
+            draw_text("JOYSTICK to select & confirm", font_menu_tiny, WHITE, screen, SCREEN_WIDTH // 2, SCREEN_HEIGHT - 60, center=True)
 
-    elif game_state == STATE_LEVEL_SELECT:
-        draw_menu_background()
+        elif game_state == STATE_LEVEL_SELECT:
+            draw_menu_background()
         
-        if selected_mode_index == 0: 
-            draw_text("Select Level (Parkinson's Mode)", font_menu_title, WHITE, screen, SCREEN_WIDTH // 2, 50, center=True)
+            if selected_mode_index == 0: 
+                draw_text("Select Level (Parkinson's Mode)", font_menu_title, WHITE, screen, SCREEN_WIDTH // 2, 50, center=True)
             
-            # Layout: 4 columns
-            col_width = 160
-            spacing = 20
-            start_x = (SCREEN_WIDTH - (4 * col_width + 3 * spacing)) // 2
-            y_pos = SCREEN_HEIGHT // 2 - 75
+                # Layout: 4 columns
+                col_width = 160
+                spacing = 20
+                start_x = (SCREEN_WIDTH - (4 * col_width + 3 * spacing)) // 2
+                y_pos = SCREEN_HEIGHT // 2 - 75
             
-            # Helper to draw box
-            def draw_lvl_box(idx, color, title, sub):
-                r = pygame.Rect(start_x + idx * (col_width + spacing), y_pos, col_width, 150)
-                pygame.draw.rect(screen, color, r)
-                draw_text(title, font_menu_item, WHITE, screen, r.centerx, r.centery - 20, center=True)
-                draw_text(sub, font_menu_tiny, WHITE, screen, r.centerx, r.centery + 20, center=True)
-                return r
-
-            r0 = draw_lvl_box(0, BLUE, "LEVEL 1", "Basic")
-            r1 = draw_lvl_box(1, DARK_GREEN, "LEVEL 2", "Endless")
-            r2 = draw_lvl_box(2, PURPLE, "LEVEL 3", "Med. Spread")
-            r3 = draw_lvl_box(3, (80, 80, 80), "LEVEL 4", "Slow Zombie")
-
-            rects = [r0, r1, r2, r3]
-            sel_rect = rects[selected_level_index]
-            pygame.draw.rect(screen, YELLOW, sel_rect.inflate(10,10), 5)
-            draw_text("JOYSTICK to select & confirm", font_menu_tiny, WHITE, screen, SCREEN_WIDTH // 2, SCREEN_HEIGHT - 60, center=True)
-
-        elif selected_mode_index == 1:
-            draw_text("Select Level (Normal Mode)", font_menu_title, WHITE, screen, SCREEN_WIDTH // 2, 40, center=True)
+                # Helper to draw box
+                def draw_lvl_box(idx, color, title, sub):
+                    r = pygame.Rect(start_x + idx * (col_width + spacing), y_pos, col_width, 150)
+                    pygame.draw.rect(screen, color, scaled_rect(r))
+                    draw_text(title, font_menu_item, WHITE, screen, r.centerx, r.centery - 20, center=True)
+                    draw_text(sub, font_menu_tiny, WHITE, screen, r.centerx, r.centery + 20, center=True)
+                    return r
+
+                r0 = draw_lvl_box(0, BLUE, "LEVEL 1", "Basic")
+                r1 = draw_lvl_box(1, DARK_GREEN, "LEVEL 2", "Endless")
+                r2 = draw_lvl_box(2, PURPLE, "LEVEL 3", "Med. Spread")
+                r3 = draw_lvl_box(3, (80, 80, 80), "LEVEL 4", "Slow Zombie")
+
+                rects = [r0, r1, r2, r3]
+                sel_rect = rects[selected_level_index]
+                pygame.draw.rect(screen, YELLOW, scaled_rect(sel_rect.inflate(10,10)), scaled_line(5))
+                draw_text("JOYSTICK to select & confirm", font_menu_tiny, WHITE, screen, SCREEN_WIDTH // 2, SCREEN_HEIGHT - 60, center=True)
+
+            elif selected_mode_index == 1:
+                draw_text("Select Level (Normal Mode)", font_menu_title, WHITE, screen, SCREEN_WIDTH // 2, 40, center=True)
             
-            # NEW LAYOUT FOR 800x480: 3 on Top, 2 on Bottom
-            box_w = 180
-            box_h = 130
-            gap_x = 20
-            gap_y = 20
+                # NEW LAYOUT FOR 800x480: 3 on Top, 2 on Bottom
+                box_w = 180
+                box_h = 130
+                gap_x = 20
+                gap_y = 20
             
-            # Top Row (3 items) centered
-            top_total_w = 3 * box_w + 2 * gap_x
-            start_x_top = (SCREEN_WIDTH - top_total_w) // 2
-            start_y_top = 80
+                # Top Row (3 items) centered
+                top_total_w = 3 * box_w + 2 * gap_x
+                start_x_top = (SCREEN_WIDTH - top_total_w) // 2
+                start_y_top = 80
             
-            # Bottom Row (2 items) centered
-            bot_total_w = 2 * box_w + 1 * gap_x
-            start_x_bot = (SCREEN_WIDTH - bot_total_w) // 2
-            start_y_bot = start_y_top + box_h + gap_y
-
-            rects = []
-
-            # Level 1
-            r1 = pygame.Rect(start_x_top, start_y_top, box_w, box_h)
-            pygame.draw.rect(screen, DARK_GREEN, r1)
-            draw_text("LEVEL 1", font_menu_item, WHITE, screen, r1.centerx, r1.centery - 15, center=True)
-            draw_text("Endless", font_menu_tiny, WHITE, screen, r1.centerx, r1.centery + 15, center=True)
-            rects.append(r1)
-
-            # Level 2
-            r2 = pygame.Rect(start_x_top + box_w + gap_x, start_y_top, box_w, box_h)
-            pygame.draw.rect(screen, ORANGE, r2)
-            draw_text("LEVEL 2", font_menu_item, WHITE, screen, r2.centerx, r2.centery - 15, center=True)
-            draw_text("Spread", font_menu_tiny, WHITE, screen, r2.centerx, r2.centery + 15, center=True)
-            rects.append(r2)
-
-            # Level 3
-            r3 = pygame.Rect(start_x_top + 2 * (box_w + gap_x), start_y_top, box_w, box_h)
-            pygame.draw.rect(screen, RED, r3)
-            draw_text("LEVEL 3", font_menu_item, WHITE, screen, r3.centerx, r3.centery - 15, center=True)
-            draw_text("Obstacles", font_menu_tiny, WHITE, screen, r3.centerx, r3.centery + 15, center=True)
-            rects.append(r3)
-
-            # Level 4
-            r4 = pygame.Rect(start_x_bot, start_y_bot, box_w, box_h)
-            pygame.draw.rect(screen, (50, 50, 50), r4) 
-            draw_text("LEVEL 4", font_menu_item, WHITE, screen, r4.centerx, r4.centery - 15, center=True)
-            draw_text("3 Zombies", font_menu_tiny, YELLOW, screen, r4.centerx, r4.centery + 15, center=True)
-            rects.append(r4)
-
-            # Level 5
-            r5 = pygame.Rect(start_x_bot + box_w + gap_x, start_y_bot, box_w, box_h)
-            pygame.draw.rect(screen, FLAME_ZOMBIE_COLOR, r5) 
-            draw_text("LEVEL 5", font_menu_item, WHITE, screen, r5.centerx, r5.centery - 15, center=True)
-            draw_text("2 Flame Z.", font_menu_tiny, BLACK, screen, r5.centerx, r5.centery + 15, center=True)
-            rects.append(r5)
-
-            sel_rect = rects[selected_level_index]
-            pygame.draw.rect(screen, YELLOW, sel_rect.inflate(10, 10), 5)
-            draw_text("JOYSTICK to select & confirm", font_menu_tiny, WHITE, screen, SCREEN_WIDTH // 2, SCREEN_HEIGHT - 40, center=True)
+                # Bottom Row (2 items) centered
+                bot_total_w = 2 * box_w + 1 * gap_x
+                start_x_bot = (SCREEN_WIDTH - bot_total_w) // 2
+                start_y_bot = start_y_top + box_h + gap_y
+
+                rects = []
+
+                # Level 1
+                r1 = pygame.Rect(start_x_top, start_y_top, box_w, box_h)
+                pygame.draw.rect(screen, DARK_GREEN, scaled_rect(r1))
+                draw_text("LEVEL 1", font_menu_item, WHITE, screen, r1.centerx, r1.centery - 15, center=True)
+                draw_text("Endless", font_menu_tiny, WHITE, screen, r1.centerx, r1.centery + 15, center=True)
+                rects.append(r1)
+
+                # Level 2
+                r2 = pygame.Rect(start_x_top + box_w + gap_x, start_y_top, box_w, box_h)
+                pygame.draw.rect(screen, ORANGE, scaled_rect(r2))
+                draw_text("LEVEL 2", font_menu_item, WHITE, screen, r2.centerx, r2.centery - 15, center=True)
+                draw_text("Spread", font_menu_tiny, WHITE, screen, r2.centerx, r2.centery + 15, center=True)
+                rects.append(r2)
+
+                # Level 3
+                r3 = pygame.Rect(start_x_top + 2 * (box_w + gap_x), start_y_top, box_w, box_h)
+                pygame.draw.rect(screen, RED, scaled_rect(r3))
+                draw_text("LEVEL 3", font_menu_item, WHITE, screen, r3.centerx, r3.centery - 15, center=True)
+                draw_text("Obstacles", font_menu_tiny, WHITE, screen, r3.centerx, r3.centery + 15, center=True)
+                rects.append(r3)
+
+                # Level 4
+                r4 = pygame.Rect(start_x_bot, start_y_bot, box_w, box_h)
+                pygame.draw.rect(screen, (50, 50, 50), scaled_rect(r4)) 
+                draw_text("LEVEL 4", font_menu_item, WHITE, screen, r4.centerx, r4.centery - 15, center=True)
+                draw_text("3 Zombies", font_menu_tiny, YELLOW, screen, r4.centerx, r4.centery + 15, center=True)
+                rects.append(r4)
+
+                # Level 5
+                r5 = pygame.Rect(start_x_bot + box_w + gap_x, start_y_bot, box_w, box_h)
+                pygame.draw.rect(screen, FLAME_ZOMBIE_COLOR, scaled_rect(r5)) 
+                draw_text("LEVEL 5", font_menu_item, WHITE, screen, r5.centerx, r5.centery - 15, center=True)
+                draw_text("2 Flame Z.", font_menu_tiny, BLACK, screen, r5.centerx, r5.centery + 15, center=True)
+                rects.append(r5)
+
+                sel_rect = rects[selected_level_index]
+                pygame.draw.rect(screen, YELLOW, scaled_rect(sel_rect.inflate(10, 10)), scaled_line(5))
+                draw_text("JOYSTICK to select & confirm", font_menu_tiny, WHITE, screen, SCREEN_WIDTH // 2, SCREEN_HEIGHT - 40, center=True)
+
+        elif game_state in [STATE_GAME_RUNNING, STATE_GAME_STARTING, STATE_GAME_PAUSED, STATE_GAME_PENALTY]:
+            draw_gameplay()
+
+        elif game_state == STATE_PAUSED_MENU:
+            screen.fill(BLACK)
+            draw_text("GAME PAUSED", font_large, WHITE, screen, SCREEN_WIDTH // 2, SCREEN_HEIGHT // 4, center=True)
+            draw_text(f"Current Score: {score}", font_medium, WHITE, screen, SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2, center=True)
+            draw_text(f"High Score: {high_score}", font_medium, WHITE, screen, SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2 + 50, center=True)
+            draw_text("Press JOYSTICK or ENTER to Play Again", font_small, YELLOW, screen, SCREEN_WIDTH // 2, SCREEN_HEIGHT - 100, center=True)
+
+        elif game_state == STATE_GAME_OVER:
+            screen.fill(RED)
+            draw_text("GAME OVER", font_large, BLACK, screen, SCREEN_WIDTH // 2, SCREEN_HEIGHT // 3, center=True)
+            draw_text(f"Final Score: {score}", font_medium, BLACK, screen, SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2 + 20, center=True)
+            draw_text(f"High Score: {high_score}", font_medium, BLACK, screen, SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2 + 70, center=True)
+            draw_text("Press JOYSTICK or ENTER to Restart", font_small, BLACK, screen, SCREEN_WIDTH // 2, SCREEN_HEIGHT - 100, center=True)
+
+        elif game_state == STATE_GAME_WON:
+            screen.fill(BLUE)
+            draw_text("YOU WON!", font_large, WHITE, screen, SCREEN_WIDTH // 2, SCREEN_HEIGHT // 3, center=True)
+            draw_text(f"Final Score: {score}", font_medium, WHITE, screen, SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2 + 20, center=True)
+            draw_text(f"High Score: {high_score}", font_medium, WHITE, screen, SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2 + 70, center=True)
+            draw_text(f"Time Remaining: {time_remaining}", font_medium, WHITE, screen, SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2 + 120, center=True)
+            draw_text("Press JOYSTICK or ENTER to Restart", font_small, WHITE, screen, SCREEN_WIDTH // 2, SCREEN_HEIGHT - 100, center=True)
+
+        if show_debug_overlay:
+            draw_debug_overlay()
+
+        if game_state != STATE_GAME_RUNNING: display_updates.full() # Menus, result screens, countdown and penalty text
+        display_updates.present()
+        latency_tracker.flip()
+        restart_timer.frame_presented()
+        if soak_monitor: soak_monitor.frame((time.perf_counter() - frame_start) * 1000.0)
+
+        if cli_args.headless:
+            clock.tick() # Uncapped, game time still moves one 60 FPS frame per loop
+            frame_dt = 1000.0 / 60
+        else:
+            frame_dt = clock.tick(60)
 
-    elif game_state in [STATE_GAME_RUNNING, STATE_GAME_STARTING, STATE_GAME_PAUSED, STATE_GAME_PENALTY]:
-        draw_jungle_and_fire()
-        update_and_draw_fire_particles()
-        draw_player()
-        
-        if game_state == STATE_GAME_RUNNING:
-            update_and_draw_water()
-            if current_level_id == 6 or current_level_id == 9:
-                draw_zombies()
-            if current_level_id == 7:
-                draw_flame_zombies()
-            draw_powerups() # Draw all powerups
-        
-        draw_game_ui()
-        
-        if current_level_id >= 4: 
-            if game_state == STATE_GAME_STARTING:
-                draw_text("GET READY!", font_large, WHITE, screen, SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2 - 100, center=True)
-                draw_countdown(pause_start_time)
-            elif game_state == STATE_GAME_PAUSED:
-                 pass
-            elif game_state == STATE_GAME_PENALTY:
-                draw_penalty_countdown()
-
-    elif game_state == STATE_PAUSED_MENU:
-        screen.fill(BLACK)
-        draw_text("GAME PAUSED", font_large, WHITE, screen, SCREEN_WIDTH // 2, SCREEN_HEIGHT // 4, center=True)
-        draw_text(f"Current Score: {score}", font_medium, WHITE, screen, SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2, center=True)
-        draw_text(f"High Score: {high_score}", font_medium, WHITE, screen, SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2 + 50, center=True)
-        draw_text("Press JOYSTICK or ENTER to Play Again", font_small, YELLOW, screen, SCREEN_WIDTH // 2, SCREEN_HEIGHT - 100, center=True)
-
-    elif game_state == STATE_GAME_OVER:
-        screen.fill(RED)
-        draw_text("GAME OVER", font_large, BLACK, screen, SCREEN_WIDTH // 2, SCREEN_HEIGHT // 3, center=True)
-        draw_text(f"Final Score: {score}", font_medium, BLACK, screen, SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2 + 20, center=True)
-        draw_text(f"High Score: {high_score}", font_medium, BLACK, screen, SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2 + 70, center=True)
-        draw_text("Press JOYSTICK or ENTER to Restart", font_small, BLACK, screen, SCREEN_WIDTH // 2, SCREEN_HEIGHT - 100, center=True)
-
-    elif game_state == STATE_GAME_WON:
-        screen.fill(BLUE)
-        draw_text("YOU WON!", font_large, WHITE, screen, SCREEN_WIDTH // 2, SCREEN_HEIGHT // 3, center=True)
-        draw_text(f"Final Score: {score}", font_medium, WHITE, screen, SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2 + 20, center=True)
-        draw_text(f"High Score: {high_score}", font_medium, WHITE, screen, SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2 + 70, center=True)
-        draw_text(f"Time Remaining: {time_remaining}", font_medium, WHITE, screen, SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2 + 120, center=True)
-        draw_text("Press JOYSTICK or ENTER to Restart", font_small, WHITE, screen, SCREEN_WIDTH // 2, SCREEN_HEIGHT - 100, center=True)
-
-    pygame.display.flip()
-    clock.tick(60)
-
-pygame.quit()
-sys.exit()
\ No newline at end of file
+    if soak_monitor: soak_monitor.report()
+    if input_pipeline: input_pipeline.stop()
+    pygame.quit()
+    sys.exit()
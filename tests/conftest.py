@@ -0,0 +1,13 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from forest_env import load_game
+
+@pytest.fixture(scope="session")
+def game():
+    # game_withHardware imported headless (dummy video/audio driver), one copy for the whole run
+    return load_game()
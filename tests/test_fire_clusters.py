@@ -0,0 +1,54 @@
+import random
+
+def flood_fill_clusters(tiles):
+    # [(size, (min_x, min_y, max_x, max_y)), ...] largest first, 4-neighbour like FireClusters
+    seen, clusters = set(), []
+    for start in tiles:
+        if start in seen: continue
+        seen.add(start)
+        stack, members = [start], []
+        while stack:
+            x, y = stack.pop()
+            members.append((x, y))
+            for n in ((x - 1, y), (x + 1, y), (x, y - 1), (x, y + 1)):
+                if n in tiles and n not in seen:
+                    seen.add(n)
+                    stack.append(n)
+        xs, ys = [t[0] for t in members], [t[1] for t in members]
+        clusters.append((len(members), (min(xs), min(ys), max(xs), max(ys))))
+    return sorted(clusters, reverse=True)
+
+def test_split_and_merge(game):
+    clusters = game.FireClusters()
+    for tile in [(0, 0), (1, 0), (2, 0)]: clusters.add(tile)
+    assert clusters.clusters() == [(3, (0, 0, 2, 0))]
+    clusters.remove((1, 0))
+    assert clusters.clusters() == [(1, (2, 0, 2, 0)), (1, (0, 0, 0, 0))]
+    clusters.add((1, 0))
+    assert clusters.count() == 1 and clusters.largest() == 3
+
+def test_matches_flood_fill(game):
+    rng = random.Random(2)
+    for size in (4, 8, 16):
+        clusters = game.FireClusters()
+        tiles = set()
+        for step in range(3000):
+            tile = (rng.randrange(size), rng.randrange(size))
+            if tile in tiles and rng.random() < 0.5:
+                clusters.remove(tile)
+                tiles.discard(tile)
+            else:
+                clusters.add(tile)
+                tiles.add(tile)
+            if step % 10 == 0:
+                expected = flood_fill_clusters(tiles)
+                assert clusters.tiles == tiles
+                assert clusters.count() == len(expected)
+                assert clusters.largest() == (expected[0][0] if expected else 0)
+                assert clusters.clusters() == expected
+
+def test_is_clear_keeps_the_margin(game):
+    clusters = game.FireClusters()
+    clusters.add((10, 10))
+    assert not clusters.is_clear(12, 10, margin=2)
+    assert clusters.is_clear(13, 10, margin=2)
@@ -0,0 +1,43 @@
+import random
+
+def distance2(tile, x, y):
+    return (tile[0] + 0.5 - x) ** 2 + (tile[1] + 0.5 - y) ** 2
+
+def random_index(game, rng, count):
+    index = game.FireIndex()
+    tiles = {(rng.randrange(game.GRID_WIDTH), rng.randrange(game.GRID_HEIGHT)) for _ in range(count)}
+    for tile in tiles: index.add(tile)
+    return index, tiles
+
+def test_nearest_matches_brute_force(game):
+    rng = random.Random(3)
+    for count in (1, 3, 10, 60, 300): # Few fires take the scan-all path, more walk the rings
+        for _ in range(40):
+            index, tiles = random_index(game, rng, count)
+            x, y = rng.uniform(-5, game.GRID_WIDTH + 5), rng.uniform(-5, game.GRID_HEIGHT + 5)
+            best = min(distance2(tile, x, y) for tile in tiles)
+            found = index.nearest(x, y)
+            assert found in tiles and distance2(found, x, y) == best
+            radius = rng.uniform(0, 10)
+            found = index.nearest(x, y, max_radius=radius)
+            if best <= radius * radius: assert distance2(found, x, y) == best
+            else: assert found is None
+
+def test_within_and_in_rect_match_brute_force(game):
+    rng = random.Random(4)
+    for _ in range(100):
+        index, tiles = random_index(game, rng, rng.randint(0, 200))
+        x, y, radius = rng.uniform(0, game.GRID_WIDTH), rng.uniform(0, game.GRID_HEIGHT), rng.uniform(0, 8)
+        assert sorted(index.within(x, y, radius)) == sorted(t for t in tiles if distance2(t, x, y) <= radius * radius)
+        x0, y0 = rng.randrange(game.GRID_WIDTH), rng.randrange(game.GRID_HEIGHT)
+        x1, y1 = x0 + rng.randint(1, 15), y0 + rng.randint(1, 15)
+        assert sorted(index.in_rect(x0, y0, x1, y1)) == sorted(t for t in tiles if x0 <= t[0] < x1 and y0 <= t[1] < y1)
+
+def test_remove(game):
+    index = game.FireIndex()
+    index.add((3, 3))
+    index.add((20, 20))
+    index.remove((3, 3))
+    assert index.nearest(0, 0) == (20, 20)
+    index.remove((20, 20))
+    assert index.nearest(0, 0) is None and not index.cells
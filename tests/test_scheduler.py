@@ -0,0 +1,62 @@
+import random
+
+def test_callbacks_run_in_due_order(game):
+    clock = game.GameClock()
+    scheduler = game.Scheduler(clock)
+    calls = []
+    scheduler.schedule(30, lambda: calls.append("c"))
+    scheduler.schedule(10, lambda: calls.append("a"))
+    scheduler.schedule(10, lambda: calls.append("b")) # Same time: scheduling order
+    clock.advance(30)
+    scheduler.update()
+    assert calls == ["a", "b", "c"]
+
+def test_repeating_task_runs_every_missed_tick(game):
+    clock = game.GameClock()
+    scheduler = game.Scheduler(clock)
+    calls = []
+    scheduler.schedule(100, lambda: calls.append(clock.now_ms), interval_ms=100)
+    clock.advance(350) # One slow frame
+    scheduler.update()
+    assert len(calls) == 3
+    clock.advance(50)
+    scheduler.update()
+    assert len(calls) == 4
+
+def test_cancel_and_pause(game):
+    clock = game.GameClock()
+    scheduler = game.Scheduler(clock)
+    calls = []
+    task = scheduler.schedule(10, lambda: calls.append("cancelled"), interval_ms=10)
+    scheduler.schedule(10, lambda: calls.append("kept"))
+    scheduler.cancel(task)
+    clock.pause()
+    clock.advance(100)
+    scheduler.update()
+    assert calls == []
+    clock.resume()
+    clock.advance(100)
+    scheduler.update()
+    assert calls == ["kept"]
+
+def test_matches_brute_force(game):
+    rng = random.Random(1)
+    for _ in range(50):
+        clock = game.GameClock()
+        scheduler = game.Scheduler(clock)
+        tasks = []
+        for _ in range(rng.randint(1, 8)):
+            delay, interval = rng.randint(0, 300), rng.choice([0, rng.randint(1, 120)])
+            task = {"due": delay, "interval": interval, "count": 0}
+            def run(task=task):
+                task["count"] += 1
+            tasks.append(task)
+            scheduler.schedule(delay, run, interval_ms=interval)
+        for _ in range(30):
+            clock.advance(rng.uniform(0, 80))
+            scheduler.update()
+            for task in tasks:
+                if task["due"] > clock.now_ms: expected = 0
+                elif task["interval"] == 0: expected = 1
+                else: expected = int((clock.now_ms - task["due"]) // task["interval"]) + 1
+                assert task["count"] == expected
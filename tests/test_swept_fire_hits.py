@@ -0,0 +1,58 @@
+import random
+
+import numpy as np
+import pytest
+
+EPSILON = 1e-6 # Tiles. A segment through a tile corner may list either tile beside it
+
+def touches(p0, p1, tile, eps=EPSILON):
+    # Segment p0-p1 (tile units) meets the tile square grown by eps (Liang-Barsky clip)
+    t0, t1 = 0.0, 1.0
+    for axis in (0, 1):
+        d = p1[axis] - p0[axis]
+        low, high = tile[axis] - eps - p0[axis], tile[axis] + 1 + eps - p0[axis]
+        if d == 0:
+            if low > 0 or high < 0: return False
+            continue
+        a, b = sorted((low / d, high / d))
+        t0, t1 = max(t0, a), min(t1, b)
+        if t0 > t1: return False
+    return True
+
+def sampled_tiles(p0, p1, samples=1000):
+    # Tiles the segment passes through after its start, found by sampling it densely
+    t = np.linspace(0, 1, samples + 1)[1:, None]
+    points = np.floor(p0 + (p1 - p0) * t).astype(int)
+    return set(map(tuple, points.tolist())) - {tuple(np.floor(p0).astype(int).tolist())}
+
+@pytest.fixture
+def burning(game, monkeypatch):
+    mask = np.zeros((game.GRID_HEIGHT + 2, game.GRID_WIDTH + 2), dtype=bool) # Border of 1 off the grid, never burning
+    monkeypatch.setattr(game, "fire_mask_padded", mask)
+    return mask
+
+def test_matches_sampled_segments(game, burning):
+    rng = random.Random(6)
+    tile, offset = game.TILE_SIZE, np.array([0, game.UI_HEIGHT])
+    for _ in range(30):
+        burning[1:-1, 1:-1] = np.array([[rng.random() < 0.6 for _ in range(game.GRID_WIDTH)] for _ in range(game.GRID_HEIGHT)])
+        p0 = np.array([[rng.uniform(-1, game.GRID_WIDTH + 1), rng.uniform(-1, game.GRID_HEIGHT + 1)] for _ in range(50)])
+        angle, length = np.array([rng.uniform(0, 2 * np.pi) for _ in p0]), np.array([rng.uniform(0, 4) for _ in p0])
+        p1 = p0 + np.stack([np.cos(angle), np.sin(angle)], axis=1) * length[:, None]
+        xs, ys = game.swept_fire_hits(p0 * tile + offset, p1 * tile + offset)
+        hits = set(zip(xs.tolist(), ys.tolist()))
+        assert len(hits) == len(xs) # Unique
+
+        expected = set()
+        for a, b in zip(p0, p1):
+            expected |= {t for t in sampled_tiles(a, b) if 0 <= t[0] < game.GRID_WIDTH and 0 <= t[1] < game.GRID_HEIGHT and burning[t[1] + 1, t[0] + 1]}
+        assert expected <= hits
+        for t in hits:
+            assert burning[t[1] + 1, t[0] + 1]
+            assert any(touches(a, b, t) for a, b in zip(p0, p1))
+
+def test_fast_particle_hits_every_tile_it_crosses(game, burning):
+    burning[1:-1, 1:-1] = True
+    y = game.UI_HEIGHT + 5.5 * game.TILE_SIZE
+    xs, ys = game.swept_fire_hits(np.array([[0.5 * game.TILE_SIZE, y]]), np.array([[6.5 * game.TILE_SIZE, y]]))
+    assert sorted(zip(xs.tolist(), ys.tolist())) == [(x, 5) for x in range(1, 7)]